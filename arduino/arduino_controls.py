@@ -1,48 +1,38 @@
 # Read key=value lines from Arduino. Print all button events. Print pot only on change.
-import serial, re
 from datetime import datetime
 
-def serial_reader():
-    PORT = "/dev/cu.usbmodem311201"   # your port
-    BAUD = 115200
-    ser = serial.Serial(PORT, BAUD, timeout=1)
+from serial_events import EventBus, SerialReader
 
-    last = {}
-    POT_THRESH = 4
-    kv_re = re.compile(r"\s*([A-Za-z0-9_]+)\s*=\s*([^\s]+)\s*$")
+PORT = "/dev/cu.usbmodem311201"   # your port
 
+
+def serial_reader(port=PORT):
     def now_str():
       return datetime.now().strftime("%H:%M:%S.%f")[:-3]
 
-    while True:
-      raw = ser.readline()
-      if not raw:
-        continue
-      line = raw.decode('ascii', errors='ignore').strip()
-      if not line:
-        continue
-
-      m = kv_re.match(line)
-      if not m:
-        continue
-      k, v = m.group(1), m.group(2)
-
-      # Always print button presses
-      if k.startswith("button"):
-        print(f"[ARDUINO] {now_str()} {k} pressed")
-        continue
-
-      # Pot: print only on change (with threshold)
-      try:
-        v_use = int(v)
-      except ValueError:
-        v_use = v
-
-      prev = last.get(k)
-      should = (prev is None) or (
-          isinstance(v_use, int) and isinstance(prev, int) and abs(v_use - prev) >= POT_THRESH
-      ) or (v_use != prev)
-
-      if should:
-        print(f"[ARDUINO] {now_str()} dial={v_use}")
-        last[k] = v_use
+    def print_event(event):
+      # Always print button presses; dials are already filtered to changes
+      if event.kind == "button":
+        print(f"[ARDUINO] {now_str()} {event.key} pressed")
+      else:
+        print(f"[ARDUINO] {now_str()} dial={event.value}")
+
+    bus = EventBus()
+    bus.subscribe(print_event)
+    reader = SerialReader(port, bus)
+    reader.start()
+    reader.join()
+    return bus
+
+
+def multi_board_reader():
+    """Like serial_reader, but for every connected board, surviving unplug/replug."""
+    from board_manager import BoardManager
+
+    bus = EventBus()
+    bus.subscribe(lambda e: print(f"[ARDUINO] {e.board} {e.key}={e.value}"))
+    manager = BoardManager(bus).start()
+    try:
+        manager.join()
+    finally:
+        manager.stop()
@@ -0,0 +1,51 @@
+"""
+Chat gating benchmark
+=====================
+
+Sweeps a noisy dial at 100 Hz through a ChatGate backed by the fake chat
+backend and reports how many model calls were made vs. avoided.
+
+Usage (from the arduino/ directory):
+    python benchmarks/chat_gate_benchmark.py [seconds]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from chat_gate import ChatGate, FakeChatBackend  # noqa: E402
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+    rng = random.Random(0)
+    backend = FakeChatBackend(latency=0.3)
+    gate = ChatGate(backend, settle=0.25, ttl=60, quantum=8)
+    responses = []
+
+    start = time.perf_counter()
+    tick = 0
+    while time.perf_counter() - start < seconds:
+        # turn the dial for half a second, then rest (jittering) at one of two spots for a second
+        cycle, step = divmod(tick, 150)
+        rest = (256, 576)[cycle % 2]
+        value = (rest + (step - 50) * 4 if step < 50 else rest) + rng.randint(-3, 3)
+        gate.submit("lighting", value, responses.append)
+        tick += 1
+        time.sleep(0.01)
+    time.sleep(gate.settle + backend.latency + 0.1)
+
+    stats = gate.stats
+    print(f"dial samples:      {stats['requests']}")
+    print(f"model calls:       {stats['calls']} (backend saw {backend.calls}, {backend.cancelled} cancelled)")
+    print(f"calls avoided:     {gate.calls_avoided}")
+    print(f"  cache hits:      {stats['cache_hits']}")
+    print(f"  coalesced:       {stats['coalesced']}")
+    print(f"  superseded:      {stats['superseded']}")
+    print(f"responses applied: {len(responses)}")
+
+
+if __name__ == "__main__":
+    main()
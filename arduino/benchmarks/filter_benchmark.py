@@ -0,0 +1,59 @@
+"""
+Filter cost benchmark
+=====================
+
+Per-sample cost of each filter across window sizes, on a noisy pot signal.
+
+Usage (from the arduino/ directory):
+    python benchmarks/filter_benchmark.py [samples]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from filters import build_chain  # noqa: E402
+
+
+def _signal(count):
+    rng = random.Random(0)
+    return [512 + int(300 * ((i % 2000) / 2000)) + rng.randint(-6, 6) for i in range(count)]
+
+
+def _ns_per_sample(spec, samples):
+    chain = build_chain(spec)
+    start = time.perf_counter_ns()
+    for v in samples:
+        chain(v)
+    return (time.perf_counter_ns() - start) / len(samples)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    samples = _signal(count)
+    windows = (4, 16, 64, 256, 1024)
+
+    print(f"{'filter':>16} " + " ".join(f"{'w=' + str(w):>9}" for w in windows) + "   (ns/sample)")
+    for name in ("moving_average", "median"):
+        costs = [_ns_per_sample([{"type": name, "window": w}], samples) for w in windows]
+        print(f"{name:>16} " + " ".join(f"{c:9.0f}" for c in costs))
+
+    for label, spec in (
+        ("ema", [{"type": "ema", "alpha": 0.3}]),
+        ("deadband", [{"type": "deadband", "width": 4}]),
+        ("hysteresis", [{"type": "hysteresis", "low": 400, "high": 600}]),
+        ("rate_limit", [{"type": "rate_limit", "min_interval": 0.05}]),
+        ("median+ema+db", [{"type": "median", "window": 5}, {"type": "ema", "alpha": 0.3},
+                           {"type": "deadband", "width": 4}]),
+    ):
+        print(f"{label:>16} {_ns_per_sample(spec, samples):9.0f}")
+
+    chain = build_chain([{"type": "median", "window": 5}, {"type": "deadband", "width": 4}])
+    passed = sum(1 for v in samples if chain(v) is not None)
+    print(f"median(5)+deadband(4) let through {passed}/{count} samples")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Text vs. binary protocol benchmark
+==================================
+
+1. Decode-only throughput of each parser on an in-memory stream.
+2. End-to-end SerialReader throughput through a pty loopback stand-in.
+3. Wire cost: samples/sec each framing allows at 115200 baud.
+
+Usage (from the arduino/ directory):
+    python benchmarks/protocol_benchmark.py [samples]
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from binary_protocol import FRAME_LEN, FrameDecoder, encode_frame  # noqa: E402
+from fake_serial import FakeSerialDevice  # noqa: E402
+from serial_events import EventBus, SerialReader, parse_line  # noqa: E402
+
+BAUD = 115200
+
+
+def _streams(count):
+    values = [(i * 7) % 1024 for i in range(count)]
+    text = "".join(f"pot={v}\n" for v in values).encode("ascii")
+    binary = b"".join(encode_frame(16, v, i) for i, v in enumerate(values))
+    return text, binary
+
+
+def decode_only(text, binary, read_size=4096):
+    start = time.perf_counter()
+    buf, n = b"", 0
+    for i in range(0, len(text), read_size):
+        lines = (buf + text[i:i + read_size]).split(b"\n")
+        buf = lines.pop()
+        n += sum(1 for line in lines if parse_line(line) is not None)
+    text_s = time.perf_counter() - start
+
+    decoder = FrameDecoder()
+    start = time.perf_counter()
+    m = 0
+    for i in range(0, len(binary), read_size):
+        m += len(decoder.feed(binary[i:i + read_size]))
+    binary_s = time.perf_counter() - start
+    return (n, text_s), (m, binary_s)
+
+
+def end_to_end(protocol, data, count):
+    received = []
+    done = threading.Event()
+    bus = EventBus()
+
+    def on_event(event):
+        received.append(event)
+        if len(received) == count:
+            done.set()
+
+    bus.subscribe(on_event)
+    with FakeSerialDevice() as dev:
+        reader = SerialReader(dev.port, bus, dial_threshold=1, protocol=protocol)
+        reader.start()
+        time.sleep(0.2)
+        start = time.perf_counter()
+        dev.write(data)
+        done.wait(timeout=30)
+        elapsed = time.perf_counter() - start
+        reader.stop()
+        reader.join(timeout=1)
+    return len(received), elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    text, binary = _streams(count)
+
+    (n, text_s), (m, binary_s) = decode_only(text, binary)
+    print("decode only:")
+    print(f"  text   {n / text_s:12,.0f} samples/s  ({len(text) / count:.2f} bytes/sample)")
+    print(f"  binary {m / binary_s:12,.0f} samples/s  ({FRAME_LEN} bytes/sample)")
+
+    print("end to end (pty loopback):")
+    for protocol, data in (("text", text), ("binary", binary)):
+        got, elapsed = end_to_end(protocol, data, count)
+        print(f"  {protocol:<6} {got / elapsed:12,.0f} events/s  ({got}/{count})")
+
+    print(f"wire limit at {BAUD} baud (10 bits/byte):")
+    print(f"  text   {BAUD / 10 / (len(text) / count):8,.0f} samples/s")
+    print(f"  binary {BAUD / 10 / FRAME_LEN:8,.0f} samples/s")
+
+
+if __name__ == "__main__":
+    main()
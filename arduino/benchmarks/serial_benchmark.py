@@ -0,0 +1,64 @@
+"""
+Serial ingestion benchmark
+==========================
+
+Drives a SerialReader from a pty-backed fake board and reports events/sec
+and write-to-subscriber latency percentiles.
+
+Usage (from the arduino/ directory):
+    python benchmarks/serial_benchmark.py [events]
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from fake_serial import FakeSerialDevice  # noqa: E402
+from serial_events import EventBus, SerialReader  # noqa: E402
+
+
+def _percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def run(count=50000, burst=64):
+    sent = [0.0] * count
+    latencies = []
+    done = threading.Event()
+    bus = EventBus()
+
+    def on_event(event):
+        latencies.append(time.perf_counter() - sent[event.value])
+        if len(latencies) == count:
+            done.set()
+
+    bus.subscribe(on_event)
+    with FakeSerialDevice() as dev:
+        reader = SerialReader(dev.port, bus, dial_threshold=1)
+        reader.start()
+        time.sleep(0.2)
+
+        start = time.perf_counter()
+        for base in range(0, count, burst):
+            lines = []
+            now = time.perf_counter()
+            for seq in range(base, min(base + burst, count)):
+                sent[seq] = now
+                lines.append(f"pot={seq}\n")
+            dev.write("".join(lines).encode("ascii"))
+        done.wait(timeout=30)
+        elapsed = time.perf_counter() - start
+        reader.stop()
+        reader.join(timeout=1)
+
+    received = len(latencies)
+    ms = [v * 1000 for v in latencies] or [0.0]
+    print(f"events: {received}/{count} in {elapsed:.3f}s -> {received / elapsed:,.0f} events/s")
+    print(f"latency ms: p50={_percentile(ms, 50):.3f} p99={_percentile(ms, 99):.3f} max={max(ms):.3f}")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
@@ -0,0 +1,92 @@
+"""
+Framed binary protocol for the control board.
+
+Each sample is one 6-byte frame instead of an ASCII `key=value` line:
+
+    0xA5 | channel u8 | value i16 LE | seq u8 | CRC-8 (poly 0x07) over channel..seq
+
+The decoder resynchronizes on the sync byte after corruption (a bad CRC
+skips one byte and rescans) and counts dropped frames from gaps in the
+8-bit sequence number. Enable it in the sketch with `BINARY_PROTOCOL 1`.
+"""
+
+import struct
+
+SYNC = 0xA5
+FRAME_LEN = 6
+
+# Buttons 1..4 are channels 0..3, dials start at 16
+CHANNEL_NAMES = {0: "button1", 1: "button2", 2: "button3", 3: "button4", 16: "pot", 17: "pot2"}
+
+
+def _crc8_table():
+    table = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x07) & 0xFF if crc & 0x80 else (crc << 1) & 0xFF
+        table.append(crc)
+    return bytes(table)
+
+
+_CRC_TABLE = _crc8_table()
+_BODY = struct.Struct("<BhB")
+
+
+def crc8(data):
+    crc = 0
+    for b in data:
+        crc = _CRC_TABLE[crc ^ b]
+    return crc
+
+
+def encode_frame(channel, value, seq):
+    """Build one frame; used by the loopback stand-in and benchmarks."""
+    body = _BODY.pack(channel, value, seq & 0xFF)
+    return bytes([SYNC]) + body + bytes([crc8(body)])
+
+
+def channel_name(channel):
+    return CHANNEL_NAMES.get(channel, f"ch{channel}")
+
+
+class FrameDecoder:
+    """Incremental decoder: feed() raw bytes, get back (channel, value, seq) tuples."""
+
+    def __init__(self):
+        self._buf = b""
+        self._expected_seq = None
+        self.frames = 0
+        self.dropped = 0
+        self.corrupt = 0
+
+    def feed(self, data):
+        buf = self._buf + data
+        out = []
+        pos = 0
+        end = len(buf)
+        table = _CRC_TABLE
+        while True:
+            pos = buf.find(SYNC, pos)
+            if pos < 0:
+                pos = end
+                break
+            if end - pos < FRAME_LEN:
+                break
+            crc = table[table[table[table[buf[pos + 1]] ^ buf[pos + 2]] ^ buf[pos + 3]] ^ buf[pos + 4]]
+            if crc != buf[pos + 5]:
+                # not a frame boundary (or corrupted): resync from the next byte
+                self.corrupt += 1
+                pos += 1
+                continue
+
+            channel, value, seq = _BODY.unpack_from(buf, pos + 1)
+            if self._expected_seq is not None and seq != self._expected_seq:
+                self.dropped += (seq - self._expected_seq) & 0xFF
+            self._expected_seq = (seq + 1) & 0xFF
+            self.frames += 1
+            out.append((channel, value, seq))
+            pos += FRAME_LEN
+
+        self._buf = buf[pos:]
+        return out
@@ -0,0 +1,113 @@
+"""
+Multi-board, hot-plug aware control surface manager.
+
+Scans serial ports once a second, starts one SerialReader thread per board
+and restarts it when the board comes back after an unplug. Boards are keyed
+by their USB serial number (falling back to the port path), so a board that
+reappears on a different port keeps its ControlBoard and components.
+Components are registered automatically from the keys each board sends.
+
+    bus = EventBus()
+    manager = BoardManager(bus)
+    manager.start()
+    manager.boards   # board id -> ControlBoard
+
+Pass chat_gate=control_board.solver_gate() to route every component's
+gated_filter through the chat solver.
+
+Readers block in read() with a short timeout and discovery runs at
+`scan_interval`, so an idle rig costs next to no CPU.
+"""
+
+import threading
+
+from serial.tools import list_ports
+
+from control_board import ControlBoard
+from serial_events import SerialReader
+
+PORT_HINTS = ("usbmodem", "ttyACM", "ttyUSB", "usbserial", "wchusbserial")
+
+
+def discover_ports(hints=PORT_HINTS):
+    """Return {board id: port path} for serial ports that look like Arduinos."""
+    found = {}
+    for info in list_ports.comports():
+        if not any(h in info.device for h in hints):
+            continue
+        board_id = info.serial_number or info.device
+        found[board_id] = info.device
+    return found
+
+
+class BoardManager:
+    def __init__(self, bus, scan_interval=1.0, hints=PORT_HINTS, protocol="text", discover=discover_ports,
+                 chat_gate=None):
+        self.bus = bus
+        self.chat_gate = chat_gate
+        self.scan_interval = scan_interval
+        self.hints = hints
+        self.protocol = protocol
+        self._discover = discover
+        self.boards = {}      # board id -> ControlBoard
+        self.readers = {}     # board id -> live SerialReader
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._unsubscribe = bus.subscribe(self._register_component)
+
+    def _register_component(self, event):
+        board = self.boards.get(event.board)
+        if board is not None and board.component(event.key) is None:
+            board.register(event.key)
+            print(f"[ARDUINO] {event.board}: registered component {event.key}")
+
+    def scan(self):
+        """One discovery pass: reap dead readers, start readers for new or replugged boards."""
+        ports = self._discover(self.hints)
+        with self._lock:
+            for board_id, reader in list(self.readers.items()):
+                if not reader.is_alive() or ports.get(board_id) != reader.port:
+                    reader.stop()
+                    del self.readers[board_id]
+                    print(f"[ARDUINO] board {board_id} on {reader.port} disconnected")
+
+            for board_id, port in ports.items():
+                if board_id in self.readers:
+                    continue
+                if board_id not in self.boards:
+                    self.boards[board_id] = ControlBoard(board_id, chat_gate=self.chat_gate)
+                reader = SerialReader(port, self.bus, board=board_id, protocol=self.protocol)
+                reader.start()
+                self.readers[board_id] = reader
+                print(f"[ARDUINO] board {board_id} connected on {port}")
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                self.scan()
+            except Exception as e:
+                print(f"[ARDUINO] port scan failed: {e}")
+            self._stop_event.wait(self.scan_interval)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def join(self, timeout=None):
+        """Block until the manager is stopped (or timeout seconds pass)."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join(timeout=self.scan_interval + 1.0)
+        with self._lock:
+            for reader in self.readers.values():
+                reader.stop()
+            readers = list(self.readers.values())
+            self.readers.clear()
+        for reader in readers:
+            reader.join(timeout=1.0)
+        self._unsubscribe()
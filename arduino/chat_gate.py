@@ -0,0 +1,228 @@
+"""
+Debounced, memoized chat calls for control board components.
+
+Turning a dial produces a stream of states; sending each one to the model
+is slow and expensive. A ChatGate sits in front of the chat backend and:
+
+  - quantizes the state, so jitter maps to the same request
+  - answers repeated (context, quantized state) pairs from a TTL/LRU cache
+  - coalesces rapid changes per context into one call after `settle` seconds
+  - cancels the in-flight call for a context when a newer state arrives
+
+    gate = ChatGate(backend)          # backend(context, state, cancelled) -> response
+    gate.submit("lighting", 512, print)
+    gate.stats                        # requests, calls, cache_hits, coalesced, superseded
+
+The real chat_solver is a generator (it yields while it works and returns
+the response), so it goes in through solver_backend:
+
+    gate = ChatGate(solver_backend(chat_solver))
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+
+_MISS = object()
+
+
+def quantize(state, quantum=8):
+    """Round numbers in state (recursively) to multiples of quantum; returns a hashable key."""
+    def q(v):
+        if isinstance(v, bool) or not isinstance(v, (int, float)):
+            if isinstance(v, dict):
+                return {k: q(x) for k, x in v.items()}
+            if isinstance(v, (list, tuple)):
+                return [q(x) for x in v]
+            return v
+        return round(v / quantum) * quantum
+
+    return json.dumps(q(state), sort_keys=True, default=str)
+
+
+class TTLCache:
+    """LRU cache whose entries also expire `ttl` seconds after being stored."""
+
+    def __init__(self, max_entries=256, ttl=60.0, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return _MISS
+            stored_at, value = entry
+            if self._clock() - stored_at > self.ttl:
+                del self._data[key]
+                return _MISS
+            self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = (self._clock(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class ChatGate:
+    def __init__(self, call, settle=0.25, ttl=60.0, max_entries=256, quantum=8):
+        self.call = call
+        self.settle = settle
+        self.quantum = quantum
+        self.cache = TTLCache(max_entries, ttl)
+        self._lock = threading.Lock()
+        self._timers = {}       # context -> (pending Timer, key)
+        self._generation = {}   # context -> latest submit number
+        self._in_flight = {}    # context -> (cancellation Event, key) of the running call
+        self._delivered = {}    # context -> key of the last response handed to a callback
+        self.stats = {"requests": 0, "calls": 0, "cache_hits": 0, "coalesced": 0, "superseded": 0}
+
+    @property
+    def calls_avoided(self):
+        return self.stats["requests"] - self.stats["calls"]
+
+    def submit(self, context, state, callback):
+        """Request a response for (context, state); callback(response) runs when one is ready."""
+        key = (context, quantize(state, self.quantum))
+        cached = self.cache.get(key)
+        with self._lock:
+            self.stats["requests"] += 1
+            if cached is not _MISS:
+                self.stats["cache_hits"] += 1
+                timer = None
+                # a newer state supersedes anything pending for this context
+                previous = self._timers.pop(context, None)
+                if previous is not None:
+                    previous[0].cancel()
+                running = self._in_flight.pop(context, None)
+                if running is not None:
+                    running[0].set()
+                self._generation[context] = self._generation.get(context, 0) + 1
+                if self._delivered.get(context) == key:
+                    return
+                self._delivered[context] = key
+            elif self._pending_key(context) == key:
+                # jitter within the same quantum: the pending or running call already covers it
+                self.stats["coalesced"] += 1
+                return
+            else:
+                gen = self._generation.get(context, 0) + 1
+                self._generation[context] = gen
+                previous = self._timers.pop(context, None)
+                if previous is not None:
+                    previous[0].cancel()
+                    self.stats["coalesced"] += 1
+                running = self._in_flight.pop(context, None)
+                if running is not None:
+                    running[0].set()
+                timer = threading.Timer(self.settle, self._fire, (context, key, state, gen, callback))
+                timer.daemon = True
+                self._timers[context] = (timer, key)
+
+        if timer is None:
+            callback(cached)
+        else:
+            timer.start()
+
+    def _pending_key(self, context):
+        entry = self._timers.get(context) or self._in_flight.get(context)
+        return entry[1] if entry else None
+
+    def _fire(self, context, key, state, gen, callback):
+        cancelled = threading.Event()
+        with self._lock:
+            if self._generation.get(context) != gen:
+                return
+            self._timers.pop(context, None)
+            self._in_flight[context] = (cancelled, key)
+            self.stats["calls"] += 1
+
+        try:
+            response = self.call(context, state, cancelled)
+        except Exception as e:
+            print(f"[CHAT] call for {context!r} failed: {e}")
+            return
+        finally:
+            with self._lock:
+                running = self._in_flight.get(context)
+                if running is not None and running[0] is cancelled:
+                    del self._in_flight[context]
+
+        if cancelled.is_set() or self._generation.get(context) != gen:
+            with self._lock:
+                self.stats["superseded"] += 1
+            return
+        self.cache.put(key, response)
+        with self._lock:
+            self._delivered[context] = key
+        callback(response)
+
+    def memoize(self, context, state, fn):
+        """Synchronous cached call: fn(state) runs only on a cache miss."""
+        key = (context, quantize(state, self.quantum))
+        with self._lock:
+            self.stats["requests"] += 1
+        cached = self.cache.get(key)
+        if cached is not _MISS:
+            with self._lock:
+                self.stats["cache_hits"] += 1
+            return cached
+        with self._lock:
+            self.stats["calls"] += 1
+        response = fn(state)
+        self.cache.put(key, response)
+        return response
+
+    def flush(self):
+        """Cancel every pending (not yet started) call."""
+        with self._lock:
+            for timer, _ in self._timers.values():
+                timer.cancel()
+            self._timers.clear()
+
+
+def solver_backend(solver):
+    """Adapt a generator solver, solver(state) -> yields ... returns response, to a gate backend.
+
+    The generator is advanced step by step and closed as soon as the call
+    is cancelled. The context only keys the cache; like
+    Component.live_filter, the solver gets the state alone.
+    """
+    def call(context, state, cancelled):
+        steps = solver(state)
+        try:
+            while True:
+                if cancelled.is_set():
+                    steps.close()
+                    return None
+                next(steps)
+        except StopIteration as done:
+            return done.value
+
+    return call
+
+
+class FakeChatBackend:
+    """Local stand-in for the model: fixed latency, honors cancellation, counts calls."""
+
+    def __init__(self, latency=0.3):
+        self.latency = latency
+        self.calls = 0
+        self.cancelled = 0
+
+    def __call__(self, context, state, cancelled):
+        self.calls += 1
+        if cancelled.wait(self.latency):
+            self.cancelled += 1
+            return None
+        return f"{context}: {state}"
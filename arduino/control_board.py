@@ -1,37 +1,70 @@
-from chat.arduino_util import chat_solver, smart_describe
+from collections import deque
+
+from filters import build_chain
+
+def solver_gate(**options):
+    """ChatGate in front of chat.arduino_util.chat_solver, for ControlBoard(chat_gate=...)."""
+    from chat.arduino_util import chat_solver
+    from chat_gate import ChatGate, solver_backend
+    return ChatGate(solver_backend(chat_solver), **options)
+
 
 class ControlBoard:
-    def __init__(self):
+    def __init__(self, board_id=None, chat_gate=None):
+        self.board_id = board_id
+        # shared by the board's components unless register() is given another one
+        self.chat_gate = chat_gate
         self.components = []
+        self._by_name = {}
+
+    def register(self, name, **kwargs):
+        """Add a Component for a key the board sends (no-op if it already exists)."""
+        component = self._by_name.get(name)
+        if component is None:
+            kwargs.setdefault("chat_gate", self.chat_gate)
+            component = Component(name, **kwargs)
+            self.components.append(component)
+            self._by_name[name] = component
+        return component
+
+    def component(self, name):
+        return self._by_name.get(name)
 
 
 class Component:
-    def __init__(self, name, log_len=5):
+    def __init__(self, name, log_len=5, chat_gate=None):
         self.name = name
 
+        # optional ChatGate (chat_gate.py): debounces and caches chat calls
+        self.chat_gate = chat_gate
+
         self.context = None
         self.expiring_context = False
 
-        # rounding, filters, etc
+        # rounding, filters, etc (see filters.py)
         self.transform_function = None
 
-        self.component_log = []
+        self.component_log = deque(maxlen=log_len)
         self.log_len = log_len
 
-    def reprogram(self, context, is_expiring, lambda_string):
+    def reprogram(self, context, is_expiring, filter_spec):
+        """Set the context and the filter chain, e.g. [{"type": "median", "window": 5}]."""
         self.context = context
         self.expiring_context = is_expiring
-
-        lambda_function = eval(lambda_string)
-        self.transform_function = lambda_function
+        self.transform_function = build_chain(filter_spec)
 
     def live_filter(self):
         state = yield
         if self.context:
             if self.transform_function:
                 state = self.transform_function(state)
+                # suppressed by a filter (jitter, deadband, rate limit): nothing to forward
+                if state is None:
+                    return
 
-            # forward to chat solver with context
+            # forward to chat solver with context; imported here so the board
+            # (and BoardManager) load without the chat package
+            from chat.arduino_util import chat_solver
             loggable = yield from chat_solver(state)
             self.log(loggable)
             yield loggable
@@ -39,16 +72,35 @@ class Component:
             if self.expiring_context:
                 self.context = None
 
+    def gated_filter(self, state, on_result=None):
+        """live_filter through self.chat_gate: quantized, debounced, cached and cancellable."""
+        if not self.context or self.chat_gate is None:
+            return
+        if self.transform_function:
+            state = self.transform_function(state)
+            if state is None:
+                return
+
+        def done(response):
+            self.log(response)
+            if self.expiring_context:
+                self.context = None
+            if on_result:
+                on_result(response)
+
+        self.chat_gate.submit(self.context, state, done)
+
     def _to_dict(self):
         # make a json of all states
         return {}
 
     def smart_describe(self):
+        from chat.arduino_util import smart_describe
+        if self.chat_gate is not None:
+            return self.chat_gate.memoize(f"describe:{self.name}", self._to_dict(), smart_describe)
         return smart_describe(self._to_dict())
 
     def log(self, message):
-        if len(self.component_log) > self.log_len:
-            self.component_log.pop(0)
         self.component_log.append(message)
 
-# component_listener = component.live_filter()
\ No newline at end of file
+# component_listener = component.live_filter()
@@ -0,0 +1,47 @@
+"""
+pty-backed stand-in for the control board.
+
+Opens a pseudo-terminal pair; the slave path behaves like the board's serial
+port (pyserial can open it), and writes to the master arrive as if the
+sketch had printed them.
+
+    with FakeSerialDevice() as dev:
+        reader = SerialReader(dev.port, bus)
+        reader.start()
+        dev.write_line("pot=512")
+"""
+
+import os
+import tty
+
+
+class FakeSerialDevice:
+    def __init__(self):
+        self.master, self.slave = os.openpty()
+        tty.setraw(self.slave)
+        self.port = os.ttyname(self.slave)
+
+    def write(self, data: bytes):
+        view = memoryview(data)
+        while view:
+            written = os.write(self.master, view)
+            view = view[written:]
+
+    def write_line(self, line: str):
+        self.write(line.encode("ascii") + b"\n")
+
+    def read(self, size=1024):
+        return os.read(self.master, size)
+
+    def close(self):
+        for fd in (self.master, self.slave):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,192 @@
+"""
+Signal filters for ControlBoard components.
+
+Each filter takes one sample and returns the filtered value, or None to
+suppress it (nothing downstream runs). Filters compose into a FilterChain,
+built from a plain spec instead of an eval'd lambda:
+
+    chain = build_chain([
+        {"type": "median", "window": 5},
+        {"type": "ema", "alpha": 0.3},
+        {"type": "deadband", "width": 4},
+        {"type": "rate_limit", "min_interval": 0.05},
+    ])
+    value = chain(raw)   # None if suppressed
+
+Windows are fixed-size ring buffers. Moving average, EMA, deadband,
+hysteresis and rate limiting are O(1) per sample; the median is O(log w)
+search plus an O(w) memmove on a sorted window.
+"""
+
+import time
+from bisect import bisect_left, insort
+
+
+class RingBuffer:
+    """Fixed-capacity ring; push() returns the evicted sample once full."""
+
+    def __init__(self, size):
+        if size < 1:
+            raise ValueError("Window size must be at least 1")
+        self.size = size
+        self._data = [None] * size
+        self._head = 0
+        self.count = 0
+
+    def push(self, value):
+        evicted = self._data[self._head] if self.count == self.size else None
+        self._data[self._head] = value
+        self._head = (self._head + 1) % self.size
+        if self.count < self.size:
+            self.count += 1
+        return evicted
+
+    def full(self):
+        return self.count == self.size
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        start = (self._head - self.count) % self.size
+        for i in range(self.count):
+            yield self._data[(start + i) % self.size]
+
+
+class MovingAverage:
+    def __init__(self, window=5):
+        self._ring = RingBuffer(window)
+        self._sum = 0.0
+
+    def __call__(self, value):
+        evicted = self._ring.push(value)
+        self._sum += value - (evicted if evicted is not None else 0.0)
+        return self._sum / len(self._ring)
+
+
+class MedianFilter:
+    def __init__(self, window=5):
+        self._ring = RingBuffer(window)
+        self._sorted = []
+
+    def __call__(self, value):
+        evicted = self._ring.push(value)
+        if evicted is not None:
+            del self._sorted[bisect_left(self._sorted, evicted)]
+        insort(self._sorted, value)
+        n = len(self._sorted)
+        mid = n // 2
+        return self._sorted[mid] if n % 2 else (self._sorted[mid - 1] + self._sorted[mid]) / 2
+
+
+class ExponentialSmoothing:
+    def __init__(self, alpha=0.3):
+        if not 0 < alpha <= 1:
+            raise ValueError("alpha must be in (0, 1]")
+        self.alpha = alpha
+        self._value = None
+
+    def __call__(self, value):
+        if self._value is None:
+            self._value = float(value)
+        else:
+            self._value += self.alpha * (value - self._value)
+        return self._value
+
+
+class Deadband:
+    """Suppress samples within `width` of the last value let through."""
+
+    def __init__(self, width=4):
+        self.width = width
+        self._last = None
+
+    def __call__(self, value):
+        if self._last is not None and abs(value - self._last) < self.width:
+            return None
+        self._last = value
+        return value
+
+
+class Hysteresis:
+    """Two-threshold switch: outputs 1 above `high`, 0 below `low`, otherwise holds (suppressed)."""
+
+    def __init__(self, low, high):
+        if low >= high:
+            raise ValueError("low must be below high")
+        self.low, self.high = low, high
+        self._state = None
+
+    def __call__(self, value):
+        state = self._state
+        if value >= self.high:
+            state = 1
+        elif value <= self.low:
+            state = 0
+        if state is None or state == self._state:
+            return None
+        self._state = state
+        return state
+
+
+class RateLimit:
+    """Let through at most one sample per `min_interval` seconds."""
+
+    def __init__(self, min_interval=0.05, clock=time.monotonic):
+        self.min_interval = min_interval
+        self._clock = clock
+        self._last = None
+
+    def __call__(self, value):
+        now = self._clock()
+        if self._last is not None and now - self._last < self.min_interval:
+            return None
+        self._last = now
+        return value
+
+
+class Round:
+    def __init__(self, digits=0):
+        self.digits = digits
+
+    def __call__(self, value):
+        return round(value, self.digits) if self.digits else int(round(value))
+
+
+class FilterChain:
+    """Apply filters in order; a None from any stage suppresses the sample."""
+
+    def __init__(self, filters=()):
+        self.filters = list(filters)
+
+    def __call__(self, value):
+        for f in self.filters:
+            value = f(value)
+            if value is None:
+                return None
+        return value
+
+
+FILTERS = {
+    "moving_average": MovingAverage,
+    "median": MedianFilter,
+    "ema": ExponentialSmoothing,
+    "deadband": Deadband,
+    "hysteresis": Hysteresis,
+    "rate_limit": RateLimit,
+    "round": Round,
+}
+
+
+def build_chain(spec):
+    """Build a FilterChain from a list of {"type": name, **params} dicts."""
+    if isinstance(spec, FilterChain):
+        return spec
+    filters = []
+    for entry in spec or []:
+        params = dict(entry)
+        name = params.pop("type")
+        if name not in FILTERS:
+            raise ValueError(f"Unknown filter type: {name}")
+        filters.append(FILTERS[name](**params))
+    return FilterChain(filters)
@@ -0,0 +1,183 @@
+"""
+Threaded, event-driven serial ingestion for the control board.
+
+A `SerialReader` thread drains everything the board has sent in one read,
+splits it into `key=value` lines (or binary frames, see binary_protocol.py),
+timestamps each batch at receipt and publishes typed `SerialEvent`s on an
+`EventBus`. Anything in-process can subscribe; `attach_socketio` forwards
+events to the Flask-SocketIO server.
+
+    bus = EventBus()
+    bus.subscribe(print)
+    reader = SerialReader("/dev/cu.usbmodem311201", bus)
+    reader.start()
+"""
+
+import re
+import threading
+import time
+from dataclasses import dataclass, asdict
+
+import serial
+
+from binary_protocol import FrameDecoder, channel_name
+
+BAUD = 115200
+POT_THRESH = 4
+
+# Fallback for lines the fast path can't handle (stray whitespace, odd keys)
+_KV_RE = re.compile(rb"\s*([A-Za-z0-9_]+)\s*=\s*([^\s]+)\s*$")
+
+
+@dataclass
+class SerialEvent:
+    kind: str         # "button" or "dial"
+    key: str          # e.g. "button1", "pot"
+    value: object     # int when the payload is numeric
+    t_recv: float     # time.perf_counter() when the bytes were read
+    t_wall: float     # time.time() at the same moment
+    board: str = ""
+
+    def to_dict(self):
+        return asdict(self)
+
+
+class EventBus:
+    """Minimal in-process pub/sub; subscribers run on the publishing thread."""
+
+    def __init__(self):
+        self._subscribers = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback, kinds=None):
+        """Register callback(event); returns a function that unsubscribes it."""
+        entry = (callback, frozenset(kinds) if kinds else None)
+        with self._lock:
+            self._subscribers = self._subscribers + [entry]
+
+        def unsubscribe():
+            with self._lock:
+                self._subscribers = [s for s in self._subscribers if s is not entry]
+        return unsubscribe
+
+    def publish(self, event):
+        # copy-on-write list, so publishing never takes the lock
+        for callback, kinds in self._subscribers:
+            if kinds is not None and event.kind not in kinds:
+                continue
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"[ARDUINO] subscriber {callback!r} failed: {e}")
+
+
+def parse_line(line):
+    """Parse one `key=value` line (bytes) into (key, value), or None."""
+    key, sep, value = line.partition(b"=")
+    key, value = key.strip(), value.strip()
+    if not sep or not key or not value or not key.replace(b"_", b"").isalnum() or b" " in value:
+        m = _KV_RE.match(line)
+        if not m:
+            return None
+        key, value = m.group(1), m.group(2)
+    k = key.decode("ascii")
+    try:
+        return k, int(value)
+    except ValueError:
+        return k, value.decode("ascii", errors="ignore")
+
+
+class SerialReader(threading.Thread):
+    """Background reader publishing board events to an EventBus.
+
+    Buttons are always published; dials only when they move by at least
+    `dial_threshold` (or change type), matching the sketch's own filtering.
+    """
+
+    def __init__(self, port, bus, baud=BAUD, board="", dial_threshold=POT_THRESH, ser=None, protocol="text"):
+        super().__init__(daemon=True)
+        if protocol not in ("text", "binary"):
+            raise ValueError(f"Unknown protocol: {protocol}")
+        self.port = port
+        self.protocol = protocol
+        self.decoder = FrameDecoder() if protocol == "binary" else None
+        self.bus = bus
+        self.baud = baud
+        self.board = board or port
+        self.dial_threshold = dial_threshold
+        self.ser = ser
+        self.error = None
+        self.events = 0
+        self._last = {}
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _open(self):
+        if self.ser is None:
+            self.ser = serial.Serial(self.port, self.baud, timeout=0.1)
+        return self.ser
+
+    def _should_publish(self, key, value):
+        prev = self._last.get(key)
+        if prev is None:
+            return True
+        if isinstance(value, int) and isinstance(prev, int):
+            return abs(value - prev) >= self.dial_threshold
+        return value != prev
+
+    def _emit(self, key, value, t_recv, t_wall):
+        if key.startswith("button"):
+            kind = "button"
+        else:
+            if not self._should_publish(key, value):
+                return
+            self._last[key] = value
+            kind = "dial"
+        self.events += 1
+        self.bus.publish(SerialEvent(kind, key, value, t_recv, t_wall, self.board))
+
+    def handle_lines(self, lines, t_recv, t_wall):
+        """Parse and publish a batch of raw lines received at the same moment."""
+        for line in lines:
+            parsed = parse_line(line)
+            if parsed is not None:
+                self._emit(parsed[0], parsed[1], t_recv, t_wall)
+
+    def handle_bytes(self, chunk, buf, t_recv, t_wall):
+        """Decode a raw read for the configured protocol; returns the leftover text buffer."""
+        if self.decoder is not None:
+            for channel, value, _ in self.decoder.feed(chunk):
+                self._emit(channel_name(channel), value, t_recv, t_wall)
+            return b""
+        lines = (buf + chunk).split(b"\n")
+        buf = lines.pop()
+        self.handle_lines(lines, t_recv, t_wall)
+        return buf
+
+    def run(self):
+        buf = b""
+        try:
+            ser = self._open()
+            while not self._stop_event.is_set():
+                # block for the first byte (up to the port timeout), then take everything queued
+                chunk = ser.read(max(1, ser.in_waiting))
+                if not chunk:
+                    continue
+                t_recv, t_wall = time.perf_counter(), time.time()
+                buf = self.handle_bytes(chunk, buf, t_recv, t_wall)
+        except (serial.SerialException, OSError) as e:
+            self.error = e
+            print(f"[ARDUINO] reader for {self.port} stopped: {e}")
+        finally:
+            try:
+                if self.ser is not None:
+                    self.ser.close()
+            except Exception:
+                pass
+
+
+def attach_socketio(bus, socketio, event_name="arduino_event"):
+    """Forward every bus event to Socket.IO clients; returns the unsubscribe function."""
+    return bus.subscribe(lambda event: socketio.emit(event_name, event.to_dict()))
@@ -5,10 +5,23 @@ const uint8_t BTN[4] = {2, 6, 9, 12};
 const uint8_t LED[4] = {3, 7, 10, 13};
 #define POT_PIN A0
 
+// 1 = framed binary protocol (arduino/binary_protocol.py), 0 = "key=value" text lines
+#define BINARY_PROTOCOL 0
+
 const uint16_t DEBOUNCE_MS = 15;
 const uint16_t FLASH_MS    = 1000;
 const uint16_t POT_THRESH  = 4;     // only report if change >= 4
+#if BINARY_PROTOCOL
+const uint16_t POT_MIN_MS  = 5;     // 6-byte frames leave room for more samples
+#else
 const uint16_t POT_MIN_MS  = 25;    // min interval between pot prints
+#endif
+
+// Binary frame: SYNC | channel | value lo | value hi | seq | CRC-8 over channel..seq
+const uint8_t SYNC       = 0xA5;
+const uint8_t CH_BUTTON1 = 0;       // buttons 1..4 -> channels 0..3
+const uint8_t CH_POT     = 16;
+uint8_t frameSeq = 0;
 
 bool lastRead[4]       = {HIGH,HIGH,HIGH,HIGH};
 bool stable[4]         = {HIGH,HIGH,HIGH,HIGH};
@@ -18,6 +31,21 @@ unsigned long ledOffAt[4] = {0,0,0,0};
 int lastPot = -1;
 unsigned long lastPotPrint = 0;
 
+uint8_t crc8(const uint8_t *data, uint8_t len) {
+  uint8_t crc = 0;
+  while (len--) {
+    crc ^= *data++;
+    for (uint8_t b = 0; b < 8; b++) crc = (crc & 0x80) ? (uint8_t)((crc << 1) ^ 0x07) : (uint8_t)(crc << 1);
+  }
+  return crc;
+}
+
+void sendFrame(uint8_t channel, int16_t value) {
+  uint8_t f[6] = {SYNC, channel, (uint8_t)(value & 0xFF), (uint8_t)((value >> 8) & 0xFF), frameSeq++, 0};
+  f[5] = crc8(f + 1, 4);
+  Serial.write(f, 6);
+}
+
 void setup() {
   for (int i=0;i<4;i++) {
     pinMode(BTN[i], INPUT_PULLUP);  // wire buttons to GND
@@ -39,7 +67,11 @@ void loop() {
       if (r == LOW) { // pressed
         digitalWrite(LED[i], HIGH);
         ledOffAt[i] = now + FLASH_MS;
+#if BINARY_PROTOCOL
+        sendFrame(CH_BUTTON1 + i, 1);
+#else
         Serial.print("button"); Serial.print(i+1); Serial.println("=1");
+#endif
       }
     }
   }
@@ -56,7 +88,11 @@ void loop() {
   int pot = analogRead(POT_PIN); // 0..1023
   if ((lastPot < 0) || (abs(pot - lastPot) >= POT_THRESH)) {
     if (now - lastPotPrint >= POT_MIN_MS) {
+#if BINARY_PROTOCOL
+      sendFrame(CH_POT, pot);
+#else
       Serial.print("pot="); Serial.println(pot);
+#endif
       lastPot = pot;
       lastPotPrint = now;
     }
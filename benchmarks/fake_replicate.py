@@ -0,0 +1,154 @@
+"""
+Fake Replicate HTTP API for benchmarks
+======================================
+
+Implements just enough of api.replicate.com for `replicate.run` as used by
+replicate_helper: file uploads, blocking prediction creation, prediction and
+version lookups. Outputs are small data: URIs (a GLB box when trimesh is
+installed, a tiny gaussian PLY and a placeholder video), so the whole save
+path runs without network access.
+
+Point the client at it with REPLICATE_BASE_URL=http://127.0.0.1:<port>:
+
+    server = FakeReplicate(latency=0.5, failure_rate=0.05).start()
+    os.environ["REPLICATE_BASE_URL"] = server.url
+"""
+
+import base64
+import json
+import random
+import struct
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_PLY_PROPS = ("x", "y", "z", "f_dc_0", "f_dc_1", "f_dc_2", "opacity",
+              "scale_0", "scale_1", "scale_2", "rot_0", "rot_1", "rot_2", "rot_3")
+
+
+def _gaussian_ply(count=256, seed=0):
+    rng = random.Random(seed)
+    header = "ply\nformat binary_little_endian 1.0\n" f"element vertex {count}\n"
+    header += "".join(f"property float {p}\n" for p in _PLY_PROPS) + "end_header\n"
+    body = bytearray()
+    for _ in range(count):
+        body += struct.pack("<14f", *(rng.uniform(-1, 1) for _ in range(3)),
+                            *(rng.uniform(-1, 1) for _ in range(3)), rng.uniform(-2, 4),
+                            *(rng.uniform(-5, -2) for _ in range(3)), 1.0, 0.0, 0.0, 0.0)
+    return header.encode("ascii") + bytes(body)
+
+
+def _glb():
+    try:
+        import trimesh
+        return trimesh.creation.box().export(file_type="glb")
+    except ImportError:
+        return b"glTF" + b"\0" * 60
+
+
+def _data_uri(data, mimetype):
+    return f"data:{mimetype};base64," + base64.b64encode(data).decode("ascii")
+
+
+def _now():
+    return time.strftime("%Y-%m-%dT%H:%M:%S.000000Z", time.gmtime())
+
+
+class FakeReplicate:
+    def __init__(self, latency=0.5, failure_rate=0.0, host="127.0.0.1", port=0):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.predictions = {}
+        self.requests = 0
+        self.connections = 0
+        self._outputs = {
+            "color_video": _data_uri(b"\0\0\0\x18ftypmp42", "video/mp4"),
+            "model_file": _data_uri(_glb(), "model/gltf-binary"),
+            "gaussian_ply": _data_uri(_gaussian_ply(), "application/octet-stream"),
+        }
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self.url = f"http://{host}:{self._server.server_address[1]}"
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"   # keep-alive, so client connection reuse shows up
+
+            def setup(self):
+                fake.connections += 1
+                super().setup()
+
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status, body):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _body(self):
+                return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+            def do_POST(self):
+                fake.requests += 1
+                body = self._body()
+                if self.path == "/v1/files":
+                    file_id = uuid.uuid4().hex
+                    return self._reply(201, {
+                        "id": file_id, "name": "upload", "content_type": "application/octet-stream",
+                        "size": len(body), "etag": file_id, "checksums": {}, "metadata": {},
+                        "created_at": _now(), "expires_at": None,
+                        "urls": {"get": f"https://fake.replicate.test/files/{file_id}"},
+                    })
+                if self.path == "/v1/predictions":
+                    time.sleep(fake.latency)
+                    if random.random() < fake.failure_rate:
+                        return self._reply(500, {"detail": "fake upstream failure"})
+                    request = json.loads(body or b"{}")
+                    prediction = {
+                        "id": uuid.uuid4().hex, "model": "firtoz/trellis", "version": request.get("version", ""),
+                        "status": "succeeded", "input": request.get("input"), "output": fake._outputs,
+                        "logs": "", "error": None, "metrics": {"predict_time": fake.latency},
+                        "created_at": _now(), "started_at": _now(), "completed_at": _now(), "urls": {},
+                    }
+                    fake.predictions[prediction["id"]] = prediction
+                    return self._reply(201, prediction)
+                self._reply(404, {"detail": "not found"})
+
+            def do_GET(self):
+                fake.requests += 1
+                parts = self.path.strip("/").split("/")
+                if parts[:2] == ["v1", "predictions"] and len(parts) == 3 and parts[2] in fake.predictions:
+                    return self._reply(200, fake.predictions[parts[2]])
+                if parts[:2] == ["v1", "models"] and "versions" in parts:
+                    return self._reply(200, {"id": parts[-1], "created_at": _now(),
+                                             "cog_version": "0.9.0", "openapi_schema": {}})
+                self._reply(404, {"detail": "not found"})
+
+        return Handler
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    server = FakeReplicate(args.latency, args.failure_rate, port=args.port).start()
+    print(f"Fake Replicate API on {server.url}")
+    threading.Event().wait()
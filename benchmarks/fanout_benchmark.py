@@ -0,0 +1,140 @@
+"""
+Socket.IO fan-out benchmark for production.py
+=============================================
+
+Starts production.py with W workers, connects a growing number of
+WebSocket subscribers (spread over several client processes) and posts
+poses at a fixed rate. A step passes while at least 99% of frames reach
+every subscriber with p99 delivery under --max-p99-ms; the largest passing
+step, divided by the worker count, is the subscribers-per-core figure.
+
+Usage (from the repo root):
+    python benchmarks/fanout_benchmark.py --workers 1 2 4 --rate 30
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import requests
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def run_step(url, subscribers, rate, duration, client_procs):
+    ctx = multiprocessing.get_context("spawn")
+    ready, results, done = ctx.Queue(), ctx.Queue(), ctx.Event()
+    per_proc = [subscribers // client_procs + (i < subscribers % client_procs) for i in range(client_procs)]
+    procs = [ctx.Process(target=_collect, args=(url, n, ready, done, results)) for n in per_proc if n]
+    for p in procs:
+        p.start()
+    for _ in procs:
+        ready.get(timeout=120)
+
+    session = requests.Session()
+    sent = 0
+    next_at = time.perf_counter()
+    end = next_at + duration
+    while time.perf_counter() < end:
+        session.post(url + "/puppetry/pose", json={"timestamp": time.time(),
+                                                   "quaternion": {"x": 0, "y": 0, "z": 0, "w": 1}})
+        sent += 1
+        next_at += 1.0 / rate
+        time.sleep(max(0.0, next_at - time.perf_counter()))
+    time.sleep(1.0)
+    done.set()
+
+    received, latencies = 0, []
+    for _ in procs:
+        r, lat = results.get(timeout=60)
+        received += r
+        latencies += lat
+    for p in procs:
+        p.join(timeout=30)
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000 if latencies else None
+    return {"subscribers": subscribers, "frames": sent, "delivery_ratio": round(received / max(1, sent * subscribers), 4),
+            "p50_ms": latencies and round(latencies[len(latencies) // 2] * 1000, 2), "p99_ms": p99 and round(p99, 2)}
+
+
+def _collect(url, count, ready, done, results):
+    import socketio
+
+    latencies, received = [], [0]
+    lock = threading.Lock()
+
+    def on_pose(data):
+        with lock:
+            latencies.append(time.time() - data["timestamp"])
+            received[0] += 1
+
+    clients = []
+    for _ in range(count):
+        client = socketio.Client()
+        client.on("pose_data", on_pose)
+        client.connect(url, transports=["websocket"], wait_timeout=10)
+        clients.append(client)
+    ready.put(count)
+    done.wait()
+    results.put((received[0], latencies))
+    for client in clients:
+        client.disconnect()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2])
+    parser.add_argument("--steps", type=int, nargs="+", default=[25, 50, 100, 200, 400])
+    parser.add_argument("--rate", type=float, default=30.0)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--client-procs", type=int, default=4)
+    parser.add_argument("--max-p99-ms", type=float, default=100.0)
+    parser.add_argument("--async-mode", default="gevent")
+    args = parser.parse_args()
+
+    report = {"rate_hz": args.rate, "max_p99_ms": args.max_p99_ms, "cpu_count": os.cpu_count(), "runs": []}
+    for workers in args.workers:
+        port, broker_port = _free_port(), _free_port()
+        server = subprocess.Popen([sys.executable, "production.py", "--host", "127.0.0.1", "--port", str(port),
+                                   "--workers", str(workers), "--broker", f"127.0.0.1:{broker_port}",
+                                   "--async-mode", args.async_mode, "--grace", "1"],
+                                  cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        url = f"http://127.0.0.1:{port}"
+        try:
+            for _ in range(300):
+                try:
+                    requests.get(url + "/metrics", timeout=5)
+                    break
+                except requests.RequestException:
+                    # the master accepts connections before the workers are ready
+                    time.sleep(0.1)
+            steps, best = [], 0
+            for subscribers in args.steps:
+                step = run_step(url, subscribers, args.rate, args.duration, args.client_procs)
+                steps.append(step)
+                print(json.dumps({"workers": workers, **step}), file=sys.stderr)
+                if step["delivery_ratio"] < 0.99 or (step["p99_ms"] or 0) > args.max_p99_ms:
+                    break
+                best = subscribers
+            report["runs"].append({"workers": workers, "max_subscribers": best,
+                                   "subscribers_per_core": round(best / workers, 1), "steps": steps})
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
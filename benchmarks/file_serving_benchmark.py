@@ -0,0 +1,58 @@
+"""
+Repeat-load benchmark for /genassets/files
+==========================================
+
+Serves a generated asset through the Flask test client and compares a cold
+load against repeat loads that revalidate with If-None-Match, plus a
+gzip-accepting load once sidecars exist.
+
+Usage (from the repo root):
+    python benchmarks/file_serving_benchmark.py <object_name>
+
+The object's generated GLB is located through the catalog.
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from app import app  # noqa: E402
+from static_cache import write_sidecars  # noqa: E402
+from replicate_utils import asset_catalog  # noqa: E402
+
+
+def _timed(client, url, headers=None, runs=20):
+    total_bytes = 0
+    start = time.perf_counter()
+    for _ in range(runs):
+        rv = client.get(url, headers=headers or {})
+        total_bytes += len(rv.data)
+    elapsed = time.perf_counter() - start
+    return rv, total_bytes / runs, elapsed / runs
+
+
+def main():
+    entry = asset_catalog.get_object(sys.argv[1])
+    if entry is None or not entry["files"].get("glb"):
+        sys.exit(f"No cataloged GLB for {sys.argv[1]}")
+    filename = entry["files"]["glb"][0]["path"]
+    url = f"/genassets/files/{filename}"
+    write_sidecars(os.path.join(asset_catalog.STORAGE_ROOT, filename))
+
+    with app.test_client() as client:
+        rv, cold_bytes, cold_s = _timed(client, url)
+        etag = rv.headers["ETag"]
+        _, gz_bytes, gz_s = _timed(client, url, {"Accept-Encoding": "gzip"})
+        rv, repeat_bytes, repeat_s = _timed(client, url, {"If-None-Match": etag})
+        _, range_bytes, range_s = _timed(client, url, {"Range": "bytes=0-65535"})
+
+    print(f"{'case':>12} {'bytes':>12} {'ms':>9}")
+    print(f"{'full':>12} {cold_bytes:12.0f} {cold_s * 1000:9.2f}")
+    print(f"{'gzip':>12} {gz_bytes:12.0f} {gz_s * 1000:9.2f}")
+    print(f"{'revalidate':>12} {repeat_bytes:12.0f} {repeat_s * 1000:9.2f}  (status {rv.status_code})")
+    print(f"{'range 64k':>12} {range_bytes:12.0f} {range_s * 1000:9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Frame hand-off benchmark: shared-memory ring vs multiprocessing.Queue
+=====================================================================
+
+Runs one synthetic "camera" process per camera writing frames at --fps and
+--readers consumer processes per camera that touch every frame (a mean over
+a strided sample, like a cheap quality check). Reports delivered fps per
+reader and hand-off latency for frame_ring.FrameRing and for pickling the
+same frames through a multiprocessing.Queue per reader.
+
+Usage (from the repo root):
+    python benchmarks/frame_ring_benchmark.py --cameras 1 2 4 --fps 30 --size 1920x1080
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from replicate_utils import frame_ring  # noqa: E402
+
+
+def _camera_ring(name, shape, fps, duration, start):
+    ring = frame_ring.FrameRing.attach(name)
+    frame = np.random.randint(0, 255, shape, np.uint8)
+    start.wait()
+    next_at = time.perf_counter()
+    end = next_at + duration
+    while time.perf_counter() < end:
+        seq, view = ring.claim()
+        view[:] = frame          # stands in for VideoCapture.read(view)
+        ring.publish(seq)
+        next_at += 1.0 / fps
+        time.sleep(max(0.0, next_at - time.perf_counter()))
+    ring.close()
+
+
+def _reader_ring(name, duration, start, results):
+    ring = frame_ring.FrameRing.attach(name)
+    count, latencies = 0, []
+    start.wait()
+    for seq, timestamp, view in ring.frames(timeout=duration + 2):
+        view[::16, ::16].mean()
+        if ring.valid(seq):
+            count += 1
+            latencies.append(time.time() - timestamp)
+    results.put((count, ring.dropped, latencies))
+    ring.close()
+
+
+def _camera_queue(queues, shape, fps, duration, start):
+    frame = np.random.randint(0, 255, shape, np.uint8)
+    start.wait()
+    next_at = time.perf_counter()
+    end = next_at + duration
+    while time.perf_counter() < end:
+        for q in queues:
+            q.put((time.time(), frame))
+        next_at += 1.0 / fps
+        time.sleep(max(0.0, next_at - time.perf_counter()))
+    for q in queues:
+        q.put(None)
+
+
+def _reader_queue(q, start, results):
+    count, latencies = 0, []
+    start.wait()
+    while True:
+        item = q.get()
+        if item is None:
+            break
+        timestamp, frame = item
+        frame[::16, ::16].mean()
+        count += 1
+        latencies.append(time.time() - timestamp)
+    results.put((count, 0, latencies))
+
+
+def run(mode, cameras, readers, shape, fps, duration):
+    ctx = multiprocessing.get_context("spawn")
+    start, results = ctx.Event(), ctx.Queue()
+    procs, rings, queues = [], [], []
+    for cam in range(cameras):
+        if mode == "ring":
+            name = f"adc_bench_ring{cam}"
+            rings.append(frame_ring.FrameRing.create(name, shape))
+            procs.append(ctx.Process(target=_camera_ring, args=(name, shape, fps, duration, start)))
+            procs += [ctx.Process(target=_reader_ring, args=(name, duration, start, results)) for _ in range(readers)]
+        else:
+            # keep the queues referenced: Process.start() drops its args, and a collected
+            # queue unlinks its semaphores before the spawned child has unpickled them
+            queues.append([ctx.Queue(maxsize=8) for _ in range(readers)])
+            procs.append(ctx.Process(target=_camera_queue, args=(queues[-1], shape, fps, duration, start)))
+            procs += [ctx.Process(target=_reader_queue, args=(q, start, results)) for q in queues[-1]]
+    for p in procs:
+        p.start()
+    time.sleep(1.0)
+    start.set()
+
+    frames, dropped, latencies = 0, 0, []
+    for _ in range(cameras * readers):
+        count, lost, lat = results.get(timeout=duration + 60)
+        frames += count
+        dropped += lost
+        latencies += lat
+    for p in procs:
+        p.join(timeout=30)
+    for ring in rings:
+        ring.close()
+
+    latencies.sort()
+    pick = lambda q: round(latencies[min(len(latencies) - 1, int(len(latencies) * q))] * 1000, 2) if latencies else None
+    return {"mode": mode, "cameras": cameras, "readers_per_camera": readers,
+            "fps_per_reader": round(frames / (cameras * readers) / duration, 1), "dropped": dropped,
+            "p50_ms": pick(0.5), "p99_ms": pick(0.99)}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cameras", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--readers", type=int, default=2)
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--size", default="1920x1080")
+    parser.add_argument("--duration", type=float, default=5.0)
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.split("x"))
+    report = {"fps": args.fps, "size": args.size, "cpu_count": os.cpu_count(), "runs": []}
+    for cameras in args.cameras:
+        for mode in ("ring", "queue"):
+            result = run(mode, cameras, args.readers, (height, width, 3), args.fps, args.duration)
+            print(json.dumps(result), file=sys.stderr)
+            report["runs"].append(result)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+"""
+Load test for app.py
+====================
+
+Starts app.py in a subprocess and drives it, printing one JSON document
+(throughput, error rate, latency percentiles) so runs can be diffed.
+
+    # N pose publishers at R Hz each, M Socket.IO subscribers
+    python benchmarks/load_test.py puppetry --publishers 4 --rate 30 --subscribers 8 --duration 10
+
+    # /genassets/* against a fake Replicate API (see fake_replicate.py)
+    python benchmarks/load_test.py genassets --concurrency 4 --requests 20 --replicate-latency 0.5
+
+Add --out results.json to also write the report to a file. The genassets
+scenario creates `loadtest_*` objects in local storage (replicate_utils/storage.py)
+and removes them afterwards.
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentiles(values_s):
+    values = sorted(values_s)
+    if not values:
+        return {"count": 0}
+    pick = lambda p: round(values[min(len(values) - 1, int(len(values) * p / 100))] * 1000, 3)
+    return {"count": len(values), "p50_ms": pick(50), "p90_ms": pick(90), "p99_ms": pick(99),
+            "max_ms": round(values[-1] * 1000, 3)}
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class AppServer:
+    """app.py in a child process (no reloader, no debugger)."""
+
+    def __init__(self, port, env=None, cwd=ROOT):
+        self.port = port
+        self.url = f"http://127.0.0.1:{port}"
+        self._env = {**os.environ, **(env or {})}
+        self._cwd = cwd
+        self.proc = None
+
+    def __enter__(self):
+        self.proc = subprocess.Popen([sys.executable, os.path.abspath(__file__), "serve", "--port", str(self.port)],
+                                     cwd=self._cwd, env=self._env,
+                                     stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        deadline = time.time() + 60
+        while time.time() < deadline:
+            if self.proc.poll() is not None:
+                raise RuntimeError("app.py exited during startup")
+            try:
+                requests.get(self.url + "/genassets/replicate_hello", timeout=1)
+                return self
+            except requests.ConnectionError:
+                time.sleep(0.1)
+        raise RuntimeError("app.py did not start")
+
+    def __exit__(self, *exc):
+        self.proc.terminate()
+        self.proc.wait(timeout=10)
+
+
+def serve(port):
+    from app import app, socketio
+    socketio.run(app, host="127.0.0.1", port=port, debug=False, use_reloader=False, allow_unsafe_werkzeug=True)
+
+
+# --- puppetry ------------------------------------------------------------
+
+def _publisher(url, rate, stop, latencies, errors, sent):
+    session = requests.Session()
+    interval = 1.0 / rate
+    next_at = time.perf_counter()
+    while not stop.is_set():
+        frame = {"timestamp": time.time(), "quaternion": {"x": 0.0, "y": 0.0, "z": 0.0, "w": 1.0}}
+        start = time.perf_counter()
+        try:
+            rv = session.post(url + "/puppetry/pose", json=frame, timeout=5)
+            if rv.status_code != 200:
+                errors.append(rv.status_code)
+        except requests.RequestException as e:
+            errors.append(type(e).__name__)
+        latencies.append(time.perf_counter() - start)
+        sent[0] += 1
+        next_at += interval
+        stop.wait(max(0.0, next_at - time.perf_counter()))
+
+
+def run_puppetry(args):
+    import socketio as socketio_client
+
+    with AppServer(args.port or _free_port()) as server:
+        delivery, received = [], [0]
+        clients = []
+        for _ in range(args.subscribers):
+            client = socketio_client.Client()
+
+            @client.on("pose_data")
+            def on_pose(data):
+                # publishers and subscribers share this machine's clock
+                delivery.append(time.time() - data["timestamp"])
+                received[0] += 1
+
+            client.connect(server.url, wait_timeout=10)
+            clients.append(client)
+
+        stop = threading.Event()
+        post_latencies, errors, sent = [], [], [0]
+        threads = [threading.Thread(target=_publisher, args=(server.url, args.rate, stop, post_latencies, errors, sent))
+                   for _ in range(args.publishers)]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        time.sleep(args.duration)
+        stop.set()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+        time.sleep(0.5)  # let in-flight emits land
+        for client in clients:
+            client.disconnect()
+
+    expected = sent[0] * args.subscribers
+    return {
+        "scenario": "puppetry",
+        "params": {"publishers": args.publishers, "rate_hz": args.rate, "subscribers": args.subscribers,
+                   "duration_s": args.duration},
+        "frames_sent": sent[0],
+        "publish_rate_hz": round(sent[0] / elapsed, 1),
+        "post_errors": len(errors),
+        "post_error_rate": round(len(errors) / max(1, sent[0]), 4),
+        "post_latency": percentiles(post_latencies),
+        "deliveries": received[0],
+        "delivery_ratio": round(received[0] / expected, 4) if expected else None,
+        "delivery_latency": percentiles(delivery),
+    }
+
+
+# --- genassets -----------------------------------------------------------
+
+def run_genassets(args):
+    import cv2
+    import numpy as np
+    from fake_replicate import FakeReplicate
+    from replicate_utils import storage
+
+    fake = FakeReplicate(latency=args.replicate_latency, failure_rate=args.replicate_failure_rate).start()
+    env = {"REPLICATE_BASE_URL": fake.url, "REPLICATE_API_TOKEN": "fake"}
+    prefix = f"loadtest_{int(time.time())}"
+    images = tempfile.mkdtemp()
+    paths = []
+    for i in range(4):
+        # real images: upload_prep decodes, crops and re-encodes every view
+        paths.append(os.path.join(images, f"img_{i}.png"))
+        cv2.imwrite(paths[-1], np.random.randint(0, 255, (480, 640, 3), np.uint8))
+
+    stats = {}
+
+    def timed(endpoint, method, url, **kwargs):
+        start = time.perf_counter()
+        try:
+            rv = requests.request(method, url, timeout=120, **kwargs)
+            ok = rv.status_code < 400 and (endpoint != "replicate" or rv.json().get("status") == "pass")
+        except requests.RequestException:
+            ok = False
+        entry = stats.setdefault(endpoint, {"latencies": [], "errors": 0})
+        entry["latencies"].append(time.perf_counter() - start)
+        entry["errors"] += not ok
+        return ok
+
+    with AppServer(args.port or _free_port(), env=env) as server:
+        def one(i):
+            name = f"{prefix}_{i}"
+            form = {"name": name, **{f"path_{c}": p for c, p in zip("abcd", paths)}}
+            if timed("replicate", "POST", server.url + "/genassets/replicate", data=form):
+                timed("models", "GET", f"{server.url}/genassets/models/{name}")
+            timed("catalog", "GET", server.url + "/genassets/catalog?limit=50")
+            timed("catalog_search", "GET", server.url + "/genassets/catalog/search", params={"q": "loadtest"})
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(args.concurrency) as pool:
+            list(pool.map(one, range(args.requests)))
+        elapsed = time.perf_counter() - start
+
+    fake.stop()
+    shutil.rmtree(images, ignore_errors=True)
+    for name, _, _ in list(storage.iter_objects()):
+        if name.startswith(prefix):
+            storage.delete_object(name)
+
+    return {
+        "scenario": "genassets",
+        "params": {"concurrency": args.concurrency, "requests": args.requests,
+                   "replicate_latency_s": args.replicate_latency,
+                   "replicate_failure_rate": args.replicate_failure_rate},
+        "generations_per_s": round(args.requests / elapsed, 3),
+        "endpoints": {
+            name: {"error_rate": round(e["errors"] / len(e["latencies"]), 4), **percentiles(e["latencies"])}
+            for name, e in stats.items()
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="scenario", required=True)
+
+    p = sub.add_parser("puppetry")
+    p.add_argument("--publishers", type=int, default=1)
+    p.add_argument("--rate", type=float, default=30.0, help="frames/s per publisher")
+    p.add_argument("--subscribers", type=int, default=4)
+    p.add_argument("--duration", type=float, default=10.0)
+
+    g = sub.add_parser("genassets")
+    g.add_argument("--concurrency", type=int, default=4)
+    g.add_argument("--requests", type=int, default=20)
+    g.add_argument("--replicate-latency", type=float, default=0.5)
+    g.add_argument("--replicate-failure-rate", type=float, default=0.0)
+
+    s = sub.add_parser("serve")
+    for sp in (p, g, s):
+        sp.add_argument("--port", type=int, default=0)
+        sp.add_argument("--out")
+
+    args = parser.parse_args()
+    if args.scenario == "serve":
+        return serve(args.port)
+
+    report = run_puppetry(args) if args.scenario == "puppetry" else run_genassets(args)
+    report["host"] = {"python": platform.python_version(), "platform": platform.platform(), "time": time.time()}
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
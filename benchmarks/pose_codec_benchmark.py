@@ -0,0 +1,60 @@
+"""
+Pose encoding benchmark
+=======================
+
+Compares the JSON `pose_data` payload with the binary `pose_binary`
+message (pose_codec.py) for 1..N sources: bytes per message and
+encode/decode time per message.
+
+Usage (from the repo root):
+    python benchmarks/pose_codec_benchmark.py
+"""
+
+import json
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import pose_codec  # noqa: E402
+
+
+def _random_pose(i):
+    q = [random.gauss(0, 1) for _ in range(4)]
+    n = math.sqrt(sum(v * v for v in q))
+    # shaped like an app frame after the server stamps it
+    return {"timestamp": time.time(), "quaternion": dict(zip("xyzw", (v / n for v in q))),
+            "source": f"phone{i}", "seq": 1234, "sample": False, "t_recv": time.time(), "t_emit": time.time()}
+
+
+def _per_call(fn, runs):
+    start = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return (time.perf_counter() - start) / runs * 1e6
+
+
+def main(runs=5000):
+    print(f"{'sources':>7} {'json B':>8} {'binary B':>9} {'ratio':>6} {'json enc us':>12} {'bin enc us':>11} "
+          f"{'json dec us':>12} {'bin dec us':>11}")
+    for sources in (1, 2, 4, 8, 16):
+        frames = [_random_pose(i) for i in range(sources)]
+        # JSON clients get one message per frame
+        json_msgs = [json.dumps(f) for f in frames]
+        entries = [(i, f["timestamp"], tuple(f["quaternion"][k] for k in "xyzw")) for i, f in enumerate(frames)]
+        base = min(f["timestamp"] for f in frames)
+        binary = pose_codec.encode_message(base, entries)
+
+        json_bytes = sum(len(m) for m in json_msgs)
+        json_enc = _per_call(lambda: [json.dumps(f) for f in frames], runs)
+        bin_enc = _per_call(lambda: pose_codec.encode_message(base, entries), runs)
+        json_dec = _per_call(lambda: [json.loads(m) for m in json_msgs], runs)
+        bin_dec = _per_call(lambda: pose_codec.decode_message(binary), runs)
+        print(f"{sources:>7} {json_bytes:>8} {len(binary):>9} {json_bytes / len(binary):>6.1f} {json_enc:>12.1f} "
+              f"{bin_enc:>11.1f} {json_dec:>12.1f} {bin_dec:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Replicate client resilience benchmark
+=====================================
+
+Runs --jobs concurrent predictions against benchmarks/fake_replicate.py with
+injected latency and failures, once through the stock `replicate.run` and
+once through replicate_utils/replicate_client.ReplicateClient, and reports
+the job success rate, latency percentiles and how many TCP connections the
+fake server accepted. A final phase takes the fake fully down to show the
+circuit breaker failing fast.
+
+Usage (from the repo root):
+    python benchmarks/replicate_resilience.py --jobs 40 --failure-rate 0.2
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.join(HERE, ".."))
+from fake_replicate import FakeReplicate  # noqa: E402
+
+MODEL = "firtoz/trellis:e8f6c45206993f297372f5436b90350817bd9b4a0d52d2a76df50c1c8afa2b3c"
+
+
+def _input():
+    image = io.BytesIO(b"\xff\xd8" + os.urandom(20000))
+    image.name = "view.jpg"
+    return {"images": [image], "texture_size": 2048}
+
+
+def _phase(fake, run, jobs, concurrency):
+    fake.connections = fake.requests = 0
+    durations, failures = [], []
+
+    def job(_):
+        start = time.perf_counter()
+        try:
+            output = run(MODEL, _input())
+            output["model_file"].read()
+            durations.append(time.perf_counter() - start)
+        except Exception as e:
+            failures.append(type(e).__name__)
+
+    wall = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        list(pool.map(job, range(jobs)))
+    wall = time.perf_counter() - wall
+    durations.sort()
+    pick = lambda q: round(durations[min(len(durations) - 1, int(len(durations) * q))], 3) if durations else None
+    return {"jobs": jobs, "succeeded": len(durations), "success_rate": round(len(durations) / jobs, 3),
+            "failures": {name: failures.count(name) for name in set(failures)},
+            "p50_s": pick(0.5), "p99_s": pick(0.99), "wall_s": round(wall, 2),
+            "http_requests": fake.requests, "tcp_connections": fake.connections}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--failure-rate", type=float, default=0.2)
+    args = parser.parse_args()
+
+    fake = FakeReplicate(latency=args.latency, failure_rate=args.failure_rate).start()
+    os.environ["REPLICATE_BASE_URL"] = fake.url
+    os.environ.setdefault("REPLICATE_API_TOKEN", "fake")
+    import replicate
+    from replicate_utils.replicate_client import CircuitBreaker, ReplicateClient
+
+    report = {"latency_s": args.latency, "failure_rate": args.failure_rate, "concurrency": args.concurrency}
+    report["stock"] = _phase(fake, lambda ref, inp: replicate.run(ref, input=inp), args.jobs, args.concurrency)
+
+    # short backoff keeps the run quick; the shape is what matters
+    client = ReplicateClient(max_concurrency=args.concurrency, breaker=CircuitBreaker(reset_timeout=2.0),
+                             backoff_base=0.1)
+    report["resilient"] = _phase(fake, lambda ref, inp: client.run(ref, inp), args.jobs, args.concurrency)
+
+    # upstream fully down: the breaker opens and the rest fail fast without touching the API
+    fake.failure_rate = 1.0
+    client.max_retries = 1
+    report["outage"] = _phase(fake, lambda ref, inp: client.run(ref, inp), args.jobs, args.concurrency)
+    report["outage"]["breaker"] = client.breaker.state
+
+    fake.stop()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
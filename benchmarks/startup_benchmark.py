@@ -0,0 +1,114 @@
+"""
+Startup-time benchmark for the app.py services
+==============================================
+
+Starts `python app.py <service>` (no reloader) and measures the time until
+the first request to that service succeeds, plus the first hit on an
+endpoint that pulls in a lazily imported dependency. For reference it also
+times importing the heavy libraries the services no longer load up front.
+
+--check only verifies that create_app() for each service leaves those
+libraries out of sys.modules, and exits 1 if one is loaded.
+
+Usage (from the repo root):
+    python benchmarks/startup_benchmark.py [--runs 5]
+    python benchmarks/startup_benchmark.py --check
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import requests
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+HEAVY_MODULES = ("cv2", "replicate", "trimesh", "numpy")
+
+# service -> (readiness URL, first request that needs a lazy import)
+TARGETS = {
+    "puppetry": ("/puppetry/", "/puppetry/latency"),
+    "genassets": ("/genassets/replicate_hello", "/genassets/models/__startup_benchmark__"),
+    "puppetry,genassets": ("/genassets/replicate_hello", "/genassets/models/__startup_benchmark__"),
+}
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def time_to_first_request(service):
+    port = _free_port()
+    ready_path, lazy_path = TARGETS[service]
+    env = {**os.environ, "FLASK_DEBUG": "0", "PORT": str(port)}
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "app.py", service], cwd=ROOT, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while True:
+            if proc.poll() is not None:
+                raise RuntimeError(f"app.py {service} exited during startup")
+            try:
+                requests.get(f"http://127.0.0.1:{port}{ready_path}", timeout=1)
+                break
+            except requests.ConnectionError:
+                time.sleep(0.005)
+        ready = time.perf_counter() - start
+        t = time.perf_counter()
+        requests.get(f"http://127.0.0.1:{port}{lazy_path}", timeout=60)
+        lazy = time.perf_counter() - t
+        return ready, lazy
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def heavy_imports(service):
+    """Heavy modules in sys.modules after create_app([service]), in a fresh interpreter."""
+    code = (f"import sys; from services import create_app; create_app({service.split(',')!r}); "
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True,
+                         capture_output=True, text=True).stdout.strip().splitlines()
+    return out[-1].split(",") if out and out[-1] else []
+
+
+def import_time(modules):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", f"import {modules}"], cwd=ROOT, check=False,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--check", action="store_true", help="only check that no heavy module is loaded")
+    args = parser.parse_args()
+
+    loaded = {service: heavy_imports(service) for service in TARGETS}
+    if args.check:
+        for service, modules in loaded.items():
+            print(f"{service}: {'loads ' + ', '.join(modules) if modules else 'ok'}")
+        sys.exit(1 if any(loaded.values()) else 0)
+
+    report = {"runs": args.runs, "heavy_imports": loaded, "services": {}, "reference_import_s": {}}
+    for service in TARGETS:
+        samples = [time_to_first_request(service) for _ in range(args.runs)]
+        ready = sorted(s[0] for s in samples)
+        lazy = sorted(s[1] for s in samples)
+        report["services"][service] = {
+            "first_request_ms": {"median": round(ready[len(ready) // 2] * 1000, 1), "min": round(ready[0] * 1000, 1)},
+            "first_lazy_endpoint_ms": {"median": round(lazy[len(lazy) // 2] * 1000, 1), "path": TARGETS[service][1]},
+        }
+    for modules in ("flask", "flask_socketio", "cv2", "replicate", ", ".join(HEAVY_MODULES)):
+        report["reference_import_s"][modules] = round(min(import_time(modules) for _ in range(args.runs)), 3)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
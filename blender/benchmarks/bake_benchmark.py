@@ -0,0 +1,88 @@
+"""
+Pose bake benchmark
+===================
+
+Bakes a synthetic pose session (30 Hz with jittered timestamps, default ten
+minutes) onto an empty two ways: one obj.keyframe_insert per frame, and the
+add-on's `_bake_rotation` bulk path (keyframe_points.add + foreach_set),
+for quaternion and Euler rotation modes. Resampling is timed separately:
+it runs on the client (pose_bake.py), not in Blender.
+
+Run inside Blender from the blender/ directory:
+    blender --background --python benchmarks/bake_benchmark.py -- 600
+"""
+
+import base64
+import os
+import sys
+import time
+
+import bpy
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "blender_setup"))
+sys.path.insert(0, os.path.join(HERE, "..", ".."))
+from add_on import _bake_rotation  # noqa: E402
+import pose_bake  # noqa: E402
+
+
+def _session(seconds, rate=30.0):
+    rng = np.random.default_rng(0)
+    count = int(seconds * rate)
+    times = np.cumsum(rng.uniform(0.6, 1.4, count) / rate)
+    quats = np.cumsum(rng.normal(scale=0.02, size=(count, 4)), axis=0) + (0.0, 0.0, 0.0, 1.0)
+    return times, quats / np.linalg.norm(quats, axis=1, keepdims=True)
+
+
+def _fresh_target():
+    for obj in list(bpy.data.objects):
+        bpy.data.objects.remove(obj, do_unlink=True)
+    for action in list(bpy.data.actions):
+        bpy.data.actions.remove(action)
+    obj = bpy.data.objects.new("BakeTarget", None)
+    bpy.context.scene.collection.objects.link(obj)
+    return obj
+
+
+def bench_keyframe_insert(message):
+    obj = _fresh_target()
+    obj.rotation_mode = message["rotation_mode"]
+    values = np.frombuffer(base64.b64decode(message["values"]), dtype="<f4").reshape(
+        message["frames"], message["channels"])
+    start = time.perf_counter()
+    for i, value in enumerate(values):
+        setattr(obj, message["data_path"], value)
+        obj.keyframe_insert(data_path=message["data_path"], frame=message["frame_start"] + i)
+    return time.perf_counter() - start
+
+
+def bench_bulk(message):
+    _fresh_target()
+    reply = _bake_rotation({**message, "target": "BakeTarget"})
+    assert reply["ok"], reply
+    return reply["seconds"]
+
+
+def main():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    seconds = float(argv[0]) if argv else 600.0
+    fps = bpy.context.scene.render.fps / bpy.context.scene.render.fps_base
+    times, quats = _session(seconds)
+
+    results = {}
+    for mode in ("QUATERNION", "XYZ"):
+        start = time.perf_counter()
+        message = pose_bake.bake_message("BakeTarget", times, quats, fps, mode)
+        results[f"resample {mode}"] = time.perf_counter() - start
+        results[f"keyframe_insert {mode}"] = bench_keyframe_insert(message)
+        results[f"bulk {mode}"] = bench_bulk(message)
+    _fresh_target()
+
+    print(f"Baked {len(times)} poses ({seconds:.0f} s) to {message['frames']} frames at {fps:g} fps")
+    for name, elapsed in results.items():
+        print(f"{name:>26}: {elapsed * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Bulk object creation benchmark
+==============================
+
+Compares the operator path (bpy.ops.mesh.primitive_*_add, one call per
+object) against the add-on's `_create_objects` data path with shared meshes.
+
+Run inside Blender from the blender/ directory:
+    blender --background --python benchmarks/create_objects_benchmark.py -- 2000
+"""
+
+import os
+import sys
+import time
+
+import bpy
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "blender_setup"))
+from add_on import _create_objects  # noqa: E402
+
+
+def _specs(count):
+    types = ("cube", "sphere")
+    return [
+        {"object_type": types[i % 2], "location": [(i % 50) * 3.0, (i // 50) * 3.0, 0.0]}
+        for i in range(count)
+    ]
+
+
+def _clear_scene():
+    for obj in list(bpy.data.objects):
+        bpy.data.objects.remove(obj, do_unlink=True)
+    for mesh in list(bpy.data.meshes):
+        bpy.data.meshes.remove(mesh)
+    for coll in list(bpy.data.collections):
+        if coll.name.startswith("RC_"):
+            bpy.data.collections.remove(coll)
+
+
+def bench_operator(specs):
+    _clear_scene()
+    start = time.perf_counter()
+    for spec in specs:
+        if spec["object_type"] == "cube":
+            bpy.ops.mesh.primitive_cube_add(location=spec["location"])
+        else:
+            bpy.ops.mesh.primitive_uv_sphere_add(location=spec["location"])
+    return time.perf_counter() - start
+
+
+def bench_data(specs, instance=False):
+    _clear_scene()
+    start = time.perf_counter()
+    _create_objects(specs, instance)
+    bpy.context.view_layer.update()
+    return time.perf_counter() - start
+
+
+def main():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    count = int(argv[0]) if argv else 1000
+    specs = _specs(count)
+
+    results = {
+        "operator": bench_operator(specs),
+        "data": bench_data(specs),
+        "data_instanced": bench_data(specs, instance=True),
+    }
+    _clear_scene()
+
+    print(f"Created {count} objects")
+    for name, seconds in results.items():
+        print(f"{name:>15}: {seconds * 1000:9.1f} ms  ({seconds / count * 1e6:7.1f} us/object)")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,10 +6,14 @@ Ultra-simple Blender control via WebSocket.
 No error checking, no robustness - just the essentials.
 """
 
+import base64
 import json
+import os
 from typing import List, Dict, Any
 import websocket._core as websocket
 
+import metrics   # repo root; entry points put it on sys.path
+
 
 class BlenderSession:
     """Simple Blender remote control session."""
@@ -39,17 +43,27 @@ class BlenderSession:
             self._connect()
         message = json.dumps(data)
         self.ws.send(message)
-        print(f"Sent: {message}")
+        metrics.counter("blender_commands_total", "Commands sent to the Blender add-on", type=data["type"]).inc()
+        # bakes carry hundreds of KB of keyframes; don't echo those
+        print(f"Sent: {message}" if len(message) < 1000 else f"Sent: {data['type']} ({len(message)} bytes)")
 
-    def _set_property(self, target: str, data_path: str, value: Any, index: int = -1):
+    def _set_property(self, target: str, data_path: str, value: Any, index: int = -1, ack: int = None):
         """Set Blender object property directly."""
-        self._send({
+        message = {
             "type": "set_property",
             "target": target,
             "data_path": data_path,
             "value": value,
             "index": index
-        })
+        }
+        if ack is not None:
+            # the add-on replies {"type": "ack", "id": ack} once the property is applied
+            message["ack"] = ack
+        self._send(message)
+
+    def set_property(self, target: str, data_path: str, value: Any, index: int = -1, ack: int = None):
+        """Set any object property, e.g. set_property("Light", "data.energy", 500)."""
+        self._set_property(target, data_path, value, index, ack)
 
     # Camera Controls
     def rotate_camera(self, x: float = 0, y: float = 0, z: float = 0):
@@ -106,6 +120,20 @@ class BlenderSession:
         })
         print(f"Creating sphere at ({x}, {y}, {z})")
 
+    def create_objects(self, objects: List[Dict[str, Any]], instance: bool = False):
+        """Create many objects in one message.
+
+        Each entry is {"object_type": "cube"|"sphere", "location": [x, y, z]}
+        with optional "rotation" and "scale". Objects share one mesh per type;
+        instance=True creates collection instances instead.
+        """
+        self._send({
+            "type": "create_objects",
+            "objects": objects,
+            "instance": instance
+        })
+        print(f"Creating {len(objects)} objects")
+
     def add_glb(self, filename: str):
         """Import GLB file into the scene."""
         self._send({
@@ -146,6 +174,82 @@ class BlenderSession:
         self._set_property(light_name, "location", [x, y, z])
         print(f"{light_name} position set to ({x}, {y}, {z})")
 
+    def stats(self, max_replies: int = 50) -> Dict[str, Any]:
+        """Ask the add-on for its queue depths and timer tick timings.
+
+        The reply is also published as blender_* gauges. Other replies read
+        while waiting (acks, pongs) are dropped, so don't call this while a
+        MappingEngine is collecting acks on the same session.
+        """
+        self._send({"type": "stats"})
+        for _ in range(max_replies):
+            reply = json.loads(self.ws.recv())
+            if reply.get("type") == "stats":
+                break
+        else:
+            raise TimeoutError("No stats reply from Blender")
+        metrics.gauge("blender_rx_queue_depth", "Messages waiting in the add-on").set(reply["rx_queue_depth"])
+        metrics.gauge("blender_tx_queue_depth", "Replies waiting in the add-on").set(reply["tx_queue_depth"])
+        for p in ("p50", "p99", "max"):
+            if reply["tick_ms"][p] is not None:
+                metrics.gauge("blender_tick_ms", "Add-on timer tick duration", quantile=p).set(reply["tick_ms"][p])
+        return reply
+
+    def profile_ticks(self, ticks: int = 120, path: str = None, timeout: float = 60.0) -> str:
+        """Profile the add-on's next `ticks` timer ticks and save the .prof locally.
+
+        Returns the local path (default: the add-on's file name in the current
+        directory). Open it with pstats or snakeviz. Like stats(), other replies
+        read while waiting are dropped.
+        """
+        reply = self._request({"type": "profile", "ticks": ticks}, "profile", timeout)
+        path = path or os.path.basename(reply["path"])
+        with open(path, "wb") as f:
+            f.write(base64.b64decode(reply["data"]))
+        print(f"Saved {reply['ticks']}-tick timer profile to {path}")
+        return path
+
+    def _request(self, data: Dict[str, Any], reply_type: str, timeout: float = 5.0) -> Dict[str, Any]:
+        """Send a message and wait for the reply of reply_type; other replies are dropped."""
+        self._send(data)
+        self.ws.settimeout(timeout)
+        try:
+            while True:
+                reply = json.loads(self.ws.recv())
+                if reply.get("type") == reply_type:
+                    return reply
+        finally:
+            self.ws.settimeout(5)
+
+    def scene_info(self, target: str = None) -> Dict[str, Any]:
+        """Scene fps and frame range, plus the rotation mode of `target` if given."""
+        return self._request({"type": "scene_info", "target": target}, "scene_info")
+
+    def bake_pose(self, target: str, session, source: str = None, fps: float = None,
+                  rotation_mode: str = None, frame_start: int = None, timeout: float = 60.0) -> Dict[str, Any]:
+        """Bake a recorded pose session onto an object's rotation, one keyframe per frame.
+
+        `session` is a recording path (see pose_bake.py) or a (times, quaternions)
+        pair. fps, rotation_mode and frame_start default to the scene's frame
+        rate, the object's rotation mode and the scene start frame. Returns the
+        add-on's reply, including the Blender-side "seconds".
+        """
+        import pose_bake
+
+        if fps is None or rotation_mode is None or frame_start is None:
+            info = self.scene_info(target)
+            fps = fps or info["fps"]
+            rotation_mode = rotation_mode or info["rotation_mode"] or "QUATERNION"
+            frame_start = info["frame_start"] if frame_start is None else frame_start
+        times, quats = pose_bake.load_session(session, source) if isinstance(session, str) else session
+        message = pose_bake.bake_message(target, times, quats, fps, rotation_mode, frame_start)
+        reply = self._request(message, "baked", timeout)
+        if reply["ok"]:
+            print(f"Baked {reply['frames']} frames onto {target} in {reply['seconds'] * 1000:.1f} ms (Blender side)")
+        else:
+            print(f"Bake onto {target} failed: {reply.get('error')}")
+        return reply
+
     def close(self):
         """Close connection to Blender."""
         if self.ws:
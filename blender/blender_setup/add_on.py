@@ -9,12 +9,18 @@ bl_info = {
 }
 
 import bpy
+import bmesh
 import json
 import math
 import threading
 import queue
 import time
 import os
+import cProfile
+import tempfile
+from collections import deque
+
+import numpy as np   # bundled with Blender
 
 # External lib
 try:
@@ -32,6 +38,29 @@ _WS_RUNNING = False
 _WS_RX = queue.Queue()
 _WS_TX = queue.Queue()
 
+# Timer tick durations (seconds) and counters, reported on {"type": "stats"}
+_TICK_TIMES = deque(maxlen=600)
+_STATS = {"ticks": 0, "messages": 0}
+
+# Timer profiling: set by the N-panel button or {"type": "profile", "ticks": N}.
+# While None (the default) the timer runs unwrapped.
+_PROFILE = None
+_PROFILE_LAST = ""
+PROFILE_DIR = os.path.join(tempfile.gettempdir(), "blender_remote_profiles")
+
+
+def _stats_message():
+    times = sorted(_TICK_TIMES)
+    pct = lambda p: round(times[min(len(times) - 1, int(len(times) * p / 100))] * 1000, 3) if times else None
+    return json.dumps({
+        "type": "stats",
+        "rx_queue_depth": _WS_RX.qsize(),
+        "tx_queue_depth": _WS_TX.qsize(),
+        "ticks": _STATS["ticks"],
+        "messages": _STATS["messages"],
+        "tick_ms": {"p50": pct(50), "p99": pct(99), "max": round(times[-1] * 1000, 3) if times else None},
+    })
+
 
 def _set_property(target_name: str, data_path: str, value, index: int = -1):
     """Set Blender object property directly."""
@@ -88,6 +117,80 @@ def _create_object(object_type: str, location: list):
         return False
 
 
+# Shared mesh datablocks for bulk creation, one per primitive type
+_PRIMITIVE_TYPES = ("cube", "sphere")
+
+
+def _primitive_mesh(object_type: str):
+    """Get (or build once) the shared mesh datablock for a primitive type."""
+    name = f"RC_{object_type}_mesh"
+    mesh = bpy.data.meshes.get(name)
+    if mesh is not None:
+        return mesh
+
+    bm = bmesh.new()
+    try:
+        if object_type == "cube":
+            bmesh.ops.create_cube(bm, size=2.0)
+        else:
+            bmesh.ops.create_uvsphere(bm, u_segments=32, v_segments=16, radius=1.0)
+        mesh = bpy.data.meshes.new(name)
+        bm.to_mesh(mesh)
+    finally:
+        bm.free()
+    return mesh
+
+
+def _primitive_collection(object_type: str):
+    """Get (or build once) an unlinked collection holding one primitive, for instancing."""
+    name = f"RC_{object_type}_proto"
+    coll = bpy.data.collections.get(name)
+    if coll is not None:
+        return coll
+
+    coll = bpy.data.collections.new(name)
+    proto = bpy.data.objects.new(name, _primitive_mesh(object_type))
+    coll.objects.link(proto)
+    return coll
+
+
+def _create_objects(objects: list, instance: bool = False):
+    """Create many primitives directly through bpy.data, sharing one mesh per type.
+
+    Each entry is a dict with "object_type" and optional "location",
+    "rotation" and "scale". With instance=True each entry becomes an empty
+    instancing a per-type collection instead of a mesh object.
+    """
+    try:
+        target = bpy.context.scene.collection
+        created = 0
+        for spec in objects:
+            object_type = spec.get("object_type")
+            if object_type not in _PRIMITIVE_TYPES:
+                print(f"Unknown object type: {object_type}")
+                continue
+
+            label = object_type.capitalize()
+            if instance:
+                obj = bpy.data.objects.new(label, None)
+                obj.instance_type = 'COLLECTION'
+                obj.instance_collection = _primitive_collection(object_type)
+            else:
+                obj = bpy.data.objects.new(label, _primitive_mesh(object_type))
+
+            obj.location = spec.get("location", (0, 0, 0))
+            obj.rotation_euler = spec.get("rotation", (0, 0, 0))
+            obj.scale = spec.get("scale", (1, 1, 1))
+            target.objects.link(obj)
+            created += 1
+
+        print(f"Created {created} objects{' (instanced)' if instance else ''}")
+        return created
+    except Exception as e:
+        print(f"Failed to create objects: {e}")
+        return 0
+
+
 def _import_glb(filename: str):
     """Import GLB file into the scene."""
     try:
@@ -135,11 +238,84 @@ def _list_objects():
     return objects
 
 
+def _scene_info(target_name: str = None):
+    """Frame rate, frame range and (optionally) a target's rotation mode, for baking."""
+    scene = bpy.context.scene
+    obj = bpy.data.objects.get(target_name) if target_name else None
+    return {
+        "type": "scene_info",
+        "fps": scene.render.fps / scene.render.fps_base,
+        "frame_start": scene.frame_start,
+        "frame_end": scene.frame_end,
+        "frame_current": scene.frame_current,
+        "rotation_mode": obj.rotation_mode if obj is not None else None,
+    }
+
+
+def _rotation_fcurves(obj, action, data_path: str, channels: int):
+    """Empty fcurves for data_path[0..channels), replacing any existing keys."""
+    if hasattr(action, "fcurve_ensure_for_datablock"):
+        # Blender 4.4+ layered actions: also sets up and assigns the action slot
+        curves = [action.fcurve_ensure_for_datablock(obj, data_path, index=i) for i in range(channels)]
+        for fc in curves:
+            fc.keyframe_points.clear()
+        return curves
+    for fc in [fc for fc in action.fcurves if fc.data_path == data_path]:
+        action.fcurves.remove(fc)
+    return [action.fcurves.new(data_path, index=i, action_group="Object Transforms") for i in range(channels)]
+
+
+def _bake_rotation(data: dict):
+    """Write one rotation keyframe per frame in bulk (see pose_bake.py for the message)."""
+    start = time.perf_counter()
+    target = data.get("target")
+    obj = bpy.data.objects.get(target)
+    if obj is None:
+        print(f"Object '{target}' not found")
+        return {"type": "baked", "ok": False, "target": target, "error": "object not found"}
+
+    try:
+        frames, channels = int(data["frames"]), int(data["channels"])
+        values = np.frombuffer(base64.b64decode(data["values"]), dtype="<f4").reshape(frames, channels)
+        frame_start = int(data.get("frame_start", 1))
+        data_path = data["data_path"]
+
+        obj.rotation_mode = data["rotation_mode"]
+        obj.animation_data_create()
+        action = obj.animation_data.action
+        if action is None:
+            action = bpy.data.actions.new(name=f"{obj.name}_Pose")
+            obj.animation_data.action = action
+
+        # keyframe_points.add + foreach_set: one call per channel instead of one per keyframe
+        co = np.empty(frames * 2, dtype=np.float32)
+        co[0::2] = frame_start + np.arange(frames, dtype=np.float32)
+        linear = bpy.types.Keyframe.bl_rna.properties["interpolation"].enum_items["LINEAR"].value
+        for index, fc in enumerate(_rotation_fcurves(obj, action, data_path, channels)):
+            co[1::2] = values[:, index]
+            fc.keyframe_points.add(frames)
+            fc.keyframe_points.foreach_set("co", co)
+            fc.keyframe_points.foreach_set("interpolation", np.full(frames, linear, dtype=np.int32))
+            fc.update()
+
+        if data.get("set_range", True):
+            bpy.context.scene.frame_start = frame_start
+            bpy.context.scene.frame_end = frame_start + frames - 1
+        seconds = time.perf_counter() - start
+        print(f"Baked {frames} frames of {data_path} on {target} in {seconds * 1000:.1f} ms")
+        return {"type": "baked", "ok": True, "target": target, "frames": frames,
+                "frame_start": frame_start, "seconds": round(seconds, 4)}
+    except Exception as e:
+        print(f"Failed to bake rotation: {e}")
+        return {"type": "baked", "ok": False, "target": target, "error": str(e)}
+
+
 def _timer_step():
     global _WS_RUNNING
     if not _WS_RUNNING:
         return None
 
+    tick_start = time.perf_counter()
     drained = 0
     try:
         while True:
@@ -158,12 +334,19 @@ def _timer_step():
                 value = data.get("value")
                 index = data.get("index", -1)
                 _set_property(target, data_path, value, index)
+                if data.get("ack") is not None:
+                    _WS_TX.put(json.dumps({"type": "ack", "id": data["ack"]}))
 
             elif msg_type == "create_object":
                 object_type = data.get("object_type")
                 location = data.get("location", [0, 0, 0])
                 _create_object(object_type, location)
 
+            elif msg_type == "create_objects":
+                objects = data.get("objects", [])
+                instance = data.get("instance", False)
+                _create_objects(objects, instance)
+
             elif msg_type == "import_glb":
                 filename = data.get("filename")
                 _import_glb(filename)
@@ -178,6 +361,18 @@ def _timer_step():
             elif msg_type == "ping":
                 _WS_TX.put(json.dumps({"type": "pong", "ok": True}))
 
+            elif msg_type == "stats":
+                _WS_TX.put(_stats_message())
+
+            elif msg_type == "profile":
+                _start_profile(int(data.get("ticks", 120)), reply=bool(data.get("reply", True)))
+
+            elif msg_type == "scene_info":
+                _WS_TX.put(json.dumps(_scene_info(data.get("target"))))
+
+            elif msg_type == "bake_rotation":
+                _WS_TX.put(json.dumps(_bake_rotation(data)))
+
             else:
                 print(f"Unknown message type: {msg_type}")
 
@@ -193,7 +388,64 @@ def _timer_step():
         except queue.Empty:
             pass
 
-    return 1 / 60 if drained > 0 else 0.05
+    _STATS["ticks"] += 1
+    _STATS["messages"] += drained
+    _TICK_TIMES.append(time.perf_counter() - tick_start)
+    interval = 1 / 60 if drained > 0 else 0.05
+    if _PROFILE is not None and not _PROFILE["active"]:
+        # hand the timer over to the profiled wrapper until the requested ticks are done
+        _PROFILE["active"] = True
+        bpy.app.timers.register(_profiled_timer_step, first_interval=interval)
+        return None
+    return interval
+
+
+def _start_profile(ticks: int, reply: bool = False):
+    global _PROFILE
+    if _PROFILE is not None:
+        print("Timer profile already running")
+        return
+    _PROFILE = {"profiler": cProfile.Profile(), "ticks": max(1, ticks), "remaining": max(1, ticks),
+                "active": False, "reply": reply}
+    print(f"Profiling the next {ticks} timer ticks")
+
+
+def _profiled_timer_step():
+    profile = _PROFILE
+    profile["profiler"].enable()
+    try:
+        interval = _timer_step()
+    finally:
+        profile["profiler"].disable()
+    profile["remaining"] -= 1
+    if interval is None or profile["remaining"] <= 0:
+        _finish_profile()
+        if interval is not None:
+            bpy.app.timers.register(_timer_step, first_interval=interval)
+        return None
+    return interval
+
+
+def _finish_profile():
+    global _PROFILE, _PROFILE_LAST
+    profile, _PROFILE = _PROFILE, None
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    done = profile["ticks"] - profile["remaining"]
+    path = os.path.join(PROFILE_DIR, f"timer_{time.strftime('%Y%m%d-%H%M%S')}_{done}ticks.prof")
+    profile["profiler"].dump_stats(path)
+    _PROFILE_LAST = path
+    print(f"Timer profile ({done} ticks) saved to {path}")
+    if profile["reply"]:
+        with open(path, "rb") as f:
+            data = base64.b64encode(f.read()).decode("ascii")
+        _WS_TX.put(json.dumps({"type": "profile", "ticks": done, "path": path, "data": data}))
+        # the wrapper has stopped; flush the reply now instead of on the next tick
+        if _WS_THREAD and _WS_THREAD.client_socket:
+            try:
+                while True:
+                    _WS_THREAD._websocket_send(_WS_THREAD.client_socket, _WS_TX.get_nowait())
+            except queue.Empty:
+                pass
 
 
 class _WSServerThread(threading.Thread):
@@ -248,35 +500,61 @@ class _WSServerThread(threading.Thread):
             else:
                 header = bytes([0x81, 127]) + payload_len.to_bytes(8, 'big')
             
-            client_socket.send(header + payload)
+            client_socket.sendall(header + payload)
         except Exception:
             pass
 
+    def _recv_exact(self, client_socket, size):
+        """recv() until size bytes arrived; large frames (bakes) span many reads."""
+        chunks, remaining = [], size
+        while remaining:
+            chunk = client_socket.recv(min(remaining, 1 << 20))
+            if not chunk:
+                raise ConnectionError("Connection closed mid-frame")
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        return b"".join(chunks)
+
+    def _read_frame(self, client_socket):
+        """Read one whole frame: (fin, opcode, unmasked payload)."""
+        data = self._recv_exact(client_socket, 2)
+        
+        fin = (data[0] & 0x80) != 0
+        opcode = data[0] & 0x0F
+        masked = (data[1] & 0x80) != 0
+        payload_len = data[1] & 0x7F
+        
+        if payload_len == 126:
+            data = self._recv_exact(client_socket, 2)
+            payload_len = int.from_bytes(data, 'big')
+        elif payload_len == 127:
+            data = self._recv_exact(client_socket, 8)
+            payload_len = int.from_bytes(data, 'big')
+        
+        if masked:
+            mask = self._recv_exact(client_socket, 4)
+            payload = self._recv_exact(client_socket, payload_len)
+            # unmask as one big integer XOR rather than byte by byte
+            key = (mask * (payload_len // 4 + 1))[:payload_len]
+            payload = (int.from_bytes(payload, 'big') ^ int.from_bytes(key, 'big')).to_bytes(payload_len, 'big')
+        else:
+            payload = self._recv_exact(client_socket, payload_len)
+        return fin, opcode, payload
+
     def _websocket_recv(self, client_socket):
-        """Receive WebSocket frame."""
+        """Receive one WebSocket message, joining fragmented frames."""
         try:
-            data = client_socket.recv(2)
-            if len(data) < 2:
-                return None
-            
-            fin = (data[0] & 0x80) != 0
-            opcode = data[0] & 0x0F
-            masked = (data[1] & 0x80) != 0
-            payload_len = data[1] & 0x7F
-            
-            if payload_len == 126:
-                data = client_socket.recv(2)
-                payload_len = int.from_bytes(data, 'big')
-            elif payload_len == 127:
-                data = client_socket.recv(8)
-                payload_len = int.from_bytes(data, 'big')
-            
-            if masked:
-                mask = client_socket.recv(4)
-                payload = client_socket.recv(payload_len)
-                payload = bytes(payload[i] ^ mask[i % 4] for i in range(len(payload)))
-            else:
-                payload = client_socket.recv(payload_len)
+            fin, opcode, payload = self._read_frame(client_socket)
+            parts = [payload]
+            while not fin:
+                # continuation frames (opcode 0) until FIN; pings in between are dropped
+                frame_fin, frame_opcode, frame = self._read_frame(client_socket)
+                if frame_opcode == 8:
+                    return None
+                if frame_opcode == 0:
+                    parts.append(frame)
+                    fin = frame_fin
+            payload = b"".join(parts)
             
             if opcode == 1:  # Text frame
                 return payload.decode('utf-8')
@@ -340,6 +618,18 @@ class REMOTE_PT_panel(bpy.types.Panel):
         else:
             col.operator("remote.start", text="Start Server", icon="PLAY")
 
+        box = layout.box()
+        box.label(text="Profiling")
+        row = box.row()
+        row.prop(context.scene, "remote_profile_ticks")
+        if _PROFILE is not None:
+            box.label(text=f"Profiling... {_PROFILE['remaining']} ticks left")
+        else:
+            row.operator("remote.profile", text="Profile", icon="TIME")
+        if _PROFILE_LAST:
+            box.label(text=os.path.basename(_PROFILE_LAST))
+            box.operator("wm.path_open", text="Open Folder", icon="FILE_FOLDER").filepath = PROFILE_DIR
+
 
 class REMOTE_OT_start(bpy.types.Operator):
     bl_idname = "remote.start"
@@ -377,17 +667,34 @@ class REMOTE_OT_stop(bpy.types.Operator):
         return {'FINISHED'}
 
 
+class REMOTE_OT_profile(bpy.types.Operator):
+    bl_idname = "remote.profile"
+    bl_label = "Profile Timer Ticks"
+    bl_description = "Run the next N timer ticks under cProfile and save a .prof file"
+
+    def execute(self, context):
+        if not _WS_RUNNING:
+            self.report({'INFO'}, "Start the server first")
+            return {'CANCELLED'}
+        _start_profile(context.scene.remote_profile_ticks)
+        self.report({'INFO'}, f"Profiling {context.scene.remote_profile_ticks} ticks")
+        return {'FINISHED'}
+
+
 def _add_props():
     bpy.types.Scene.remote_port = bpy.props.IntProperty(
         name="Port", default=8765, min=1024, max=65535)
+    bpy.types.Scene.remote_profile_ticks = bpy.props.IntProperty(
+        name="Ticks", default=120, min=1, max=100000)
 
 
 def _remove_props():
-    if hasattr(bpy.types.Scene, "remote_port"):
-        delattr(bpy.types.Scene, "remote_port")
+    for prop in ("remote_port", "remote_profile_ticks"):
+        if hasattr(bpy.types.Scene, prop):
+            delattr(bpy.types.Scene, prop)
 
 
-classes = (REMOTE_PT_panel, REMOTE_OT_start, REMOTE_OT_stop)
+classes = (REMOTE_PT_panel, REMOTE_OT_start, REMOTE_OT_stop, REMOTE_OT_profile)
 
 
 def register():
@@ -398,10 +705,11 @@ def register():
 
 def unregister():
     global _WS_THREAD
-    try:
-        bpy.app.timers.unregister(_timer_step)
-    except Exception:
-        pass
+    for timer in (_timer_step, _profiled_timer_step):
+        try:
+            bpy.app.timers.unregister(timer)
+        except Exception:
+            pass
     if _WS_THREAD:
         try:
             _WS_THREAD.stop()
@@ -0,0 +1,317 @@
+"""
+Control board -> Blender property mapping
+=========================================
+
+Binds dials and buttons from the serial event stream (arduino/serial_events.py)
+to Blender properties through a BlenderSession. Bindings are declarative and
+live in a JSON file that is reloaded when it changes:
+
+    {"bindings": [
+        "pot -> Light.data.energy",
+        {"source": "pot", "target": "Camera", "data_path": "location", "index": 2,
+         "in": [0, 1023], "out": [2, 12], "curve": "smoothstep", "epsilon": 0.05, "max_rate": 30}
+    ]}
+
+Only changes larger than a binding's `epsilon` are sent, and each target
+property is updated at most `max_rate` times per second (the latest value
+wins), so the add-on is never flooded. Buttons only report presses, so
+bind them with `"toggle": true`: each press flips the property between the
+two ends of `out`.
+
+    engine = MappingEngine(blender, "mappings.json")
+    bus.subscribe(engine.on_event)
+    engine.start()
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+
+DEFAULT_IN = (0.0, 1023.0)
+DEFAULT_MAX_RATE = 30.0
+
+_SHORTHAND = re.compile(r"^\s*(\w+)\s*->\s*([^.\s]+)\.([\w.]+?)(?:\[(\d+)\])?\s*$")
+
+
+def _curve(name, t, gamma=2.2):
+    if name == "linear":
+        return t
+    if name == "smoothstep":
+        return t * t * (3 - 2 * t)
+    if name == "gamma":
+        return t ** gamma
+    if name == "step":
+        return 1.0 if t >= 0.5 else 0.0
+    raise ValueError(f"Unknown curve: {name}")
+
+
+class Binding:
+    def __init__(self, source, target, data_path, index=-1, in_range=DEFAULT_IN, out_range=(0.0, 1.0),
+                 curve="linear", gamma=2.2, epsilon=0.0, max_rate=DEFAULT_MAX_RATE, integer=False,
+                 toggle=False):
+        _curve(curve, 0.0, gamma)
+        self.source = source
+        self.target = target
+        self.data_path = data_path
+        self.index = index
+        self.in_range = tuple(in_range)
+        self.out_range = tuple(out_range)
+        self.curve = curve
+        self.gamma = gamma
+        self.epsilon = epsilon
+        self.max_rate = max_rate
+        self.integer = integer
+        self.toggle = toggle
+
+    @property
+    def key(self):
+        return (self.target, self.data_path, self.index)
+
+    @classmethod
+    def from_spec(cls, spec):
+        if isinstance(spec, str):
+            m = _SHORTHAND.match(spec)
+            if not m:
+                raise ValueError(f"Bad binding: {spec!r} (expected 'source -> Object.data_path[index]')")
+            source, target, data_path, index = m.groups()
+            return cls(source, target, data_path, -1 if index is None else int(index))
+        spec = dict(spec)
+        return cls(spec.pop("source"), spec.pop("target"), spec.pop("data_path"),
+                   index=spec.pop("index", -1),
+                   in_range=spec.pop("in", DEFAULT_IN), out_range=spec.pop("out", (0.0, 1.0)), **spec)
+
+    def map(self, value):
+        lo, hi = self.in_range
+        t = min(1.0, max(0.0, (float(value) - lo) / ((hi - lo) or 1.0)))
+        a, b = self.out_range
+        out = a + (b - a) * _curve(self.curve, t, self.gamma)
+        return int(round(out)) if self.integer else out
+
+    def flip(self, value, current):
+        """Toggle bindings: a press (upper half of `in`) flips `current` between the ends of `out`."""
+        lo, hi = self.in_range
+        if float(value) < (lo + hi) / 2:
+            return None
+        a, b = self.out_range
+        out = a if current == (int(round(b)) if self.integer else b) else b
+        return int(round(out)) if self.integer else out
+
+
+def load_bindings(path):
+    with open(path) as f:
+        data = json.load(f)
+    return [Binding.from_spec(s) for s in data.get("bindings", [])]
+
+
+class _TargetState:
+    __slots__ = ("last_value", "last_sent_at", "pending", "pending_t_recv", "min_interval")
+
+    def __init__(self, min_interval):
+        self.last_value = None
+        self.last_sent_at = 0.0
+        self.pending = None
+        self.pending_t_recv = None
+        self.min_interval = min_interval
+
+
+class MappingEngine:
+    """Maps serial events onto Blender properties with epsilon and per-target rate limiting."""
+
+    def __init__(self, session, path=None, bindings=None, reload_interval=0.5, ack_every=0):
+        self.session = session
+        self.path = path
+        self.reload_interval = reload_interval
+        self.ack_every = ack_every
+        self._bindings = {}
+        self._targets = {}
+        self._mtime = None
+        self._cond = threading.Condition()
+        self._dirty = False
+        self._running = False
+        self._thread = None
+        self._ack_thread = None
+        self._ack_sent = {}
+        self._next_ack = 0
+        self.sent = 0
+        self.skipped = 0
+        self.coalesced = 0
+        self.send_latencies = deque(maxlen=10000)   # serial receipt -> websocket send, seconds
+        self.apply_latencies = deque(maxlen=10000)  # serial receipt -> add-on ack, seconds
+        if bindings is not None:
+            self.set_bindings(bindings)
+        elif path is not None:
+            self.reload()
+
+    # --- configuration -----------------------------------------------------
+    def set_bindings(self, bindings):
+        by_source = {}
+        for b in bindings:
+            if not isinstance(b, Binding):
+                b = Binding.from_spec(b)
+            by_source.setdefault(b.source, []).append(b)
+        with self._cond:
+            self._bindings = by_source
+            targets = {}
+            for b in (b for group in by_source.values() for b in group):
+                # keep per-target state across reloads so values aren't resent
+                state = self._targets.get(b.key) or _TargetState(0.0)
+                state.min_interval = 1.0 / b.max_rate if b.max_rate else 0.0
+                targets[b.key] = state
+            self._targets = targets
+        print(f"Loaded {sum(len(g) for g in by_source.values())} bindings")
+
+    def reload(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return False
+        if mtime == self._mtime:
+            return False
+        try:
+            bindings = load_bindings(self.path)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            # keep the previous bindings; a half-saved file must not kill the rig
+            print(f"Failed to load {self.path}: {e}")
+            self._mtime = mtime
+            return False
+        self._mtime = mtime
+        self.set_bindings(bindings)
+        return True
+
+    # --- event path --------------------------------------------------------
+    def on_event(self, event):
+        """EventBus subscriber: queue changed values, never blocks on the socket."""
+        with self._cond:
+            # same lock as set_bindings, so the bindings and _targets come from one reload
+            bindings = self._bindings.get(event.key)
+            if not bindings:
+                return
+            for b in bindings:
+                state = self._targets[b.key]
+                reference = state.pending if state.pending is not None else state.last_value
+                if b.toggle:
+                    value = b.flip(event.value, reference)
+                    if value is None:
+                        continue
+                else:
+                    value = b.map(event.value)
+                    if reference is not None and abs(value - reference) <= b.epsilon:
+                        self.skipped += 1
+                        continue
+                if state.pending is not None:
+                    self.coalesced += 1
+                state.pending = value
+                state.pending_t_recv = event.t_recv
+                self._dirty = True
+            self._cond.notify()
+
+    def _flush(self):
+        """Send every due pending value; returns seconds until the next one is due."""
+        now = time.perf_counter()
+        due, wait = [], None
+        with self._cond:
+            for key, state in self._targets.items():
+                if state.pending is None:
+                    continue
+                ready_at = state.last_sent_at + state.min_interval
+                if ready_at <= now:
+                    due.append((key, state.pending, state.pending_t_recv))
+                    state.last_value = state.pending
+                    state.last_sent_at = now
+                    state.pending = None
+                else:
+                    wait = ready_at - now if wait is None else min(wait, ready_at - now)
+
+        for (target, data_path, index), value, t_recv in due:
+            ack = None
+            if self.ack_every and self.sent % self.ack_every == 0:
+                ack = self._next_ack
+                self._next_ack += 1
+                self._ack_sent[ack] = t_recv
+            self.session.set_property(target, data_path, value, index, ack=ack)
+            self.sent += 1
+            if t_recv is not None:
+                self.send_latencies.append(time.perf_counter() - t_recv)
+        return wait
+
+    def _run(self):
+        next_reload = time.perf_counter() + self.reload_interval
+        while self._running:
+            wait = self._flush()
+            if self.path and time.perf_counter() >= next_reload:
+                self.reload()
+                next_reload = time.perf_counter() + self.reload_interval
+            timeout = self.reload_interval if wait is None else min(wait, self.reload_interval)
+            with self._cond:
+                if not self._dirty:
+                    self._cond.wait(timeout)
+                self._dirty = False
+
+    def _receive_acks(self):
+        while self._running:
+            try:
+                reply = json.loads(self.session.ws.recv())
+            except Exception:
+                if self._running:
+                    time.sleep(0.1)
+                continue
+            if reply.get("type") == "ack":
+                t_recv = self._ack_sent.pop(reply.get("id"), None)
+                if t_recv is not None:
+                    self.apply_latencies.append(time.perf_counter() - t_recv)
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        if self.ack_every:
+            self._ack_thread = threading.Thread(target=self._receive_acks, daemon=True)
+            self._ack_thread.start()
+        return self
+
+    def stop(self):
+        self._running = False
+        with self._cond:
+            self._dirty = True
+            self._cond.notify()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+
+    def latency_report(self):
+        def pct(values, p):
+            values = sorted(values)
+            return values[min(len(values) - 1, int(len(values) * p / 100))] * 1000 if values else None
+
+        return {
+            "sent": self.sent,
+            "skipped_epsilon": self.skipped,
+            "coalesced": self.coalesced,
+            "send_ms": {"p50": pct(self.send_latencies, 50), "p99": pct(self.send_latencies, 99)},
+            "apply_ms": {"p50": pct(self.apply_latencies, 50), "p99": pct(self.apply_latencies, 99)},
+        }
+
+
+if __name__ == "__main__":
+    # python control_mapping.py <serial port> [mappings.json]
+    import sys
+    here = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, os.path.join(here, ".."))              # metrics, for blender_session
+    sys.path.insert(0, os.path.join(here, "..", "arduino"))
+    from serial_events import EventBus, SerialReader
+    from blender_session import BlenderSession
+
+    port = sys.argv[1]
+    mapping_path = sys.argv[2] if len(sys.argv) > 2 else "mappings.json"
+    engine = MappingEngine(BlenderSession(), mapping_path, ack_every=10).start()
+    bus = EventBus()
+    bus.subscribe(engine.on_event)
+    SerialReader(port, bus).start()
+    try:
+        while True:
+            time.sleep(5)
+            print(json.dumps(engine.latency_report()))
+    except KeyboardInterrupt:
+        engine.stop()
@@ -14,8 +14,13 @@ Requirements:
     - WebSocket connection established (ws://127.0.0.1:8765)
 """
 
+import os
+import sys
 import time
-from blender_session import BlenderSession
+
+# blender_session uses the repo-root metrics module
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from blender_session import BlenderSession  # noqa: E402
 
 
 def main():
@@ -0,0 +1,364 @@
+"""
+In-process metrics: counters, gauges, latency histograms and spans.
+
+    import metrics
+    metrics.counter("pose_frames_total", "Pose frames received").inc()
+    with metrics.timer("socketio_emit_seconds", "Time spent in socketio.emit"):
+        socketio.emit(...)
+    with metrics.span("generation", stage="replicate_run"):
+        replicate.run(...)
+
+    metrics.render()   # Prometheus text exposition format, served at /metrics
+
+    metrics.publish("/tmp/metrics-run", "worker-0")   # multi-process servers
+    metrics.render(metrics.merged("/tmp/metrics-run"))
+
+Histograms use HDR-style log-linear buckets over integer microseconds
+(32 sub-buckets per power of two, so ~3% relative precision from 1us to
+days) stored in a flat list; recording is a bit_length, a shift and an
+increment. Exposition folds them into a fixed set of `le` buckets, and
+percentile() reads straight from the fine buckets.
+
+The registry is per process. Under a multi-process server each worker
+publish()es its registry to a shared directory every few seconds and
+merged() folds them back together: counters and histograms are summed,
+gauges (per-process state) keep a `worker` label. A merged view is at
+most one publish interval behind for workers other than the caller.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+
+_SUB_BITS = 5
+_SUB_COUNT = 1 << _SUB_BITS            # 32
+_HALF = _SUB_COUNT >> 1                # 16
+_MAX_SHIFT = 40                        # ~1.2 days at microsecond resolution
+_N_BUCKETS = _SUB_COUNT + _MAX_SHIFT * _HALF
+
+# Prometheus `le` boundaries in seconds
+EXPOSITION_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                      1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+def _bucket_index(us):
+    if us < _SUB_COUNT:
+        return us
+    shift = us.bit_length() - _SUB_BITS
+    if shift > _MAX_SHIFT:
+        return _N_BUCKETS - 1
+    return _SUB_COUNT + (shift - 1) * _HALF + (us >> shift) - _HALF
+
+
+def _bucket_bounds(index):
+    """[low, high) in microseconds for a bucket index."""
+    if index < _SUB_COUNT:
+        return index, index + 1
+    shift = (index - _SUB_COUNT) // _HALF + 1
+    top = (index - _SUB_COUNT) % _HALF + _HALF
+    return top << shift, (top + 1) << shift
+
+
+def _label_str(labels):
+    if not labels:
+        return ""
+    parts = []
+    for k, v in labels:
+        v = str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{k}="{v}"')
+    return "{" + ",".join(parts) + "}"
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help="", labels=()):
+        self.name, self.help, self.labels = name, help, labels
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def samples(self):
+        yield self.name, self.labels, self.value
+
+
+class Gauge:
+    kind = "gauge"
+
+    def __init__(self, name, help="", labels=()):
+        self.name, self.help, self.labels = name, help, labels
+        self.value = 0.0
+
+    def set(self, value):
+        self.value = value
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def dec(self, amount=1):
+        self.value -= amount
+
+    def samples(self):
+        yield self.name, self.labels, self.value
+
+
+class Histogram:
+    """Latency histogram in seconds, backed by HDR-style microsecond buckets."""
+
+    kind = "histogram"
+
+    def __init__(self, name, help="", labels=()):
+        self.name, self.help, self.labels = name, help, labels
+        self._counts = [0] * _N_BUCKETS
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        i = _bucket_index(int(seconds * 1e6) if seconds > 0 else 0)
+        with self._lock:
+            self._counts[i] += 1
+            self.count += 1
+            self.sum += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def percentile(self, p):
+        """Approximate p-th percentile (0-100) in seconds, or None when empty."""
+        with self._lock:
+            counts, total = list(self._counts), self.count
+        if not total:
+            return None
+        rank = max(1, int(total * p / 100.0 + 0.5))
+        seen = 0
+        for i, c in enumerate(counts):
+            seen += c
+            if seen >= rank:
+                low, high = _bucket_bounds(i)
+                return min((low + high) / 2e6, self.max)
+        return self.max
+
+    def summary(self):
+        ms = lambda s: None if s is None else round(s * 1000, 3)
+        return {"count": self.count, "p50_ms": ms(self.percentile(50)), "p90_ms": ms(self.percentile(90)),
+                "p99_ms": ms(self.percentile(99)), "max_ms": ms(self.max if self.count else None)}
+
+    def samples(self):
+        with self._lock:
+            counts, total, total_sum = list(self._counts), self.count, self.sum
+        cumulative, i = 0, 0
+        for le in EXPOSITION_BUCKETS:
+            limit = int(le * 1e6)
+            while i < _N_BUCKETS and _bucket_bounds(i)[1] <= limit:
+                cumulative += counts[i]
+                i += 1
+            yield self.name + "_bucket", self.labels + (("le", repr(le)),), cumulative
+        yield self.name + "_bucket", self.labels + (("le", "+Inf"),), total
+        yield self.name + "_sum", self.labels, total_sum
+        yield self.name + "_count", self.labels, total
+
+
+def _get(cls, name, help, labels):
+    key = (name, tuple(sorted(labels.items())))
+    metric = _registry.get(key)
+    if metric is None:
+        with _registry_lock:
+            metric = _registry.get(key)
+            if metric is None:
+                metric = _registry[key] = cls(name, help, key[1])
+    if not isinstance(metric, cls):
+        raise ValueError(f"Metric {name} already registered as a {metric.kind}")
+    return metric
+
+
+def counter(name, help="", **labels):
+    return _get(Counter, name, help, labels)
+
+
+def gauge(name, help="", **labels):
+    return _get(Gauge, name, help, labels)
+
+
+def histogram(name, help="", **labels):
+    return _get(Histogram, name, help, labels)
+
+
+class timer:
+    """Context manager observing the elapsed time of its block into a histogram."""
+
+    __slots__ = ("hist", "start")
+
+    def __init__(self, name, help="", **labels):
+        self.hist = histogram(name, help, **labels)
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.hist.observe(time.perf_counter() - self.start)
+        return False
+
+
+# --- spans ---------------------------------------------------------------
+
+_recent_spans = deque(maxlen=500)
+_span_stack = threading.local()
+
+
+class span:
+    """Timed, nestable stage of a larger operation.
+
+    Durations go to the `<name>_seconds` histogram (labelled by stage);
+    finished spans, with their parent and error, are kept in recent_spans().
+    """
+
+    def __init__(self, name, **attrs):
+        self.name = name
+        self.attrs = attrs
+        self.parent = None
+
+    def __enter__(self):
+        stack = getattr(_span_stack, "stack", None)
+        if stack is None:
+            stack = _span_stack.stack = []
+        self.parent = stack[-1] if stack else None
+        stack.append(self)
+        self.t_wall = time.time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self.start
+        _span_stack.stack.pop()
+        histogram(f"{self.name}_seconds", f"Duration of {self.name} stages", **self.attrs).observe(duration)
+        if exc_type is not None:
+            counter(f"{self.name}_errors_total", f"Failed {self.name} stages", **self.attrs).inc()
+        _recent_spans.append({
+            "name": self.name,
+            **self.attrs,
+            "parent": self.parent and {"name": self.parent.name, **self.parent.attrs},
+            "start": self.t_wall,
+            "duration_ms": round(duration * 1000, 3),
+            "error": None if exc is None else repr(exc),
+        })
+        return False
+
+
+def recent_spans(limit=100):
+    return list(_recent_spans)[-limit:]
+
+
+# --- exposition ----------------------------------------------------------
+
+def render(registry=None):
+    """All metrics in Prometheus text format (version 0.0.4)."""
+    registry = _registry if registry is None else registry
+    families = {}
+    for metric in list(registry.values()):
+        families.setdefault(metric.name, []).append(metric)
+
+    lines = []
+    for name in sorted(families):
+        group = families[name]
+        if group[0].help:
+            lines.append(f"# HELP {name} {group[0].help}")
+        lines.append(f"# TYPE {name} {group[0].kind}")
+        for metric in group:
+            for sample_name, labels, value in metric.samples():
+                lines.append(f"{sample_name}{_label_str(labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def snapshot(registry=None):
+    """JSON-friendly view: counters/gauges as numbers, histograms as percentile summaries."""
+    registry = _registry if registry is None else registry
+    out = {}
+    for (name, labels), metric in list(registry.items()):
+        key = name + _label_str(labels)
+        out[key] = metric.summary() if isinstance(metric, Histogram) else metric.value
+    return out
+
+
+# --- multi-process -------------------------------------------------------
+
+_KINDS = {cls.kind: cls for cls in (Counter, Gauge, Histogram)}
+
+
+def export_state():
+    """The registry as plain JSON data; histograms keep their non-empty fine buckets."""
+    state = []
+    for (name, labels), metric in list(_registry.items()):
+        entry = {"name": name, "kind": metric.kind, "help": metric.help, "labels": [list(l) for l in labels]}
+        if isinstance(metric, Histogram):
+            with metric._lock:
+                entry.update(counts=[[i, c] for i, c in enumerate(metric._counts) if c],
+                             count=metric.count, sum=metric.sum, max=metric.max)
+        else:
+            entry["value"] = metric.value
+        state.append(entry)
+    return state
+
+
+def write_state(directory, name):
+    """Atomically write export_state() to `directory/name.json`."""
+    path = os.path.join(directory, name + ".json")
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(export_state(), f)
+    os.replace(tmp, path)
+
+
+def publish(directory, name, interval=5.0):
+    """Write this process's registry to `directory` now and then every `interval` seconds."""
+    write_state(directory, name)
+
+    def loop():
+        while True:
+            time.sleep(interval)
+            try:
+                write_state(directory, name)
+            except OSError as e:
+                print(f"Could not publish metrics: {e}")
+
+    threading.Thread(target=loop, name="metrics-publish", daemon=True).start()
+
+
+def merged(directory):
+    """A registry combining every process that published to `directory`, for render()/snapshot()."""
+    registry = {}
+    for filename in sorted(os.listdir(directory)):
+        if not filename.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(directory, filename)) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            continue   # being replaced or from a worker that died mid-write
+        process = filename[:-len(".json")]
+        for entry in state:
+            labels = tuple(tuple(l) for l in entry["labels"])
+            if entry["kind"] == "gauge":
+                labels = tuple(sorted(labels + (("worker", process),)))
+            key = (entry["name"], labels)
+            metric = registry.get(key)
+            if metric is None:
+                metric = registry[key] = _KINDS[entry["kind"]](entry["name"], entry["help"], labels)
+            if isinstance(metric, Histogram):
+                for i, c in entry["counts"]:
+                    metric._counts[i] += c
+                metric.count += entry["count"]
+                metric.sum += entry["sum"]
+                metric.max = max(metric.max, entry["max"])
+            else:
+                metric.value += entry["value"]
+    return registry
@@ -0,0 +1,192 @@
+"""
+Pose sessions -> Blender rotation keyframes.
+
+A session is a JSON-lines file of pose frames as posted to /puppetry/pose
+({"quaternion": {"x", "y", "z", "w"}, "timestamp": s, "source": ...}).
+The puppetry service records them while a recording is running (pose_recorder.py):
+
+    curl -X POST localhost:5000/puppetry/recording/start -d '{"name": "take1"}' -H "Content-Type: application/json"
+    curl -X POST localhost:5000/puppetry/recording/stop
+    curl localhost:5000/puppetry/recordings/take1.jsonl -o take1.jsonl
+
+Baking resamples the (irregular) phone timestamps to one sample per scene
+frame with vectorized slerp, converts to the target's rotation mode
+(quaternion, or any Euler order, unwrapped so curves don't jump at +-pi)
+and sends every frame in one `bake_rotation` message, which the add-on
+writes with fcurve keyframe_points.foreach_set instead of one
+keyframe_insert per frame:
+
+    python pose_bake.py take1.jsonl Cube [--source phone] [--fps 30] [--mode XYZ] [--url ws://127.0.0.1:8765]
+
+Without --fps/--mode the scene frame rate and the object's current
+rotation mode are asked from the add-on.
+"""
+
+import base64
+import json
+import os
+
+import numpy as np
+
+EULER_ORDERS = ("XYZ", "XZY", "YXZ", "YZX", "ZXY", "ZYX")
+
+
+def load_session(path, source=None):
+    """Read a recording; returns (times s, quats (n, 4) as x, y, z, w) for one source.
+
+    source defaults to the first one in the file. Frames are sorted by time
+    and duplicate timestamps keep the last pose.
+    """
+    times, quats = [], []
+    with open(path) as f:
+        for line in f:
+            try:
+                frame = json.loads(line)
+            except ValueError:
+                continue   # a recording cut off mid-line
+            name = str(frame.get("source", "default"))
+            source = source if source is not None else name
+            q = frame.get("quaternion")
+            if name != source or not q:
+                continue
+            t = frame.get("timestamp")
+            times.append(t if isinstance(t, (int, float)) else frame["t_recv"])
+            quats.append((q.get("x", 0.0), q.get("y", 0.0), q.get("z", 0.0), q.get("w", 1.0)))
+    if not times:
+        raise ValueError(f"No poses for source {source!r} in {path}")
+
+    times = np.asarray(times, dtype=np.float64)
+    quats = np.asarray(quats, dtype=np.float64)
+    order = np.argsort(times, kind="stable")
+    times, quats = times[order], quats[order]
+    keep = np.append(times[1:] != times[:-1], True)
+    return times[keep], quats[keep]
+
+
+def make_continuous(quats):
+    """Normalize and flip signs so consecutive quaternions are in the same hemisphere."""
+    quats = quats / np.linalg.norm(quats, axis=1, keepdims=True)
+    dots = np.einsum("ij,ij->i", quats[1:], quats[:-1])
+    signs = np.cumprod(np.concatenate(([1.0], np.where(dots < 0, -1.0, 1.0))))
+    return quats * signs[:, None]
+
+
+def slerp_resample(times, quats, fps, start=None, end=None):
+    """Sample the rotation at every 1/fps step from start to end (default: the session).
+
+    Returns (sample times, quats (n, 4) x, y, z, w). Samples between two
+    poses are slerped; nearly identical poses fall back to normalized lerp.
+    """
+    quats = make_continuous(np.asarray(quats, dtype=np.float64))
+    times = np.asarray(times, dtype=np.float64)
+    start = times[0] if start is None else start
+    end = times[-1] if end is None else end
+    count = int(np.floor((end - start) * fps + 1e-9)) + 1
+    t = start + np.arange(count) / fps
+    if len(times) == 1:
+        return t, np.repeat(quats, count, axis=0)
+
+    i = np.clip(np.searchsorted(times, t, side="right") - 1, 0, len(times) - 2)
+    span = times[i + 1] - times[i]
+    u = np.clip((t - times[i]) / span, 0.0, 1.0)[:, None]
+    q0, q1 = quats[i], quats[i + 1]
+
+    cos = np.clip(np.einsum("ij,ij->i", q0, q1), -1.0, 1.0)[:, None]
+    theta = np.arccos(cos)
+    sin = np.sin(theta)
+    small = sin < 1e-6
+    safe = np.where(small, 1.0, sin)
+    w0 = np.where(small, 1.0 - u, np.sin((1.0 - u) * theta) / safe)
+    w1 = np.where(small, u, np.sin(u * theta) / safe)
+    out = w0 * q0 + w1 * q1
+    return t, out / np.linalg.norm(out, axis=1, keepdims=True)
+
+
+def quaternion_to_matrix(quats):
+    x, y, z, w = quats.T
+    m = np.empty((len(quats), 3, 3))
+    m[:, 0, 0] = 1 - 2 * (y * y + z * z)
+    m[:, 0, 1] = 2 * (x * y - z * w)
+    m[:, 0, 2] = 2 * (x * z + y * w)
+    m[:, 1, 0] = 2 * (x * y + z * w)
+    m[:, 1, 1] = 1 - 2 * (x * x + z * z)
+    m[:, 1, 2] = 2 * (y * z - x * w)
+    m[:, 2, 0] = 2 * (x * z - y * w)
+    m[:, 2, 1] = 2 * (y * z + x * w)
+    m[:, 2, 2] = 1 - 2 * (x * x + y * y)
+    return m
+
+
+def quaternion_to_euler(quats, order="XYZ"):
+    """Blender Euler angles (n, 3) as X, Y, Z values for `order`, unwrapped over time.
+
+    Blender's "XYZ" applies X first, so the matrix is Rz @ Ry @ Rx.
+    """
+    if order not in EULER_ORDERS:
+        raise ValueError(f"Unknown Euler order {order!r}")
+    i, j, k = ("XYZ".index(axis) for axis in order)
+    parity = -1.0 if (j - i) % 3 == 2 else 1.0   # odd permutations of XYZ
+    m = quaternion_to_matrix(np.asarray(quats, dtype=np.float64))
+
+    cy = np.hypot(m[:, i, i], m[:, j, i])
+    gimbal = cy < 1e-9
+    first = np.where(gimbal, np.arctan2(-m[:, j, k], m[:, j, j]), np.arctan2(m[:, k, j], m[:, k, k]))
+    second = np.arctan2(-m[:, k, i], cy)
+    third = np.where(gimbal, 0.0, np.arctan2(m[:, j, i], m[:, i, i]))
+
+    euler = np.empty((len(m), 3))
+    euler[:, i], euler[:, j], euler[:, k] = parity * first, parity * second, parity * third
+    return np.unwrap(euler, axis=0)
+
+
+def to_rotation_mode(quats, rotation_mode="QUATERNION"):
+    """(data path, values (n, channels)) for a Blender object's rotation mode."""
+    if rotation_mode == "QUATERNION":
+        return "rotation_quaternion", make_continuous(quats)[:, [3, 0, 1, 2]]   # Blender is w, x, y, z
+    return "rotation_euler", quaternion_to_euler(quats, rotation_mode)
+
+
+def bake_message(target, times, quats, fps, rotation_mode="QUATERNION", frame_start=1, set_range=True):
+    """The add-on's `bake_rotation` message: one float32 sample per frame, base64-packed."""
+    if rotation_mode not in ("QUATERNION",) + EULER_ORDERS:
+        raise ValueError(f"Unsupported rotation mode {rotation_mode!r} (axis-angle is not baked)")
+    _, samples = slerp_resample(times, quats, fps)
+    data_path, values = to_rotation_mode(samples, rotation_mode)
+    values = np.ascontiguousarray(values, dtype="<f4")
+    return {
+        "type": "bake_rotation",
+        "target": target,
+        "rotation_mode": rotation_mode,
+        "data_path": data_path,
+        "frame_start": frame_start,
+        "frames": len(values),
+        "channels": values.shape[1],
+        "values": base64.b64encode(values.tobytes()).decode("ascii"),
+        "set_range": set_range,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Bake a recorded pose session onto a Blender object")
+    parser.add_argument("session")
+    parser.add_argument("target")
+    parser.add_argument("--source", default=None)
+    parser.add_argument("--fps", type=float, default=None)
+    parser.add_argument("--mode", default=None, help="QUATERNION or an Euler order (default: the object's)")
+    parser.add_argument("--frame-start", type=int, default=None)
+    parser.add_argument("--url", default="ws://127.0.0.1:8765")
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "blender"))
+    from blender_session import BlenderSession
+
+    blender = BlenderSession(args.url)
+    try:
+        reply = blender.bake_pose(args.target, args.session, source=args.source, fps=args.fps,
+                                  rotation_mode=args.mode, frame_start=args.frame_start)
+    finally:
+        blender.close()
+    print(json.dumps(reply, indent=2))
@@ -0,0 +1,115 @@
+"""
+Compact binary encoding for outbound pose frames.
+
+Quaternions use "smallest three": the largest component is dropped (it is
+recovered from unit length), its index takes 2 bits and the other three
+are quantized to 18 bits each over [-1/sqrt(2), 1/sqrt(2)], 7 bytes total
+(~5e-6 resolution). A message packs the latest pose of every source:
+
+    u8 version | u8 count | f64 base time (s)
+    count x ( u8 source id | u16 ms after base | 7-byte quaternion )
+
+so 10 bytes + 10 per source instead of ~100 bytes of JSON per pose.
+Source ids are announced separately (`pose_sources`, {id: name}). Under
+several server workers each one hands out ids from its own range
+(`PoseBatcher.for_worker`), so maps from different workers never collide.
+templates/index.html has the matching JavaScript decoder.
+"""
+
+import math
+import struct
+import threading
+
+VERSION = 1
+_HEADER = struct.Struct("<BBd")
+_ENTRY = struct.Struct("<BH")
+_BITS = 18
+_MASK = (1 << _BITS) - 1
+_RANGE = 1 / math.sqrt(2)
+_SCALE = (_MASK - 1) / (2 * _RANGE)   # even step count, so 0 is exact
+_MASK56 = (1 << 56) - 1
+MAX_SOURCES = 255
+
+
+def encode_quaternion(x, y, z, w):
+    q = (x, y, z, w)
+    norm = math.sqrt(x * x + y * y + z * z + w * w) or 1.0
+    largest = max(range(4), key=lambda i: abs(q[i]))
+    sign = -1.0 if q[largest] < 0 else 1.0
+    packed = largest
+    for i in range(4):
+        if i != largest:
+            v = min(_RANGE, max(-_RANGE, sign * q[i] / norm))
+            packed = (packed << _BITS) | int(round((v + _RANGE) * _SCALE))
+    return (packed & _MASK56).to_bytes(7, "big")
+
+
+def decode_quaternion(data):
+    packed = int.from_bytes(data[:7], "big")
+    largest = packed >> (3 * _BITS)
+    small = [((packed >> shift) & _MASK) / _SCALE - _RANGE for shift in (2 * _BITS, _BITS, 0)]
+    missing = math.sqrt(max(0.0, 1.0 - sum(v * v for v in small)))
+    small.insert(largest, missing)
+    return tuple(small)
+
+
+def encode_message(base_time, entries):
+    """entries: [(source id, timestamp s, (x, y, z, w))] -> bytes."""
+    out = bytearray(_HEADER.pack(VERSION, len(entries), base_time))
+    for source_id, t, quat in entries:
+        dt_ms = min(0xFFFF, max(0, int(round((t - base_time) * 1000))))
+        out += _ENTRY.pack(source_id, dt_ms)
+        out += encode_quaternion(*quat)
+    return bytes(out)
+
+
+def decode_message(data):
+    version, count, base_time = _HEADER.unpack_from(data)
+    if version != VERSION:
+        raise ValueError(f"Unsupported pose message version {version}")
+    poses, pos = [], _HEADER.size
+    for _ in range(count):
+        source_id, dt_ms = _ENTRY.unpack_from(data, pos)
+        quat = decode_quaternion(data[pos + _ENTRY.size:pos + _ENTRY.size + 7])
+        poses.append((source_id, base_time + dt_ms / 1000.0, quat))
+        pos += _ENTRY.size + 7
+    return poses
+
+
+class PoseBatcher:
+    """Keeps the latest pose per source between flushes and packs them into one message."""
+
+    def __init__(self, first_id=0, max_ids=MAX_SOURCES):
+        self.first_id = first_id
+        self.max_ids = max_ids
+        self.source_ids = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def source_id(self, name):
+        """Id for a source name; returns (id, is_new)."""
+        with self._lock:
+            if name in self.source_ids:
+                return self.source_ids[name], False
+            if len(self.source_ids) >= self.max_ids:
+                raise ValueError("Too many pose sources")
+            self.source_ids[name] = self.first_id + len(self.source_ids)
+            return self.source_ids[name], True
+
+    @classmethod
+    def for_worker(cls, index, count):
+        """Batcher for worker `index` of `count`, owning an equal slice of the id space."""
+        per_worker = MAX_SOURCES // max(1, count)
+        return cls(first_id=index * per_worker, max_ids=per_worker)
+
+    def add(self, source_id, timestamp, quat):
+        with self._lock:
+            self._pending[source_id] = (timestamp, quat)
+
+    def drain(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return None
+        base = min(t for t, _ in pending.values())
+        return encode_message(base, [(sid, t, q) for sid, (t, q) in sorted(pending.items())])
@@ -0,0 +1,142 @@
+"""
+End-to-end latency of the puppetry pose path.
+
+    phone --HTTP--> /puppetry/pose --socketio.emit--> browser render
+
+The server stamps every frame with a sequence number, `t_recv` and
+`t_emit` (server wall clock). Browsers echo a sample of frames back as
+`pose_render` with their render time converted to server time, using an
+offset estimated NTP-style over Socket.IO (`clock_sync`: the sample with
+the smallest round trip wins). Phones never get a round trip, so each
+pose `source` has its own offset: the minimum of (t_recv - phone
+timestamp) over a sliding window. Phone->server delay is therefore
+reported above that floor.
+
+Per-hop distributions go to the `pose_hop_seconds{hop=...}` histograms in
+metrics.py and are summarised by `report()`.
+"""
+
+import threading
+import time
+from collections import deque
+
+import metrics
+
+HOPS = ("phone_to_server", "server", "emit_to_render", "end_to_end")
+
+
+class OffsetEstimator:
+    """Clock offset (remote -> server) from either round trips or one-way samples."""
+
+    def __init__(self, window=256):
+        self._samples = deque(maxlen=window)   # (rtt or one-way delta, offset)
+        self.offset = None
+        self.rtt = None
+
+    def add_round_trip(self, t0, t1, t3):
+        """t0/t3: client send/receive (client clock), t1: server time in between."""
+        rtt = t3 - t0
+        self._add(rtt, t1 - (t0 + t3) / 2)
+        self.rtt = min(s[0] for s in self._samples)
+
+    def add_one_way(self, t_remote, t_recv):
+        delta = t_recv - t_remote
+        self._add(delta, delta)
+
+    def _add(self, key, offset):
+        self._samples.append((key, offset))
+        self.offset = min(self._samples)[1]
+
+    def to_server(self, t_remote):
+        return t_remote + (self.offset or 0.0)
+
+
+class PoseLatencyTracker:
+    def __init__(self, sample_every=10):
+        self.sample_every = sample_every
+        self.phones = {}    # pose source -> OffsetEstimator (every phone has its own clock)
+        self.clients = {}   # Socket.IO sid -> OffsetEstimator
+        self.seq = 0
+        self.renders = 0
+        self._lock = threading.Lock()
+        self._hist = {hop: metrics.histogram("pose_hop_seconds", "Pose path latency per hop", hop=hop)
+                      for hop in HOPS}
+
+    def stamp_received(self, frame):
+        """Call as the frame arrives; adds seq, t_recv and whether clients should echo it."""
+        t_recv = time.time()
+        with self._lock:
+            self.seq += 1
+            frame["seq"] = self.seq
+            frame["sample"] = self.seq % self.sample_every == 0
+            phone_ts = frame.get("timestamp")
+            if isinstance(phone_ts, (int, float)):
+                phone = self.phones.setdefault(str(frame.get("source", "default")), OffsetEstimator())
+                phone.add_one_way(phone_ts, t_recv)
+                self._hist["phone_to_server"].observe(max(0.0, t_recv - phone.to_server(phone_ts)))
+        frame["t_recv"] = t_recv
+        return frame
+
+    def stamp_emit(self, frame):
+        frame["t_emit"] = time.time()
+        self._hist["server"].observe(frame["t_emit"] - frame["t_recv"])
+        return frame
+
+    def clock_sync(self, sid, t0, t1, t3):
+        with self._lock:
+            estimator = self.clients.setdefault(sid, OffsetEstimator(window=32))
+            estimator.add_round_trip(t0, t1, t3)
+
+    def record_render(self, sid, echo):
+        """Browser echo: {"t_emit", "t_render" (client clock), "timestamp" (phone clock), "source"}."""
+        estimator = self.clients.get(sid)
+        if estimator is None or estimator.offset is None or "t_render" not in echo:
+            return
+        t_render = estimator.to_server(echo["t_render"])
+        if "t_emit" in echo:
+            self._hist["emit_to_render"].observe(max(0.0, t_render - echo["t_emit"]))
+        phone = self.phones.get(str(echo.get("source", "default")))
+        if isinstance(echo.get("timestamp"), (int, float)) and phone is not None and phone.offset is not None:
+            self._hist["end_to_end"].observe(max(0.0, t_render - phone.to_server(echo["timestamp"])))
+        self.renders += 1
+
+    def forget(self, sid):
+        self.clients.pop(sid, None)
+
+    def report(self):
+        return {
+            "frames": self.seq,
+            "renders_sampled": self.renders,
+            "sample_every": self.sample_every,
+            "hops": {hop: h.summary() for hop, h in self._hist.items()},
+            "clock": {
+                "phone_offsets_s": {source: e.offset for source, e in list(self.phones.items())},
+                "clients": {sid: {"offset_s": e.offset, "rtt_ms": e.rtt and round(e.rtt * 1000, 3)}
+                            for sid, e in list(self.clients.items())},
+            },
+        }
+
+
+DASHBOARD_HTML = """
+<!doctype html>
+<html>
+  <head><meta charset="utf-8"><title>Pose latency</title>
+  <style>body{font-family:Arial,sans-serif;margin:20px}td,th{padding:4px 12px;text-align:right}</style></head>
+  <body>
+    <h3>Pose path latency (ms)</h3>
+    <table><thead><tr><th>hop</th><th>count</th><th>p50</th><th>p90</th><th>p99</th><th>max</th></tr></thead>
+    <tbody id="hops"></tbody></table>
+    <pre id="clock"></pre>
+    <script>
+      async function refresh() {
+        const r = await (await fetch("{{ json_url }}")).json();
+        document.getElementById("hops").innerHTML = Object.entries(r.hops).map(([hop, s]) =>
+          `<tr><th>${hop}</th><td>${s.count}</td><td>${s.p50_ms}</td><td>${s.p90_ms}</td><td>${s.p99_ms}</td><td>${s.max_ms}</td></tr>`).join("");
+        document.getElementById("clock").textContent =
+          `frames ${r.frames}, sampled renders ${r.renders_sampled}\\n` + JSON.stringify(r.clock, null, 2);
+      }
+      refresh(); setInterval(refresh, 1000);
+    </script>
+  </body>
+</html>
+"""
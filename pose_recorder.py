@@ -0,0 +1,157 @@
+"""
+Pose session recording for pose_bake.py.
+
+Kept free of numpy so the puppetry service can record without loading it.
+While a take is running, every frame posted to /puppetry/pose is appended
+to recordings/<name>.jsonl:
+
+    recorder = PoseRecorder()
+    recorder.start("take1")
+    recorder.add({"quaternion": {...}, "timestamp": 12.5, "source": "phone"})
+    recorder.stop()   # {"name", "file", "frames", "seconds"}
+"""
+
+import itertools
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+
+RECORDINGS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "recordings")
+ACTIVE_MARKER = ".active.json"
+_NAME = re.compile(r"^[\w.-]+$")
+
+
+class PoseRecorder:
+    """Appends incoming pose frames to RECORDINGS_DIR/<name>.jsonl while recording.
+
+    The recording state is a marker file (ACTIVE_MARKER) rather than process
+    memory, so with several server workers any of them can start or stop a
+    take and all of them append the poses they receive. Each frame is one
+    unbuffered O_APPEND write, so lines don't interleave and a download of a
+    take in progress has every frame so far.
+    """
+
+    def __init__(self, directory=RECORDINGS_DIR):
+        self.directory = directory
+        self._marker = os.path.join(directory, ACTIVE_MARKER)
+        self._raw = None       # marker bytes the open fd belongs to
+        self._active = None    # marker contents: {"name", "started"}
+        self._fd = None
+        self._lock = threading.Lock()
+
+    def _path(self, name):
+        return os.path.join(self.directory, f"{name}.jsonl")
+
+    def _read_marker(self):
+        try:
+            with open(self._marker) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _sync(self):
+        """Follow the marker: open the take it names, or close when it's gone (lock held).
+
+        Compares the marker's contents, not its stat: "started" makes them
+        unique per take, while inode and mtime can repeat across quick takes.
+        """
+        try:
+            with open(self._marker, "rb") as f:
+                raw = f.read()
+        except FileNotFoundError:
+            raw = None
+        if raw == self._raw:
+            return self._active
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        try:
+            self._raw, self._active = raw, json.loads(raw) if raw else None
+        except ValueError:
+            self._raw, self._active = raw, None
+        if self._active:
+            self._fd = os.open(self._path(self._active["name"]), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        return self._active
+
+    @property
+    def recording(self):
+        return os.path.exists(self._marker)
+
+    def _create_take(self, name=None):
+        """Create an empty take; a taken default name gets a -2, -3... suffix, a chosen one raises."""
+        base = name or time.strftime("pose_%Y%m%d-%H%M%S")
+        for n in itertools.count(1):
+            candidate = base if n == 1 else f"{base}-{n}"
+            try:
+                os.close(os.open(self._path(candidate), os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644))
+                return candidate
+            except FileExistsError:
+                if name is not None:
+                    raise RuntimeError(f"Recording {name} already exists") from None
+
+    def start(self, name=None):
+        if name is not None and not _NAME.match(name):
+            raise ValueError(f"Invalid recording name: {name!r}")
+        os.makedirs(self.directory, exist_ok=True)
+        name = self._create_take(name)
+        fd, tmp = tempfile.mkstemp(prefix=".active-", suffix=".tmp", dir=self.directory)
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"name": name, "started": time.time()}, f)
+            # link() is exclusive like O_EXCL, and the marker never exists half-written
+            os.link(tmp, self._marker)
+        except FileExistsError:
+            os.remove(self._path(name))
+            active = self._read_marker() or {}
+            raise RuntimeError(f"Already recording {active.get('name')}") from None
+        finally:
+            os.remove(tmp)
+        print(f"Recording poses to {self._path(name)}")
+        return self.status()
+
+    def add(self, frame):
+        line = (json.dumps(frame) + "\n").encode("utf-8")
+        with self._lock:
+            if self._sync() is not None:
+                os.write(self._fd, line)
+
+    def stop(self):
+        active = self._read_marker()
+        try:
+            os.remove(self._marker)
+        except FileNotFoundError:
+            raise RuntimeError("Not recording") from None
+        with self._lock:
+            self._sync()
+        if not active:
+            raise RuntimeError("Recording marker was unreadable; take left as is")
+        status = {"name": active["name"], "file": f"{active['name']}.jsonl",
+                  "frames": _count_lines(self._path(active["name"])),
+                  "seconds": round(time.time() - active["started"], 3)}
+        print(f"Recorded {status['frames']} poses to {status['file']}")
+        return status
+
+    def status(self):
+        active = self._read_marker()
+        if not active:
+            return {"recording": False, "name": None, "frames": 0}
+        return {"recording": True, "name": active["name"], "frames": _count_lines(self._path(active["name"]))}
+
+
+def _count_lines(path):
+    try:
+        with open(path, "rb") as f:
+            return sum(chunk.count(b"\n") for chunk in iter(lambda: f.read(1 << 20), b""))
+    except FileNotFoundError:
+        return 0
+
+
+def list_recordings(directory=RECORDINGS_DIR):
+    if not os.path.isdir(directory):
+        return []
+    entries = [{"file": e.name, "bytes": e.stat().st_size, "modified": e.stat().st_mtime}
+               for e in os.scandir(directory) if e.name.endswith(".jsonl")]
+    return sorted(entries, key=lambda e: e["modified"], reverse=True)
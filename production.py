@@ -0,0 +1,168 @@
+"""
+Production server for the puppetry (Socket.IO) service.
+
+    python production.py --workers 4 --port 5001
+
+The master binds the port once and starts `--workers` processes that share
+the listening socket. Workers run gevent (real async WebSockets, no
+reloader, no debugger; `pip install gevent`, threading is the fallback) and
+are joined through an in-host broker (socketio_broker.py), so a pose posted
+to any worker is broadcast to clients of all of them. Broker frames are
+signed with a secret the master generates per run and hands to its
+workers in the environment. Clients must use the WebSocket transport
+(index.html does) since there are no sticky sessions.
+
+Metrics are kept per process; each worker publishes its registry to a
+per-run directory every few seconds, and `/metrics` on any worker serves
+the merged view (counters and histograms summed across workers, gauges
+labelled by `worker`).
+
+SIGTERM/SIGINT stop accepting connections, give open ones `--grace`
+seconds to finish, then exit. Crashed workers are restarted.
+"""
+
+import argparse
+import os
+import secrets
+import signal
+import socket
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Multi-process Socket.IO server for the puppetry service")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", 5001)))
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--async-mode", choices=("gevent", "threading"), default="gevent")
+    parser.add_argument("--max-connections", type=int, default=0,
+                        help="per-worker cap on concurrent connections (gevent pool size, 0 = unlimited)")
+    parser.add_argument("--services", default="puppetry", help="comma-separated, e.g. puppetry,genassets")
+    parser.add_argument("--broker", default="127.0.0.1:6390", help="in-host broker address")
+    parser.add_argument("--grace", type=float, default=10.0, help="seconds to drain connections on shutdown")
+    parser.add_argument("--worker-fd", type=int, help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+# --- worker ----------------------------------------------------------------
+
+def run_worker(args):
+    if args.async_mode == "gevent":
+        # must happen before anything else touches sockets or threads
+        from gevent import monkey
+        monkey.patch_all()
+
+    from services import create_app
+    from socketio_broker import BrokerManager
+
+    options = {"async_mode": args.async_mode}
+    if args.workers > 1:
+        options["client_manager"] = BrokerManager(args.broker)
+    app = create_app(args.services.split(","), **options)
+    # workers share the port without sticky sessions, so polling would land on the wrong one
+    app.config["WEBSOCKET_ONLY"] = args.workers > 1
+    if os.environ.get("METRICS_DIR"):
+        import metrics
+        app.config["METRICS_DIR"] = os.environ["METRICS_DIR"]
+        app.config["METRICS_NAME"] = "worker-" + os.environ["WORKER_INDEX"]
+        metrics.publish(app.config["METRICS_DIR"], app.config["METRICS_NAME"])
+    listener = socket.socket(fileno=args.worker_fd)
+
+    if os.environ.get("ARDUINO_PORT") and os.environ.get("ARDUINO_WORKER", "0") == os.environ.get("WORKER_INDEX"):
+        from services.puppetry import start_arduino_bridge
+        start_arduino_bridge(os.environ["ARDUINO_PORT"], os.environ.get("ARDUINO_PROTOCOL", "text"))
+
+    if args.async_mode == "gevent":
+        import gevent
+        from gevent import pywsgi
+        from gevent.pool import Pool
+        spawn = Pool(args.max_connections) if args.max_connections else "default"
+        server = pywsgi.WSGIServer(listener, app, spawn=spawn, log=None)
+        gevent.signal_handler(signal.SIGTERM, server.stop, args.grace)
+        gevent.signal_handler(signal.SIGINT, server.stop, args.grace)
+        server.serve_forever()
+    else:
+        import threading
+        from werkzeug.serving import make_server
+        server = make_server(args.host, args.port, app, threaded=True, fd=listener.fileno())
+        stop = lambda *_: threading.Thread(target=server.shutdown, daemon=True).start()
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+        server.serve_forever()
+
+
+# --- master ----------------------------------------------------------------
+
+def _spawn(args, listener, index):
+    cmd = [sys.executable, os.path.abspath(__file__), "--worker-fd", str(listener.fileno())]
+    for flag in ("host", "port", "workers", "async_mode", "max_connections", "services", "broker", "grace"):
+        cmd += ["--" + flag.replace("_", "-"), str(getattr(args, flag))]
+    env = {**os.environ, "WORKER_INDEX": str(index), "WORKER_COUNT": str(args.workers)}
+    return subprocess.Popen(cmd, pass_fds=(listener.fileno(),), env=env)
+
+
+def run_master(args):
+    if args.async_mode == "gevent":
+        try:
+            import gevent  # noqa: F401
+        except ImportError:
+            print("gevent is not installed, falling back to threading workers")
+            args.async_mode = "threading"
+
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.bind((args.host, args.port))
+    listener.listen(1024)
+    listener.set_inheritable(True)
+
+    broker = metrics_dir = None
+    if args.workers > 1:
+        metrics_dir = os.environ["METRICS_DIR"] = tempfile.mkdtemp(prefix="metrics-")
+        from socketio_broker import SECRET_ENV, Broker, parse_address
+        # inherited by the workers (_spawn copies os.environ), never on the command line
+        os.environ.setdefault(SECRET_ENV, secrets.token_hex(32))
+        broker = Broker(parse_address(args.broker)).start()
+
+    workers = [_spawn(args, listener, i) for i in range(args.workers)]
+    print(f"Serving {args.services} on {args.host}:{args.port} with {args.workers} {args.async_mode} worker(s)")
+
+    stopping = []
+    def shutdown(signum, frame):
+        stopping.append(signum)
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+
+    while not stopping:
+        for i, proc in enumerate(workers):
+            if proc.poll() is not None:
+                print(f"Worker {i} exited with {proc.returncode}, restarting")
+                workers[i] = _spawn(args, listener, i)
+        time.sleep(0.5)
+
+    print("Shutting down, draining connections")
+    listener.close()
+    for proc in workers:
+        if proc.poll() is None:
+            proc.send_signal(signal.SIGTERM)
+    deadline = time.time() + args.grace + 2
+    for proc in workers:
+        try:
+            proc.wait(timeout=max(0.1, deadline - time.time()))
+        except subprocess.TimeoutExpired:
+            proc.kill()
+    if broker is not None:
+        broker.stop()
+    if metrics_dir is not None:
+        shutil.rmtree(metrics_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    arguments = _parse_args()
+    if arguments.worker_fd is not None:
+        run_worker(arguments)
+    else:
+        run_master(arguments)
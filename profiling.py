@@ -0,0 +1,136 @@
+"""
+Opt-in profiling of single Flask requests.
+
+Start the server with PROFILING=1 and ask for a profile per request:
+
+    curl -H "X-Profile: 1" localhost:5000/genassets/capturestation ...
+    curl "localhost:5000/genassets/catalog?profile=1"
+
+The request runs under cProfile, including producing the response body
+(buffered rather than streamed for that one request). The stats are
+written to profiles/ as a standard .prof file and the response carries
+its id in X-Profile-Id. Inspect them with
+
+    GET /profiles                  recent profiles (newest first)
+    GET /profiles/<id>             download the .prof (snakeviz, pstats, ...)
+    GET /profiles/<id>/summary     top functions by cumulative time
+
+Without PROFILING the middleware and routes are not installed at all, so
+requests pay nothing. cProfile follows the thread that handles the
+request; under gevent other greenlets on that thread show up too.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import re
+import threading
+import time
+
+from flask import abort, jsonify, send_from_directory
+
+PROFILE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles")
+MAX_PROFILES = 50
+HEADER = "HTTP_X_PROFILE"
+_QUERY_FLAG = re.compile(r"(?:^|&)profile=(?:1|true)(?:&|$)")
+_ID = re.compile(r"^[\w.-]+\.prof$")
+
+
+def enabled():
+    return os.environ.get("PROFILING", "").lower() in ("1", "true", "yes")
+
+
+def _wanted(environ):
+    return environ.get(HEADER, "") not in ("", "0") or bool(_QUERY_FLAG.search(environ.get("QUERY_STRING", "")))
+
+
+class ProfilerMiddleware:
+    """WSGI middleware that profiles only the requests that ask for it."""
+
+    def __init__(self, app, profile_dir=PROFILE_DIR, max_profiles=MAX_PROFILES):
+        self.app = app
+        self.profile_dir = profile_dir
+        self.max_profiles = max_profiles
+        self._lock = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        if not _wanted(environ):
+            return self.app(environ, start_response)
+
+        method, path = environ.get("REQUEST_METHOD", "GET"), environ.get("PATH_INFO", "/")
+        slug = re.sub(r"[^\w]+", "_", path).strip("_")[:60] or "root"
+        profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{int(time.time() * 1000) % 1000:03d}-{method}-{slug}.prof"
+
+        def start_with_id(status, headers, exc_info=None):
+            headers = list(headers) + [("X-Profile-Id", profile_id)]
+            return start_response(status, headers, exc_info) if exc_info else start_response(status, headers)
+
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            app_iter = self.app(environ, start_with_id)
+            try:
+                body = b"".join(app_iter)
+            finally:
+                if hasattr(app_iter, "close"):
+                    app_iter.close()
+        finally:
+            profiler.disable()
+            elapsed = time.perf_counter() - start
+            self._save(profiler, profile_id)
+        print(f"Profiled {method} {path} in {elapsed * 1000:.1f} ms -> {profile_id}")
+        return [body]
+
+    def _save(self, profiler, profile_id):
+        os.makedirs(self.profile_dir, exist_ok=True)
+        profiler.dump_stats(os.path.join(self.profile_dir, profile_id))
+        with self._lock:
+            for old in list_profiles(self.profile_dir)[self.max_profiles:]:
+                try:
+                    os.remove(os.path.join(self.profile_dir, old["id"]))
+                except OSError:
+                    pass
+
+
+def list_profiles(profile_dir=PROFILE_DIR):
+    if not os.path.isdir(profile_dir):
+        return []
+    entries = []
+    for entry in os.scandir(profile_dir):
+        if _ID.match(entry.name):
+            stat = entry.stat()
+            entries.append({"id": entry.name, "bytes": stat.st_size, "created": stat.st_mtime})
+    return sorted(entries, key=lambda e: e["created"], reverse=True)
+
+
+def summary(profile_id, profile_dir=PROFILE_DIR, limit=40, sort="cumulative"):
+    out = io.StringIO()
+    stats = pstats.Stats(os.path.join(profile_dir, profile_id), stream=out)
+    stats.strip_dirs().sort_stats(sort).print_stats(limit)
+    return out.getvalue()
+
+
+def init_app(app, profile_dir=PROFILE_DIR):
+    """Install the middleware and the /profiles routes (only call this when enabled())."""
+    app.wsgi_app = ProfilerMiddleware(app.wsgi_app, profile_dir)
+
+    @app.route("/profiles")
+    def profiles():
+        return jsonify(list_profiles(profile_dir))
+
+    @app.route("/profiles/<profile_id>")
+    def profile_download(profile_id):
+        if not _ID.match(profile_id):
+            abort(404)
+        return send_from_directory(profile_dir, profile_id, as_attachment=True,
+                                   mimetype="application/octet-stream")
+
+    @app.route("/profiles/<profile_id>/summary")
+    def profile_summary(profile_id):
+        if not _ID.match(profile_id) or not os.path.exists(os.path.join(profile_dir, profile_id)):
+            abort(404)
+        return summary(profile_id, profile_dir), 200, {"Content-Type": "text/plain; charset=utf-8"}
+
+    print(f"Request profiling enabled (X-Profile header or ?profile=1), writing to {profile_dir}")
@@ -0,0 +1 @@
+"""Capture, Replicate generation and local storage; modules import each other package-relative."""
@@ -0,0 +1,301 @@
+"""
+SQLite catalog of every object in local storage (layout in storage.py).
+
+Writers (save_generation, save_glb_only, capture) call `index_object` after
+saving, so listing and lookups are indexed queries instead of directory
+walks or guessed paths. `reindex` walks the tree incrementally (only files
+whose mtime/size changed are re-hashed) and `watch` polls it.
+
+Usage:
+    python -m replicate_utils.asset_catalog reindex
+    python -m replicate_utils.asset_catalog watch [interval_seconds]
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from .storage import MANIFEST_NAME, STORAGE_ROOT, iter_objects, object_dir, object_rel
+
+DB_NAME = "catalog.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    name TEXT PRIMARY KEY COLLATE NOCASE,
+    kind TEXT NOT NULL,
+    file_count INTEGER NOT NULL DEFAULT 0,
+    total_bytes INTEGER NOT NULL DEFAULT 0,
+    bounds TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    accessed_at REAL
+);
+CREATE INDEX IF NOT EXISTS objects_updated ON objects (updated_at DESC, name);
+CREATE INDEX IF NOT EXISTS objects_kind ON objects (kind, updated_at DESC);
+
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    object_name TEXT NOT NULL COLLATE NOCASE,
+    role TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    indexed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_object ON files (object_name, role);
+"""
+
+_ROLES = [
+    (re.compile(r"^img_[a-z]\d+\.(png|jpg)$"), "image"),
+    (re.compile(r"_lod\d+\.glb$"), "lod"),
+    (re.compile(r"_lods\.json$"), "manifest"),
+    (re.compile(r"_output\.glb$"), "glb"),
+    (re.compile(r"_color_video\.mp4$"), "video"),
+    (re.compile(r"_output_gaussian\.ply$"), "gaussian"),
+    (re.compile(r"_output_gaussian\.splatc$"), "splat"),
+]
+# static_cache's compressed copies: counted in an object's bytes, never listed as files
+_SIDECAR_SUFFIXES = (".gz", ".br")
+_SKIP_SUFFIXES = (DB_NAME, "-wal", "-shm", "-journal")
+
+
+_ready = set()   # roots whose schema this process has set up
+_ready_lock = threading.Lock()
+
+
+def connect(root=STORAGE_ROOT):
+    """Open the catalog for root; the schema is set up once per process."""
+    path = os.path.join(root, DB_NAME)
+    if root not in _ready or not os.path.exists(path):
+        _setup(root)
+    conn = sqlite3.connect(path, timeout=10)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def _setup(root):
+    """WAL mode, schema and migrations for root's catalog."""
+    with _ready_lock:
+        os.makedirs(root, exist_ok=True)
+        conn = sqlite3.connect(os.path.join(root, DB_NAME), timeout=10)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            # catalogs created before storage GC lack the last-access column
+            if "accessed_at" not in {row[1] for row in conn.execute("PRAGMA table_info(objects)")}:
+                try:
+                    conn.execute("ALTER TABLE objects ADD COLUMN accessed_at REAL")
+                except sqlite3.OperationalError:
+                    pass   # another process added it first
+        finally:
+            conn.close()
+        _ready.add(root)
+
+
+def is_lod_file(filename):
+    """True for files written by glb_postprocess next to a source GLB."""
+    return _role(filename) in ("lod", "manifest")
+
+
+def _role(filename):
+    for pattern, role in _ROLES:
+        if pattern.search(filename):
+            return role
+    return "other"
+
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _object_files(root, object_name, kind):
+    """Yield (relative path, role) for every file belonging to an object on disk."""
+    try:
+        obj_dir = object_dir(object_name, root=root)
+    except ValueError:
+        return
+    base = object_rel(object_name)
+    for dirpath, _, names in os.walk(obj_dir):
+        for name in names:
+            if name == MANIFEST_NAME or name.endswith(_SKIP_SUFFIXES) or ".tmp" in name:
+                continue
+            rel = os.path.relpath(os.path.join(dirpath, name), obj_dir).replace(os.sep, "/")
+            if name.endswith(_SIDECAR_SUFFIXES):
+                role = "sidecar"
+            # a text-to-3D asset's model is <name>.glb at the top of its directory
+            elif kind == "asset" and rel == f"{object_name}.glb":
+                role = "glb"
+            else:
+                role = _role(name)
+            yield f"{base}/{rel}", role
+
+
+def index_object(object_name, kind="generation", root=STORAGE_ROOT, conn=None):
+    """(Re)index one object's files; only changed files are re-hashed."""
+    own = conn is None
+    conn = conn or connect(root)
+    try:
+        now = time.time()
+        known = {row["path"]: row for row in conn.execute(
+            "SELECT path, size, mtime_ns FROM files WHERE object_name = ?", (object_name,))}
+
+        seen = set()
+        changed = not known
+        total = 0
+        bounds = None
+        for rel, role in _object_files(root, object_name, kind):
+            full = os.path.join(root, rel)
+            st = os.stat(full)
+            total += st.st_size
+            if role == "sidecar":
+                continue
+            seen.add(rel)
+            row = known.get(rel)
+            if row is None or row["size"] != st.st_size or row["mtime_ns"] != st.st_mtime_ns:
+                changed = True
+                conn.execute(
+                    "INSERT OR REPLACE INTO files (path, object_name, role, size, mtime_ns, sha256, indexed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (rel, object_name, role, st.st_size, st.st_mtime_ns, file_sha256(full), now))
+            if role == "manifest":
+                try:
+                    with open(full) as f:
+                        bounds = json.dumps(json.load(f).get("bounds"))
+                except (OSError, ValueError):
+                    pass
+
+        stale = [p for p in known if p not in seen]
+        previous = conn.execute("SELECT total_bytes FROM objects WHERE name = ?", (object_name,)).fetchone()
+        changed = changed or previous is None or previous["total_bytes"] != total
+        conn.executemany("DELETE FROM files WHERE path = ?", [(p,) for p in stale])
+
+        if not seen:
+            conn.execute("DELETE FROM objects WHERE name = ?", (object_name,))
+        elif changed or stale:
+            conn.execute(
+                "INSERT INTO objects (name, kind, file_count, total_bytes, bounds, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET kind = excluded.kind, file_count = excluded.file_count, "
+                "total_bytes = excluded.total_bytes, bounds = COALESCE(excluded.bounds, objects.bounds), "
+                "updated_at = excluded.updated_at",
+                (object_name, kind, len(seen), total, bounds, now, now))
+        conn.commit()
+        return len(seen)
+    finally:
+        if own:
+            conn.close()
+
+
+def reindex(root=STORAGE_ROOT):
+    """Incrementally reindex the whole tree; returns the number of objects seen."""
+    conn = connect(root)
+    try:
+        names = [(name, kind) for name, kind, _ in iter_objects(root)]
+        on_disk = {name for name, _ in names}
+        for name, kind in names:
+            index_object(name, kind, root=root, conn=conn)
+        for row in conn.execute("SELECT name FROM objects").fetchall():
+            if row["name"] not in on_disk:
+                index_object(row["name"], root=root, conn=conn)
+        return len(names)
+    finally:
+        conn.close()
+
+
+def watch(root=STORAGE_ROOT, interval=5.0):
+    """Poll-based watcher: reindex whenever an object directory's mtime changes.
+
+    Writers index their own objects, so this only catches files dropped in by hand.
+    """
+    last = None
+    while True:
+        try:
+            stamp = [(name, os.stat(path).st_mtime_ns) for name, _, path in iter_objects(root)]
+        except FileNotFoundError:
+            stamp = []
+        if stamp != last:
+            count = reindex(root)
+            print(f"Reindexed {count} objects")
+            last = stamp
+        time.sleep(interval)
+
+
+def _object_row(row):
+    data = dict(row)
+    data["bounds"] = json.loads(data["bounds"]) if data["bounds"] else None
+    return data
+
+
+def list_objects(limit=50, cursor=None, kind=None, root=STORAGE_ROOT):
+    """Newest-first page of objects; cursor is the `next_cursor` of the previous page."""
+    sql = "SELECT * FROM objects"
+    clauses, params = [], []
+    if kind:
+        clauses.append("kind = ?")
+        params.append(kind)
+    if cursor:
+        updated_at, name = cursor.split(":", 1)
+        clauses.append("(updated_at < ? OR (updated_at = ? AND name > ?))")
+        params += [float(updated_at), float(updated_at), name]
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += " ORDER BY updated_at DESC, name LIMIT ?"
+    params.append(limit)
+
+    conn = connect(root)
+    try:
+        rows = [_object_row(r) for r in conn.execute(sql, params)]
+    finally:
+        conn.close()
+    next_cursor = f"{rows[-1]['updated_at']!r}:{rows[-1]['name']}" if len(rows) == limit else None
+    return {"objects": rows, "next_cursor": next_cursor}
+
+
+def search_objects(query, limit=50, offset=0, root=STORAGE_ROOT):
+    """Case-insensitive name prefix search (uses the NOCASE primary key index)."""
+    pattern = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+    conn = connect(root)
+    try:
+        rows = conn.execute(
+            "SELECT * FROM objects WHERE name LIKE ? ESCAPE '\\' ORDER BY name LIMIT ? OFFSET ?",
+            (pattern, limit, offset)).fetchall()
+    finally:
+        conn.close()
+    return {"objects": [_object_row(r) for r in rows], "offset": offset, "limit": limit}
+
+
+def get_object(object_name, root=STORAGE_ROOT):
+    """Object row plus its files grouped by role, or None if not cataloged."""
+    conn = connect(root)
+    try:
+        row = conn.execute("SELECT * FROM objects WHERE name = ?", (object_name,)).fetchone()
+        if row is None:
+            return None
+        files = conn.execute(
+            "SELECT path, role, size, sha256 FROM files WHERE object_name = ? ORDER BY path",
+            (object_name,)).fetchall()
+    finally:
+        conn.close()
+
+    data = _object_row(row)
+    data["files"] = {}
+    for f in files:
+        data["files"].setdefault(f["role"], []).append(dict(f))
+    return data
+
+
+if __name__ == "__main__":
+    import sys
+    command = sys.argv[1] if len(sys.argv) > 1 else "reindex"
+    if command == "watch":
+        watch(interval=float(sys.argv[2]) if len(sys.argv) > 2 else 5.0)
+    else:
+        print(f"Indexed {reindex()} objects")
@@ -0,0 +1,229 @@
+"""
+Per-camera calibration for the capture rig.
+
+Run once per camera with a printed checkerboard:
+
+    python camera_calibration.py calibrate 0 --board 9x6 --square 0.025
+    python camera_calibration.py calibrate 2 --images shots/cam2/*.png
+
+This solves the intrinsics and lens distortion (cv2.calibrateCamera) and a
+per-channel color correction that maps the board's black and white squares
+to the same neutral levels on every camera, so views from different cameras
+agree. Results are saved to calibration/cam<index>.npz.
+
+At capture time a `Rectifier` builds the undistortion remap tables
+(fixed-point, CV_16SC2) and a 256-entry per-channel LUT once, so each
+frame costs one cv2.LUT and one cv2.remap:
+
+    rectify = load_rectifier(0)
+    frame = rectify(frame)
+
+Cameras without a calibration file pass frames through unchanged.
+"""
+
+import glob
+import os
+
+import cv2
+import numpy as np
+
+CALIBRATION_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "calibration")
+BOARD = (9, 6)          # inner corners per row, per column
+SQUARE_SIZE = 0.025     # meters; only scales the extrinsics
+BLACK_LEVEL = 24        # target levels for the board's squares after correction
+WHITE_LEVEL = 232
+MIN_VIEWS = 8
+
+
+def calibration_path(camera):
+    return os.path.join(CALIBRATION_DIR, f"cam{camera}.npz")
+
+
+def _find_corners(gray, board):
+    found, corners = cv2.findChessboardCorners(
+        gray, board, cv2.CALIB_CB_ADAPTIVE_THRESH | cv2.CALIB_CB_NORMALIZE_IMAGE | cv2.CALIB_CB_FAST_CHECK)
+    if not found:
+        return None
+    criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 1e-3)
+    return cv2.cornerSubPix(gray, corners, (11, 11), (-1, -1), criteria)
+
+
+def _square_colors(frame, corners, board):
+    """Mean BGR of the dark and light squares between the detected corners."""
+    grid = corners.reshape(board[1], board[0], 2)
+    # centers of the inner squares and their checker parity
+    centers = (grid[:-1, :-1] + grid[1:, 1:] + grid[:-1, 1:] + grid[1:, :-1]) / 4
+    parity = (np.add.outer(np.arange(board[1] - 1), np.arange(board[0] - 1)) % 2).astype(bool)
+    # sample a patch a quarter of a square wide around each center
+    radius = max(1, int(np.linalg.norm(grid[0, 1] - grid[0, 0]) / 4))
+    offsets = np.arange(-radius, radius + 1)
+    xs = np.clip(np.rint(centers[..., 0])[..., None, None] + offsets[None, :], 0, frame.shape[1] - 1).astype(int)
+    ys = np.clip(np.rint(centers[..., 1])[..., None, None] + offsets[:, None], 0, frame.shape[0] - 1).astype(int)
+    means = frame[ys, xs].reshape(*centers.shape[:2], -1, 3).mean(axis=2)
+    a, b = means[parity].mean(axis=0), means[~parity].mean(axis=0)
+    return (a, b) if a.sum() < b.sum() else (b, a)
+
+
+def color_lut(black, white, black_level=BLACK_LEVEL, white_level=WHITE_LEVEL):
+    """(256, 1, 3) uint8 LUT mapping each channel's black/white to the target levels."""
+    values = np.arange(256, dtype=np.float32)[:, None]
+    black, white = np.asarray(black, np.float32), np.asarray(white, np.float32)
+    gain = (white_level - black_level) / np.maximum(white - black, 1.0)
+    lut = (values - black) * gain + black_level
+    return np.clip(np.rint(lut), 0, 255).astype(np.uint8).reshape(256, 1, 3)
+
+
+def calibrate(frames, board=BOARD, square_size=SQUARE_SIZE):
+    """Solve intrinsics, distortion and color correction from BGR checkerboard frames."""
+    objp = np.zeros((board[0] * board[1], 3), np.float32)
+    objp[:, :2] = np.mgrid[0:board[0], 0:board[1]].T.reshape(-1, 2) * square_size
+
+    object_points, image_points, blacks, whites = [], [], [], []
+    size = None
+    for frame in frames:
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        if size is None:
+            size = gray.shape[::-1]
+        elif gray.shape[::-1] != size:
+            raise ValueError("All calibration frames must have the same size")
+        corners = _find_corners(gray, board)
+        if corners is None:
+            continue
+        object_points.append(objp)
+        image_points.append(corners)
+        black, white = _square_colors(frame, corners, board)
+        blacks.append(black)
+        whites.append(white)
+
+    if len(image_points) < MIN_VIEWS:
+        raise ValueError(f"Checkerboard found in {len(image_points)} frames, need at least {MIN_VIEWS}")
+
+    rms, camera_matrix, dist, _, _ = cv2.calibrateCamera(object_points, image_points, size, None, None)
+    return {
+        "camera_matrix": camera_matrix,
+        "dist_coeffs": dist,
+        "image_size": np.array(size),
+        "black": np.median(blacks, axis=0),
+        "white": np.median(whites, axis=0),
+        "rms": np.array(rms),
+        "views": np.array(len(image_points)),
+    }
+
+
+def save_calibration(camera, calibration):
+    os.makedirs(CALIBRATION_DIR, exist_ok=True)
+    path = calibration_path(camera)
+    tmp = path + ".tmp.npz"
+    np.savez(tmp, **calibration)
+    os.replace(tmp, path)
+    return path
+
+
+class Rectifier:
+    """Undistorts and color-corrects frames with tables computed once per frame size."""
+
+    def __init__(self, calibration, alpha=0.0):
+        self.camera_matrix = calibration["camera_matrix"]
+        self.dist_coeffs = calibration["dist_coeffs"]
+        self.image_size = tuple(int(v) for v in calibration["image_size"])
+        self.lut = color_lut(calibration["black"], calibration["white"])
+        self.alpha = alpha
+        self._maps = {}
+
+    def _maps_for(self, width, height):
+        key = (width, height)
+        if key not in self._maps:
+            # intrinsics scale with resolution if the camera runs at a different size
+            camera_matrix = self.camera_matrix.copy()
+            camera_matrix[0] *= width / self.image_size[0]
+            camera_matrix[1] *= height / self.image_size[1]
+            new_matrix, _ = cv2.getOptimalNewCameraMatrix(
+                camera_matrix, self.dist_coeffs, (width, height), self.alpha, (width, height))
+            self._maps[key] = cv2.initUndistortRectifyMap(
+                camera_matrix, self.dist_coeffs, None, new_matrix, (width, height), cv2.CV_16SC2)
+        return self._maps[key]
+
+    def __call__(self, frame):
+        map1, map2 = self._maps_for(frame.shape[1], frame.shape[0])
+        return cv2.remap(cv2.LUT(frame, self.lut), map1, map2, cv2.INTER_LINEAR)
+
+
+_loaded = {}   # camera -> (calibration file mtime, Rectifier)
+
+
+def load_rectifier(camera):
+    """Rectifier for a camera index, or a pass-through if it hasn't been calibrated.
+
+    Rectifiers (and their remap tables) are reused until the calibration file changes.
+    """
+    path = calibration_path(camera)
+    if not os.path.exists(path):
+        print(f"No calibration for camera {camera} ({path}), using raw frames")
+        return lambda frame: frame
+    mtime = os.path.getmtime(path)
+    cached = _loaded.get(camera)
+    if cached is None or cached[0] != mtime:
+        with np.load(path) as data:
+            cached = _loaded[camera] = (mtime, Rectifier(dict(data)))
+    return cached[1]
+
+
+def _live_frames(camera, board, count):
+    """Preview a camera and keep frames where the board is found (space to grab, q to finish)."""
+    capture = cv2.VideoCapture(camera)
+    if not capture.isOpened():
+        raise RuntimeError(f"Could not open camera {camera}")
+    print(f"Camera {camera}: move the board around, press space to grab a view, q when done.")
+    frames = []
+    try:
+        while len(frames) < count:
+            ret, frame = capture.read()
+            if not ret:
+                continue
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            found, corners = cv2.findChessboardCorners(gray, board, cv2.CALIB_CB_FAST_CHECK)
+            preview = frame.copy()
+            cv2.drawChessboardCorners(preview, board, corners, found)
+            cv2.putText(preview, f"{len(frames)}/{count}", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+            cv2.imshow(f"Calibrate cam {camera}", preview)
+            key = cv2.waitKey(1) & 0xFF
+            if key == ord(" ") and found:
+                frames.append(frame)
+            elif key == ord("q"):
+                break
+    finally:
+        capture.release()
+        cv2.destroyAllWindows()
+    return frames
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Calibrate a capture camera")
+    sub = parser.add_subparsers(dest="command", required=True)
+    cal = sub.add_parser("calibrate")
+    cal.add_argument("camera", type=int)
+    cal.add_argument("--board", default=f"{BOARD[0]}x{BOARD[1]}", help="inner corners, e.g. 9x6")
+    cal.add_argument("--square", type=float, default=SQUARE_SIZE)
+    cal.add_argument("--views", type=int, default=20)
+    cal.add_argument("--images", nargs="*", help="calibrate from saved frames instead of the live camera")
+    show = sub.add_parser("show")
+    show.add_argument("camera", type=int)
+    args = parser.parse_args()
+
+    if args.command == "calibrate":
+        board = tuple(int(v) for v in args.board.lower().split("x"))
+        if args.images:
+            paths = [p for pattern in args.images for p in sorted(glob.glob(pattern))]
+            frames = [cv2.imread(p, cv2.IMREAD_COLOR) for p in paths]
+        else:
+            frames = _live_frames(args.camera, board, args.views)
+        result = calibrate(frames, board, args.square)
+        path = save_calibration(args.camera, result)
+        print(f"Camera {args.camera}: rms reprojection error {float(result['rms']):.3f}px "
+              f"over {int(result['views'])} views, saved to {path}")
+    else:
+        with np.load(calibration_path(args.camera)) as data:
+            for key in data.files:
+                print(f"{key}: {data[key].tolist()}")
@@ -1,18 +1,35 @@
 import cv2
 import os
-from replicate_helper import send_to_replicate
+import time
+import metrics
+from . import storage
+from .camera_calibration import load_rectifier
+from .frame_ring import open_camera
+from .replicate_helper import catalog_object, send_to_replicate
+
+CAMERAS = (0, 2)
+
+
+def _rectified(rectify_0, frame0, rectify_1, frame1):
+    start = time.perf_counter()
+    frames = rectify_0(frame0), rectify_1(frame1)
+    metrics.histogram("capture_station_seconds", "Duration of capture_station stages",
+                      stage="rectify").observe(time.perf_counter() - start)
+    return frames
 
 
 def capture_and_process(name):
     """Capture from webcams and process through replicate_utils automatically"""
-    # Create local storage directory for this capture (like original)
-    curr_obj = "local_storage/" + name
-    os.makedirs(curr_obj, exist_ok=True)
+    # Create the managed storage directory for this capture (see storage.py)
+    curr_obj = storage.object_dir(name, create=True)
     
     try:
-        # Initialize webcams (same as original code)
-        video_capture_0 = cv2.VideoCapture(0)
-        video_capture_1 = cv2.VideoCapture(2)
+        capture_start = time.perf_counter()
+        # Initialize webcams; reads from the shared-memory rings if `frame_ring.py serve` owns them
+        video_capture_0 = open_camera(CAMERAS[0])
+        video_capture_1 = open_camera(CAMERAS[1])
+        rectify_0 = load_rectifier(CAMERAS[0])
+        rectify_1 = load_rectifier(CAMERAS[1])
         
         if not video_capture_0.isOpened() or not video_capture_1.isOpened():
             raise Exception("Could not access webcams")
@@ -24,6 +41,9 @@ def capture_and_process(name):
         if not ret0 or not ret1:
             raise Exception("Failed to capture from webcams")
         
+        # Undistort and color-match with the precomputed tables (camera_calibration.py)
+        frame0, frame1 = _rectified(rectify_0, frame0, rectify_1, frame1)
+        
         # Save first images to local storage
         img_a1_path = os.path.join(curr_obj, "img_a1.png")
         img_b1_path = os.path.join(curr_obj, "img_b1.png")
@@ -42,6 +62,8 @@ def capture_and_process(name):
         if not ret0 or not ret1:
             raise Exception("Failed to capture second set from webcams")
         
+        frame0, frame1 = _rectified(rectify_0, frame0, rectify_1, frame1)
+        
         # Save second images to local storage
         img_a2_path = os.path.join(curr_obj, "img_a2.png")
         img_b2_path = os.path.join(curr_obj, "img_b2.png")
@@ -51,6 +73,9 @@ def capture_and_process(name):
         # Release webcams
         video_capture_0.release()
         video_capture_1.release()
+        metrics.histogram("capture_station_seconds", "Duration of capture_station stages",
+                          stage="capture").observe(time.perf_counter() - capture_start)
+        catalog_object(name)
         
         # Run replicate_utils with the 4 images
         abs_paths = [img_a1_path, img_b1_path, img_a2_path, img_b2_path]
@@ -0,0 +1,338 @@
+"""
+Shared-memory ring of camera frames.
+
+One capture process per camera decodes straight into preallocated slots of
+a `multiprocessing.shared_memory` block; encoders, quality checks and
+previews in other processes attach by name and get NumPy views of the same
+memory, so frames are never pickled or copied between processes.
+
+Layout (one block per camera, named ring_name(camera)):
+
+    int64[8]      magic, version, slots, height, width, channels, head, writer pid
+    int64[slots]  sequence number of the frame in each slot
+    float64[slots] capture timestamp of each slot
+    slots x frame (uint8, height x width x channels, 64-byte aligned)
+
+Frames are numbered from 1 and frame `seq` lives in slot (seq - 1) % slots.
+The single writer marks a slot -seq while filling it and seq once complete,
+then advances head. A reader takes a view of a slot whose sequence number
+matches and calls `valid(seq)` when done with it: if the writer lapped the
+ring in the meantime the frame was overwritten and should be dropped.
+A ring whose writer pid is still alive is never replaced, so a second
+`serve` for the same camera refuses to start instead of pulling the block
+out from under the running one.
+
+    python frame_ring.py serve 0 2      # capture processes for cameras 0 and 2
+    python frame_ring.py watch 0        # consumer: prints fps and lag
+
+capture_station uses `open_camera`, which reads from a ring when one is
+being served for that camera and opens the camera directly otherwise.
+"""
+
+import os
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+MAGIC = 0x464D5247   # "FMRG"
+VERSION = 1
+DEFAULT_SLOTS = 8
+_ALIGN = 64
+
+
+def ring_name(camera):
+    return f"adc_frames_cam{camera}"
+
+
+def _aligned(n):
+    return (n + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def _attach(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)   # Python 3.13+
+    except TypeError:
+        pass
+    # before 3.13 attaching registers the block with the resource tracker, which
+    # unlinks it when this process exits, so skip the registration
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def live_writer(name):
+    """Pid of the process serving ring `name`, or None if there is no ring or its writer is gone."""
+    try:
+        shm = _attach(name)
+    except FileNotFoundError:
+        return None
+    try:
+        if shm.size < 64:
+            return None
+        meta = np.ndarray((8,), np.int64, shm.buf, 0)
+        magic, pid = int(meta[0]), int(meta[7])
+        del meta
+    finally:
+        shm.close()
+    return pid if magic == MAGIC and pid > 0 and _pid_alive(pid) else None
+
+
+class FrameRing:
+    """Fixed-size ring of uint8 frames in shared memory (one writer, any number of readers)."""
+
+    def __init__(self, shm, owner):
+        self.shm = shm
+        self.owner = owner
+        self.meta = np.ndarray((8,), np.int64, shm.buf, 0)
+        if self.meta[0] != MAGIC or self.meta[1] != VERSION:
+            raise ValueError(f"{shm.name} is not a frame ring")
+        self.slots = int(self.meta[2])
+        self.shape = tuple(int(v) for v in self.meta[3:6])
+        offset = self.meta.nbytes
+        self.slot_seq = np.ndarray((self.slots,), np.int64, shm.buf, offset)
+        offset += self.slot_seq.nbytes
+        self.slot_time = np.ndarray((self.slots,), np.float64, shm.buf, offset)
+        offset = _aligned(offset + self.slot_time.nbytes)
+        stride = _aligned(int(np.prod(self.shape)))
+        self._frames = [np.ndarray(self.shape, np.uint8, shm.buf, offset + i * stride) for i in range(self.slots)]
+        self.dropped = 0
+
+    @classmethod
+    def create(cls, name, shape, slots=DEFAULT_SLOTS):
+        shape = tuple(shape) + (1,) * (3 - len(shape))
+        header = _aligned(8 * 8 + slots * 16)
+        size = header + slots * _aligned(int(np.prod(shape)))
+        pid = live_writer(name)
+        if pid is not None:
+            raise RuntimeError(f"{name} is already being served by pid {pid}")
+        try:
+            stale = _attach(name)
+            stale.close()
+            stale.unlink()   # left behind by a capture process that was killed
+        except FileNotFoundError:
+            pass
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        meta = np.ndarray((8,), np.int64, shm.buf, 0)
+        meta[:] = (MAGIC, VERSION, slots, shape[0], shape[1], shape[2], 0, os.getpid())
+        np.ndarray((slots,), np.int64, shm.buf, meta.nbytes)[:] = 0
+        del meta
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name):
+        """Attach to an existing ring; raises FileNotFoundError if nobody serves it."""
+        return cls(_attach(name), owner=False)
+
+    @property
+    def head(self):
+        """Sequence number of the newest complete frame (0 if none yet)."""
+        return int(self.meta[6])
+
+    # --- writer ------------------------------------------------------------
+
+    def claim(self):
+        """Next slot to fill; returns (seq, writable view). Follow with publish() or abort()."""
+        seq = self.head + 1
+        slot = (seq - 1) % self.slots
+        self.slot_seq[slot] = -seq
+        return seq, self._frames[slot]
+
+    def publish(self, seq, timestamp=None):
+        slot = (seq - 1) % self.slots
+        self.slot_time[slot] = time.time() if timestamp is None else timestamp
+        self.slot_seq[slot] = seq
+        self.meta[6] = seq
+
+    def abort(self, seq):
+        self.slot_seq[(seq - 1) % self.slots] = 0
+
+    def write(self, frame, timestamp=None):
+        if frame.size != int(np.prod(self.shape)):
+            raise ValueError(f"Frame shape {frame.shape} does not match ring shape {self.shape}")
+        seq, view = self.claim()
+        np.copyto(view, frame.reshape(view.shape))
+        self.publish(seq, timestamp)
+        return seq
+
+    # --- readers -----------------------------------------------------------
+
+    def get(self, seq):
+        """(view, timestamp) for frame seq, or None if it isn't in the ring (yet or anymore)."""
+        slot = (seq - 1) % self.slots
+        if seq <= 0 or self.slot_seq[slot] != seq:
+            return None
+        return self._frames[slot], float(self.slot_time[slot])
+
+    def valid(self, seq):
+        """True while frame seq hasn't been overwritten; check after using a view from get()."""
+        return seq > 0 and self.slot_seq[(seq - 1) % self.slots] == seq
+
+    def wait(self, after=0, timeout=1.0, poll=0.0005):
+        """Block until a frame newer than `after` is published; returns the head or None."""
+        deadline = time.monotonic() + timeout
+        while True:
+            head = self.head
+            if head > after:
+                return head
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(poll)
+
+    def frames(self, timeout=1.0, latest_only=False):
+        """Follow the writer, yielding (seq, timestamp, view).
+
+        Views are only good until the writer laps the ring; check valid(seq)
+        after using one. Frames the reader fell too far behind on are skipped
+        and counted in `self.dropped`. With latest_only, jumps straight to the
+        newest frame each time.
+        """
+        last = self.head
+        while True:
+            head = self.wait(last, timeout)
+            if head is None:
+                return
+            start = head if latest_only else max(last + 1, head - self.slots + 1)
+            self.dropped += start - last - 1
+            for seq in range(start, head + 1):
+                item = self.get(seq)
+                if item is None:
+                    self.dropped += 1
+                    continue
+                view, timestamp = item
+                yield seq, timestamp, view
+            last = head
+
+    def close(self):
+        # drop our views before closing, or SharedMemory.close() raises BufferError
+        self.meta = self.slot_seq = self.slot_time = None
+        self._frames = []
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class RingCapture:
+    """cv2.VideoCapture look-alike over a FrameRing: read() returns the next new frame as a copy."""
+
+    def __init__(self, ring, timeout=2.0):
+        self.ring = ring
+        self.timeout = timeout
+        self._last = ring.head
+
+    def isOpened(self):
+        return self.ring is not None
+
+    def read(self):
+        while True:
+            head = self.ring.wait(self._last, self.timeout)
+            if head is None:
+                return False, None
+            item = self.ring.get(head)
+            if item is None:
+                continue
+            frame = item[0].copy()
+            if self.ring.valid(head):
+                self._last = head
+                return True, frame
+
+    def release(self):
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
+
+
+def open_camera(camera):
+    """A ring reader if `frame_ring.py serve` is running for this camera, else cv2.VideoCapture."""
+    try:
+        return RingCapture(FrameRing.attach(ring_name(camera)))
+    except FileNotFoundError:
+        import cv2
+        return cv2.VideoCapture(camera)
+
+
+def run_capture(camera, slots=DEFAULT_SLOTS, width=None, height=None, stop=None):
+    """Capture loop for one camera: decodes directly into ring slots until `stop` is set."""
+    import cv2
+
+    # check before opening the camera, which the running writer holds
+    pid = live_writer(ring_name(camera))
+    if pid is not None:
+        raise RuntimeError(f"Camera {camera} is already being served by pid {pid}")
+    capture = cv2.VideoCapture(camera)
+    if width:
+        capture.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+    if height:
+        capture.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    ret, frame = capture.read()
+    if not ret:
+        raise RuntimeError(f"Could not read from camera {camera}")
+
+    ring = FrameRing.create(ring_name(camera), frame.shape, slots)
+    print(f"Camera {camera}: serving {frame.shape[1]}x{frame.shape[0]} frames in {ring.shm.name} ({slots} slots)")
+    try:
+        while stop is None or not stop.is_set():
+            seq, view = ring.claim()
+            # VideoCapture.read fills the array it is given, so this is the only copy
+            ret, _ = capture.read(view)
+            if ret:
+                ring.publish(seq)
+            else:
+                ring.abort(seq)
+                time.sleep(0.01)
+    finally:
+        capture.release()
+        ring.close()
+
+
+if __name__ == "__main__":
+    import argparse
+    import multiprocessing
+
+    parser = argparse.ArgumentParser(description="Shared-memory camera frame rings")
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve = sub.add_parser("serve", help="run one capture process per camera")
+    serve.add_argument("cameras", type=int, nargs="+")
+    serve.add_argument("--slots", type=int, default=DEFAULT_SLOTS)
+    serve.add_argument("--width", type=int)
+    serve.add_argument("--height", type=int)
+    watch = sub.add_parser("watch", help="follow a ring and print fps / lag")
+    watch.add_argument("camera", type=int)
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        stop = multiprocessing.Event()
+        procs = [multiprocessing.Process(target=run_capture, args=(c, args.slots, args.width, args.height, stop))
+                 for c in args.cameras]
+        for p in procs:
+            p.start()
+        try:
+            for p in procs:
+                p.join()
+        except KeyboardInterrupt:
+            stop.set()
+            for p in procs:
+                p.join()
+    else:
+        ring = FrameRing.attach(ring_name(args.camera))
+        count, window = 0, time.time()
+        for seq, timestamp, view in ring.frames(timeout=5.0):
+            count += 1
+            if time.time() - window >= 1.0:
+                print(f"seq {seq}: {count / (time.time() - window):.1f} fps, "
+                      f"lag {(time.time() - timestamp) * 1000:.1f} ms, dropped {ring.dropped}")
+                count, window = 0, time.time()
+        ring.close()
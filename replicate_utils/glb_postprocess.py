@@ -0,0 +1,345 @@
+"""
+GLB post-processing for generated assets.
+
+Takes a Trellis output GLB and writes lighter LOD variants next to it:
+  - centered and scaled to a fixed size (via a new root node)
+  - decimated by vertex clustering (seams kept by clustering on UVs too)
+  - attributes quantized with KHR_mesh_quantization
+  - textures downscaled and re-encoded
+
+Only static meshes are supported: the LOD gets a fresh set of accessors,
+so inputs with skins, morph targets or animations are rejected rather than
+written with dangling references.
+
+A `<name>_lods.json` manifest records bounds and the variants, lightest last,
+so `/genassets/models` can advertise them to the viewer. LOD files from an
+earlier build that the new set no longer has are removed.
+"""
+
+import json
+import os
+import re
+
+import cv2
+import numpy as np
+import pygltflib
+import trimesh
+
+# Grid resolution per axis for clustering (None keeps full geometry)
+DEFAULT_LODS = [
+    {"name": "lod0", "grid": None, "texture_size": 2048},
+    {"name": "lod1", "grid": 160, "texture_size": 1024},
+    {"name": "lod2", "grid": 64, "texture_size": 512},
+]
+TARGET_SIZE = 1.0
+JPEG_QUALITY = 88
+
+_COMPONENT_DTYPES = {
+    pygltflib.BYTE: np.int8,
+    pygltflib.UNSIGNED_BYTE: np.uint8,
+    pygltflib.SHORT: np.int16,
+    pygltflib.UNSIGNED_SHORT: np.uint16,
+    pygltflib.UNSIGNED_INT: np.uint32,
+    pygltflib.FLOAT: np.float32,
+}
+_TYPE_WIDTHS = {"SCALAR": 1, "VEC2": 2, "VEC3": 3, "VEC4": 4, "MAT4": 16}
+_QUANTIZATION_EXT = "KHR_mesh_quantization"
+
+
+def _read_accessor(gltf, blob, index):
+    """Read an accessor into a float or integer numpy array of shape (count, width)."""
+    acc = gltf.accessors[index]
+    if acc.sparse is not None:
+        raise ValueError("Sparse accessors are not supported")
+    view = gltf.bufferViews[acc.bufferView]
+    dtype = np.dtype(_COMPONENT_DTYPES[acc.componentType])
+    width = _TYPE_WIDTHS[acc.type]
+    offset = (view.byteOffset or 0) + (acc.byteOffset or 0)
+    stride = view.byteStride or dtype.itemsize * width
+
+    raw = np.frombuffer(blob, dtype=np.uint8, count=stride * (acc.count - 1) + dtype.itemsize * width,
+                        offset=offset)
+    rows = np.lib.stride_tricks.as_strided(raw, shape=(acc.count, dtype.itemsize * width),
+                                           strides=(stride, 1))
+    data = np.ascontiguousarray(rows).view(dtype).reshape(acc.count, width)
+
+    if acc.normalized:
+        info = np.iinfo(dtype)
+        data = np.maximum(data.astype(np.float32) / info.max, -1.0)
+    return data
+
+
+class _BlobWriter:
+    """Accumulates buffer views and accessors for a rebuilt GLB."""
+
+    def __init__(self):
+        self.chunks = []
+        self.size = 0
+        self.bufferViews = []
+        self.accessors = []
+
+    def view(self, data: bytes, stride=None, target=None):
+        pad = (-self.size) % 4
+        if pad:
+            self.chunks.append(b"\x00" * pad)
+            self.size += pad
+        self.bufferViews.append(pygltflib.BufferView(
+            buffer=0, byteOffset=self.size, byteLength=len(data), byteStride=stride, target=target))
+        self.chunks.append(data)
+        self.size += len(data)
+        return len(self.bufferViews) - 1
+
+    def accessor(self, array, component_type, acc_type, count, stride=None, target=None,
+                 normalized=False, minmax=None):
+        view = self.view(array.tobytes(), stride=stride, target=target)
+        acc = pygltflib.Accessor(bufferView=view, componentType=component_type, count=count,
+                                 type=acc_type, normalized=normalized)
+        if minmax is not None:
+            acc.min, acc.max = [v.tolist() for v in minmax]
+        self.accessors.append(acc)
+        return len(self.accessors) - 1
+
+    def blob(self):
+        return b"".join(self.chunks)
+
+
+def _cluster(positions, uvs, faces, grid, lo, extent):
+    """Vertex-clustering decimation; returns (representative per cluster, cluster per vertex, new faces)."""
+    cell = max(float(extent.max()), 1e-9) / grid
+    keys = np.floor((positions - lo) / cell).astype(np.int64)
+    if uvs is not None:
+        # keep texture seams: vertices only merge if their UVs land in the same cell
+        keys = np.hstack([keys, np.floor(uvs * grid * 4).astype(np.int64)])
+
+    unique, inverse = trimesh.grouping.unique_rows(keys)
+    new_faces = inverse[faces]
+    keep = ((new_faces[:, 0] != new_faces[:, 1]) &
+            (new_faces[:, 1] != new_faces[:, 2]) &
+            (new_faces[:, 0] != new_faces[:, 2]))
+    new_faces = new_faces[keep]
+    if len(new_faces):
+        new_faces = new_faces[trimesh.grouping.unique_rows(np.sort(new_faces, axis=1))[0]]
+    return unique, inverse, new_faces
+
+
+def _write_primitive(writer, gltf, blob, prim, grid, dequant):
+    """Decimate and quantize one triangle primitive into the writer."""
+    center, half = dequant
+    attrs = {name: _read_accessor(gltf, blob, idx)
+             for name, idx in prim.attributes.__dict__.items() if idx is not None}
+    positions = attrs["POSITION"].astype(np.float64)
+    if prim.indices is not None:
+        faces = _read_accessor(gltf, blob, prim.indices).reshape(-1, 3).astype(np.int64)
+    else:
+        faces = np.arange(len(positions), dtype=np.int64).reshape(-1, 3)
+
+    if grid:
+        lo, hi = positions.min(axis=0), positions.max(axis=0)
+        reps, inverse, faces = _cluster(positions, attrs.get("TEXCOORD_0"), faces, grid, lo, hi - lo)
+        counts = np.bincount(inverse, minlength=len(reps)).astype(np.float64)[:, None]
+        for name, data in attrs.items():
+            if data.dtype.kind == "f":
+                summed = np.zeros((len(reps), data.shape[1]))
+                np.add.at(summed, inverse, data)
+                attrs[name] = (summed / counts).astype(np.float32)
+            else:
+                attrs[name] = data[reps]
+        positions = attrs["POSITION"].astype(np.float64)
+
+    count = len(positions)
+    new_attrs = {}
+    for name, data in attrs.items():
+        if name == "POSITION":
+            q = np.round((positions - center) / half * 32767).clip(-32767, 32767).astype(np.int16)
+            padded = np.zeros((count, 4), dtype=np.int16)
+            padded[:, :3] = q
+            new_attrs[name] = writer.accessor(padded, pygltflib.SHORT, "VEC3", count, stride=8,
+                                              target=pygltflib.ARRAY_BUFFER,
+                                              minmax=(q.min(axis=0), q.max(axis=0)))
+        elif name == "NORMAL":
+            n = data / np.maximum(np.linalg.norm(data, axis=1, keepdims=True), 1e-12)
+            padded = np.zeros((count, 4), dtype=np.int8)
+            padded[:, :3] = np.round(n * 127).astype(np.int8)
+            new_attrs[name] = writer.accessor(padded, pygltflib.BYTE, "VEC3", count, stride=4,
+                                              target=pygltflib.ARRAY_BUFFER, normalized=True)
+        elif name.startswith("TEXCOORD") and data.min() >= 0.0 and data.max() <= 1.0:
+            q = np.round(data * 65535).astype(np.uint16)
+            new_attrs[name] = writer.accessor(q, pygltflib.UNSIGNED_SHORT, "VEC2", count,
+                                              target=pygltflib.ARRAY_BUFFER, normalized=True)
+        else:
+            acc_type = {1: "SCALAR", 2: "VEC2", 3: "VEC3", 4: "VEC4"}[data.shape[1]]
+            new_attrs[name] = writer.accessor(data.astype(np.float32), pygltflib.FLOAT, acc_type,
+                                              count, target=pygltflib.ARRAY_BUFFER)
+
+    if count < 65536:
+        indices = writer.accessor(faces.astype(np.uint16), pygltflib.UNSIGNED_SHORT, "SCALAR",
+                                  faces.size, target=pygltflib.ELEMENT_ARRAY_BUFFER)
+    else:
+        indices = writer.accessor(faces.astype(np.uint32), pygltflib.UNSIGNED_INT, "SCALAR",
+                                  faces.size, target=pygltflib.ELEMENT_ARRAY_BUFFER)
+
+    prim.attributes = pygltflib.Attributes(**new_attrs)
+    prim.indices = indices
+    return count, len(faces)
+
+
+def _write_image(writer, gltf, blob, image, texture_size):
+    """Downscale and re-encode an embedded image into the writer."""
+    view = gltf.bufferViews[image.bufferView]
+    data = blob[(view.byteOffset or 0):(view.byteOffset or 0) + view.byteLength]
+    pixels = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_UNCHANGED)
+    if pixels is None:
+        image.bufferView = writer.view(data)
+        return
+
+    h, w = pixels.shape[:2]
+    if max(h, w) > texture_size:
+        scale = texture_size / max(h, w)
+        pixels = cv2.resize(pixels, (max(1, round(w * scale)), max(1, round(h * scale))),
+                            interpolation=cv2.INTER_AREA)
+
+    if pixels.ndim == 3 and pixels.shape[2] == 4:
+        ok, encoded = cv2.imencode(".png", pixels, [cv2.IMWRITE_PNG_COMPRESSION, 9])
+        image.mimeType = "image/png"
+    else:
+        ok, encoded = cv2.imencode(".jpg", pixels, [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY])
+        image.mimeType = "image/jpeg"
+    image.bufferView = writer.view(encoded.tobytes() if ok else data)
+
+
+def _mesh_dequant(gltf, blob, mesh):
+    """Local center and half-extent shared by every primitive of a mesh."""
+    lo, hi = np.full(3, np.inf), np.full(3, -np.inf)
+    for prim in mesh.primitives:
+        pos = _read_accessor(gltf, blob, prim.attributes.POSITION)
+        lo, hi = np.minimum(lo, pos.min(axis=0)), np.maximum(hi, pos.max(axis=0))
+    center = (lo + hi) / 2
+    half = np.maximum((hi - lo) / 2, 1e-9)
+    return center, half
+
+
+def _check_static(gltf):
+    """Raise ValueError for features whose accessors build_lod does not carry over."""
+    if gltf.skins:
+        raise ValueError("Skinned meshes are not supported")
+    if gltf.animations:
+        raise ValueError("Animations are not supported")
+    if any(prim.targets for mesh in gltf.meshes for prim in mesh.primitives):
+        raise ValueError("Morph targets are not supported")
+
+
+def build_lod(model_path, out_path, grid=None, texture_size=2048, target_size=TARGET_SIZE):
+    """Write one normalized, decimated, quantized LOD of model_path to out_path."""
+    gltf = pygltflib.GLTF2().load_binary(model_path)
+    _check_static(gltf)
+    blob = gltf.binary_blob()
+
+    bounds = trimesh.load(model_path, force="scene").bounds
+    center = bounds.mean(axis=0)
+    scale = target_size / max(float((bounds[1] - bounds[0]).max()), 1e-9)
+
+    writer = _BlobWriter()
+    vertices = triangles = 0
+    dequant = {}
+    for mi, mesh in enumerate(gltf.meshes):
+        dequant[mi] = _mesh_dequant(gltf, blob, mesh)
+        for prim in mesh.primitives:
+            if prim.mode not in (None, pygltflib.TRIANGLES):
+                raise ValueError(f"Unsupported primitive mode {prim.mode}")
+            v, t = _write_primitive(writer, gltf, blob, prim, grid, dequant[mi])
+            vertices += v
+            triangles += t
+
+    for image in gltf.images:
+        if image.bufferView is not None:
+            _write_image(writer, gltf, blob, image, texture_size)
+
+    # Quantized positions are dequantized by a child node carrying the mesh
+    for node in list(gltf.nodes):
+        if node.mesh is None:
+            continue
+        c, h = dequant[node.mesh]
+        gltf.nodes.append(pygltflib.Node(mesh=node.mesh, translation=c.tolist(),
+                                         scale=(h / 32767).tolist()))
+        node.mesh = None
+        node.children = (node.children or []) + [len(gltf.nodes) - 1]
+
+    # Normalize the whole scene under a new root
+    for scene in gltf.scenes:
+        gltf.nodes.append(pygltflib.Node(name="normalized", children=list(scene.nodes),
+                                         scale=[scale] * 3, translation=(-center * scale).tolist()))
+        scene.nodes = [len(gltf.nodes) - 1]
+
+    gltf.accessors = writer.accessors
+    gltf.bufferViews = writer.bufferViews
+    data = writer.blob()
+    gltf.buffers = [pygltflib.Buffer(byteLength=len(data))]
+    gltf.set_binary_blob(data)
+    for ext_list in (gltf.extensionsUsed, gltf.extensionsRequired):
+        if _QUANTIZATION_EXT not in ext_list:
+            ext_list.append(_QUANTIZATION_EXT)
+    gltf.save_binary(out_path)
+
+    return {
+        "bounds": bounds,
+        "vertices": vertices,
+        "triangles": triangles,
+        "bytes": os.path.getsize(out_path),
+    }
+
+
+def build_lods(model_path, lods=None, target_size=TARGET_SIZE):
+    """Build every LOD for model_path and write the `<name>_lods.json` manifest next to it."""
+    lods = lods or DEFAULT_LODS
+    root, _ = os.path.splitext(model_path)
+    manifest = {"source": os.path.basename(model_path), "target_size": target_size, "lods": []}
+
+    for lod in lods:
+        out_path = f"{root}_{lod['name']}.glb"
+        info = build_lod(model_path, out_path, grid=lod["grid"],
+                         texture_size=lod["texture_size"], target_size=target_size)
+        lo, hi = info["bounds"]
+        manifest["bounds"] = {"min": lo.tolist(), "max": hi.tolist(),
+                              "center": ((lo + hi) / 2).tolist(), "extent": (hi - lo).tolist()}
+        manifest["lods"].append({
+            "name": lod["name"],
+            "file": os.path.basename(out_path),
+            "texture_size": lod["texture_size"],
+            "vertices": info["vertices"],
+            "triangles": info["triangles"],
+            "bytes": info["bytes"],
+        })
+        print(f"Wrote {out_path}: {info['triangles']} tris, {info['bytes']} bytes")
+
+    manifest_path = f"{root}_lods.json"
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    _remove_stale_lods(root, {lod["file"] for lod in manifest["lods"]})
+    return manifest
+
+
+def _remove_stale_lods(root, keep):
+    """Delete `<root>_lod<N>.glb` (and compressed sidecars) left by a build with more LODs."""
+    directory, base = os.path.split(root)
+    pattern = re.compile(re.escape(base) + r"_lod\d+\.glb")
+    for entry in os.scandir(directory or "."):
+        match = pattern.match(entry.name)
+        if match and match.group() not in keep and entry.name[match.end():] in ("", ".gz", ".br"):
+            os.remove(entry.path)
+            print(f"Removed stale {entry.path}")
+
+
+def load_manifest(model_path):
+    """Return the LOD manifest for model_path, or None if it has not been built."""
+    root, _ = os.path.splitext(model_path)
+    try:
+        with open(f"{root}_lods.json") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+if __name__ == "__main__":
+    import sys
+    for path in sys.argv[1:]:
+        build_lods(path)
@@ -0,0 +1,279 @@
+"""
+Shared, resilient Replicate client.
+
+`replicate.run` on the module-level client has no overall deadline, retries
+only idempotent GETs, and every caller competes for the API with no limit.
+This wraps one `replicate.Client` (one pooled httpx connection pool for
+the API, file uploads and output downloads) with:
+
+  - per-stage timeouts: connect/read/write on every request, a deadline for
+    the whole prediction (`predict`), and a wait for a concurrency slot
+    (`queue`)
+  - retries with exponential backoff and full jitter, only where they can't
+    start a second paid prediction: `create` is retried when the request
+    never reached the API (connect errors) or was refused (429/5xx), and
+    polling retries `reload()` of the same prediction. A failed or timed-out
+    *prediction* is not retried
+  - a circuit breaker: after FAILURE_THRESHOLD consecutive failures calls
+    fail fast with CircuitOpenError for RESET_TIMEOUT seconds, then one
+    trial call decides whether it closes again
+  - a limiter on concurrent predictions
+
+    from replicate_utils.replicate_client import get_client
+    output = get_client().run("firtoz/trellis:<version>", input={...})
+
+Settings come from the environment (REPLICATE_MAX_CONCURRENCY,
+REPLICATE_MAX_RETRIES, REPLICATE_PREDICT_TIMEOUT), and REPLICATE_BASE_URL
+points it at benchmarks/fake_replicate.py for failure-injection runs.
+"""
+
+import os
+import random
+import threading
+import time
+
+import httpx
+import replicate
+from replicate.exceptions import ModelError, ReplicateError
+from replicate.helpers import transform_output
+from replicate.identifier import ModelVersionIdentifier
+
+import metrics
+
+RETRYABLE_STATUS = frozenset({408, 409, 425, 429, 500, 502, 503, 504})
+TERMINAL_STATUS = frozenset({"succeeded", "failed", "canceled"})
+
+TIMEOUTS = {
+    "connect": 10.0,
+    "read": 120.0,      # also bounds a single file upload/download chunk
+    "write": 60.0,
+    "pool": 30.0,       # waiting for a free pooled connection
+    "predict": float(os.environ.get("REPLICATE_PREDICT_TIMEOUT", 900)),
+    "queue": 600.0,     # waiting for a concurrency slot
+}
+MAX_CONNECTIONS = 16
+MAX_CONCURRENCY = int(os.environ.get("REPLICATE_MAX_CONCURRENCY", 2))
+MAX_RETRIES = int(os.environ.get("REPLICATE_MAX_RETRIES", 4))
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 30.0
+FAILURE_THRESHOLD = 5
+RESET_TIMEOUT = 60.0
+WAIT_SECONDS = 60       # "Prefer: wait" on create, then poll
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised without calling the API while the circuit breaker is open."""
+
+
+class PredictionTimeout(TimeoutError):
+    """The prediction outlived the `predict` deadline; it has been canceled."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker: closed -> open -> half-open (one trial) -> closed."""
+
+    def __init__(self, failure_threshold=FAILURE_THRESHOLD, reset_timeout=RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial = False
+        self._lock = threading.Lock()
+        self._gauge = metrics.gauge("replicate_circuit_open", "1 while the Replicate circuit breaker is open")
+
+    def before_call(self):
+        with self._lock:
+            if self.state == "open":
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    raise CircuitOpenError(f"Replicate circuit open after {self.failures} consecutive failures")
+                self.state = "half_open"
+            if self.state == "half_open":
+                if self._trial:
+                    raise CircuitOpenError("Replicate circuit half-open, trial call in progress")
+                self._trial = True
+
+    def record_success(self):
+        with self._lock:
+            self.state, self.failures, self._trial = "closed", 0, False
+            self._gauge.set(0)
+
+    def release(self):
+        """End a call that says nothing about upstream health (e.g. a slow prediction)."""
+        with self._lock:
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial = False
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+                self._gauge.set(1)
+
+
+def is_retryable(error):
+    """Upstream trouble: transport errors and 429/5xx responses."""
+    if isinstance(error, httpx.TransportError):
+        return True
+    return isinstance(error, ReplicateError) and error.status in RETRYABLE_STATUS
+
+
+def not_created(error):
+    """True if a failed `create` certainly did not start a prediction.
+
+    A refused request (an error status) or one that never connected is safe
+    to resend; a read timeout or dropped connection may have created one.
+    """
+    if isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)):
+        return True
+    return isinstance(error, ReplicateError) and error.status in RETRYABLE_STATUS
+
+
+def backoff_delay(attempt, base=BACKOFF_BASE, cap=BACKOFF_MAX):
+    """Full jitter: uniform in [0, min(cap, base * 2^attempt)]."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def _rewind(value):
+    # file inputs are read during upload; rewind so a retry uploads them again
+    if hasattr(value, "seek"):
+        value.seek(0)
+    elif isinstance(value, dict):
+        for v in value.values():
+            _rewind(v)
+    elif isinstance(value, (list, tuple)):
+        for v in value:
+            _rewind(v)
+
+
+class ReplicateClient:
+    def __init__(self, max_connections=MAX_CONNECTIONS, max_concurrency=MAX_CONCURRENCY,
+                 max_retries=MAX_RETRIES, timeouts=None, breaker=None, base_url=None, backoff_base=BACKOFF_BASE):
+        self.timeouts = {**TIMEOUTS, **(timeouts or {})}
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.breaker = breaker or CircuitBreaker()
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self.client = replicate.Client(
+            base_url=base_url,
+            timeout=httpx.Timeout(self.timeouts["read"], connect=self.timeouts["connect"],
+                                  write=self.timeouts["write"], pool=self.timeouts["pool"]),
+            transport=httpx.HTTPTransport(limits=limits, retries=1),   # retries = connect retries only
+        )
+
+    def run(self, ref, input=None, stage="predict"):
+        """Like replicate.run: returns the model output, with FileOutput values for files."""
+        start = time.perf_counter()
+        if not self._slots.acquire(timeout=self.timeouts["queue"]):
+            raise TimeoutError(f"No Replicate slot free after {self.timeouts['queue']}s")
+        metrics.histogram("replicate_queue_seconds", "Wait for a Replicate concurrency slot").observe(
+            time.perf_counter() - start)
+        try:
+            return self._run_with_retries(ref, input or {}, stage)
+        finally:
+            self._slots.release()
+
+    def _run_with_retries(self, ref, input, stage):
+        deadline = time.monotonic() + self.timeouts["predict"]
+        try:
+            prediction = self._create(ref, input, stage, deadline)
+            output = self._wait(prediction, stage, deadline)
+        except ModelError:
+            # the model ran and failed: the API is healthy, a retry would likely fail the same way
+            self.breaker.record_success()
+            self._count(stage, "model_error")
+            raise
+        except PredictionTimeout:
+            # a slow model is not an API outage; don't open the breaker over it
+            self.breaker.release()
+            self._count(stage, "timeout")
+            raise
+        except CircuitOpenError:
+            self._count(stage, "error")
+            raise
+        except Exception as e:
+            # only upstream trouble counts towards opening the breaker, not bad requests
+            if is_retryable(e):
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            self._count(stage, "error")
+            raise
+        self.breaker.record_success()
+        self._count(stage, "ok")
+        return output
+
+    def _count(self, stage, outcome):
+        metrics.counter("replicate_calls_total", "Replicate predictions by outcome",
+                        stage=stage, outcome=outcome).inc()
+
+    def _retry(self, stage, step, attempt, error):
+        delay = backoff_delay(attempt, self.backoff_base)
+        metrics.counter("replicate_retries_total", "Retried Replicate calls", stage=stage).inc()
+        reason = f"HTTP {error.status}" if isinstance(error, ReplicateError) else f"{type(error).__name__}: {error}"
+        print(f"Replicate {stage} {step} attempt {attempt + 1} failed ({reason}), retrying in {delay:.1f}s")
+        time.sleep(delay)
+
+    def _create(self, ref, input, stage, deadline):
+        owner, name, version = ModelVersionIdentifier.parse(ref)
+        wait = max(1, min(WAIT_SECONDS, int(self.timeouts["predict"])))
+        for attempt in range(self.max_retries + 1):
+            self.breaker.before_call()
+            try:
+                _rewind(input)
+                if version:
+                    return self.client.predictions.create(version=version, input=input, wait=wait)
+                return self.client.models.predictions.create(model=(owner, name), input=input, wait=wait)
+            except Exception as e:
+                if not (is_retryable(e) and not_created(e)) or attempt == self.max_retries \
+                        or time.monotonic() >= deadline:
+                    raise
+                # this attempt's failure counts; the next before_call may fail fast
+                self.breaker.record_failure()
+                self._retry(stage, "create", attempt, e)
+
+    def _wait(self, prediction, stage, deadline):
+        """Poll the one prediction until it finishes; transient poll errors retry reload()."""
+        failures = 0
+        while prediction.status not in TERMINAL_STATUS:
+            if time.monotonic() >= deadline:
+                self._cancel(prediction)
+                raise PredictionTimeout(f"Prediction {prediction.id} still {prediction.status} "
+                                        f"after {self.timeouts['predict']}s")
+            time.sleep(self.client.poll_interval)
+            try:
+                prediction.reload()
+                failures = 0
+            except Exception as e:
+                if not is_retryable(e) or failures == self.max_retries:
+                    self._cancel(prediction)
+                    raise
+                self._retry(stage, f"poll {prediction.id}", failures, e)
+                failures += 1
+
+        if prediction.status != "succeeded":
+            raise ModelError(prediction)
+        return transform_output(prediction.output, self.client)
+
+    @staticmethod
+    def _cancel(prediction):
+        try:
+            prediction.cancel()
+        except Exception as e:
+            print(f"Could not cancel prediction {prediction.id}: {e}")
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Process-wide client, so concurrent jobs share one connection pool and one limiter."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = ReplicateClient()
+        return _client
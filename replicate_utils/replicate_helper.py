@@ -1,11 +1,27 @@
-import replicate
+import io
 import os
+from . import storage
+from .glb_postprocess import build_lods
+from .replicate_client import get_client
+from .splat import convert as convert_splat
+from .upload_prep import prepare_images
+import metrics
 
 
-def send_to_replicate(name, abs_paths, glb_only=False):
-    image_datas = []
-    for abs_path in abs_paths:
-        image_datas.append(open(abs_path, 'rb'))
+def send_to_replicate(name, abs_paths, glb_only=False, preprocess=True):
+    if preprocess:
+        # crop/resize/re-encode the views in memory; see upload_prep.py
+        with metrics.span("generation", stage="upload_prep"):
+            image_datas, report = prepare_images(abs_paths)
+        metrics.counter("replicate_upload_bytes_total", "Image bytes uploaded to Replicate").inc(report["bytes_out"])
+        print(f"[{name}] upload prep: {report['bytes_in']} -> {report['bytes_out']} bytes "
+              f"in {report['seconds'] * 1000:.0f} ms for {report['views']} views")
+    else:
+        image_datas = []
+        for abs_path in abs_paths:
+            with open(abs_path, 'rb') as f:
+                image_datas.append(io.BytesIO(f.read()))
+                image_datas[-1].name = os.path.basename(abs_path)
 
     input = {
         "images": image_datas,
@@ -16,15 +32,18 @@ def send_to_replicate(name, abs_paths, glb_only=False):
         "ss_sampling_steps": 38
     }
 
-    output = replicate.run(
-        "firtoz/trellis:e8f6c45206993f297372f5436b90350817bd9b4a0d52d2a76df50c1c8afa2b3c",
-        input=input
-    )
+    with metrics.span("generation", stage="replicate_run"):
+        output = get_client().run(
+            "firtoz/trellis:e8f6c45206993f297372f5436b90350817bd9b4a0d52d2a76df50c1c8afa2b3c",
+            input=input, stage="image_to_3d"
+        )
     if glb_only:
         # return sanitized filename
-        return save_glb_only(output, name)
+        with metrics.span("generation", stage="save_glb"):
+            return save_glb_only(output, name)
     else:
-        save_generation(output, name)
+        with metrics.span("generation", stage="save_outputs"):
+            save_generation(output, name)
         return output
 
 def save_glb_only(output, obj_name):
@@ -36,15 +55,15 @@ def save_glb_only(output, obj_name):
         return sanitized.lower().strip('_')
     
     sanitized_name = sanitize_name(obj_name)
-    os.makedirs("local_storage/assets", exist_ok=True)
     model_file = output["model_file"]
-    model_path = f"local_storage/assets/{sanitized_name}.glb"
+    model_path = os.path.join(storage.object_dir(sanitized_name, create=True), f"{sanitized_name}.glb")
     with open(model_path, "wb") as f:
         f.write(model_file.read())
+    catalog_object(sanitized_name, "asset")
     return sanitized_name
 
 def save_generation(output, obj_name):
-    prediction_dir = "local_storage/" + obj_name + "/replicate_predictions"
+    prediction_dir = os.path.join(storage.object_dir(obj_name), "replicate_predictions")
     os.makedirs(prediction_dir, exist_ok=True)
 
     color_video = output["color_video"]
@@ -57,7 +76,30 @@ def save_generation(output, obj_name):
     with open(model_path, "wb") as f:
         f.write(model_file.read())
 
+    # Lighter variants for the viewer; the original GLB is still served if this fails
+    try:
+        with metrics.span("generation", stage="build_lods"):
+            build_lods(model_path)
+    except Exception as e:
+        print(f"LOD generation failed for {model_path}: {e}")
+
     gaussian_ply = output["gaussian_ply"]
     gaussian_path = prediction_dir + "/" + obj_name + "_" + "output_gaussian.ply"
     with open(gaussian_path, "wb") as f:
         f.write(gaussian_ply.read())
+
+    try:
+        with metrics.span("generation", stage="convert_splat"):
+            convert_splat(gaussian_path)
+    except Exception as e:
+        print(f"Splat conversion failed for {gaussian_path}: {e}")
+
+    catalog_object(obj_name)
+
+def catalog_object(obj_name, kind="generation"):
+    """Index the object and rewrite its manifest; a failure here must not lose the generation."""
+    try:
+        with metrics.span("generation", stage="catalog"):
+            storage.commit(obj_name, kind)
+    except Exception as e:
+        print(f"Catalog update failed for {obj_name}: {e}")
@@ -0,0 +1,192 @@
+"""
+Bulk reprocessing of the local storage asset library.
+
+Re-runs GLB post-processing (LOD generation) for every generated model and
+saved asset, in a process pool. Work is recorded in an append-only journal,
+so an interrupted run resumes where it stopped, and assets whose content and
+parameters are unchanged are skipped. LOD files past the new LOD count are
+deleted. Gaussian splats are not reprocessed: `/genassets/splats` rebuilds
+a `.splatc` on demand whenever it is older than its PLY.
+
+Usage:
+    python -m replicate_utils.reprocess [--workers N] [--max-memory-mb MB] [--grids 160,64] [--textures 1024,512] [--force]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+from .glb_postprocess import DEFAULT_LODS
+from .storage import STORAGE_ROOT, iter_objects
+
+JOURNAL_NAME = "reprocess_journal.jsonl"
+
+
+def discover(root=STORAGE_ROOT):
+    """Yield (object_name, kind, glb path) for every source GLB under root."""
+    for name, kind, obj_dir in iter_objects(root):
+        if kind == "asset":
+            path = os.path.join(obj_dir, f"{name}.glb")
+        else:
+            path = os.path.join(obj_dir, "replicate_predictions", f"{name}_output.glb")
+        if os.path.isfile(path):
+            yield name, kind, path
+
+
+def params_key(lods):
+    return hashlib.sha256(json.dumps(lods, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def load_journal(path):
+    """Latest journal record per source path; a truncated last line is ignored."""
+    done = {}
+    try:
+        with open(path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                done[record["path"]] = record
+    except FileNotFoundError:
+        pass
+    return done
+
+
+def _limit_memory(max_bytes):
+    """Pool initializer: cap the worker's address space so one huge asset can't take the host down."""
+    if not max_bytes:
+        return
+    try:
+        import resource
+        resource.setrlimit(resource.RLIMIT_AS, (max_bytes, max_bytes))
+    except (ImportError, ValueError, OSError) as e:
+        print(f"Could not set memory limit: {e}")
+
+
+def _process(object_name, kind, path, root, lods, params, previous):
+    """Worker: hash the source, rebuild LODs if content or params changed, reindex."""
+    from . import asset_catalog, storage
+    from .glb_postprocess import build_lods
+
+    st = os.stat(path)
+    record = {"path": path, "sha256": asset_catalog.file_sha256(path), "size": st.st_size,
+              "mtime_ns": st.st_mtime_ns, "params": params}
+
+    if previous and previous.get("sha256") == record["sha256"] and previous.get("params") == params \
+            and previous.get("status") in ("ok", "unchanged"):
+        record["status"] = "unchanged"
+        return record
+
+    start = time.perf_counter()
+    try:
+        build_lods(path, lods=lods)
+        storage.commit(object_name, kind, root=root)
+        record["status"] = "ok"
+    except MemoryError:
+        record["status"] = "error"
+        record["error"] = "memory limit exceeded"
+    except Exception as e:
+        record["status"] = "error"
+        record["error"] = str(e)
+    record["seconds"] = round(time.perf_counter() - start, 3)
+    return record
+
+
+def _build_lods_config(grids, textures):
+    lods = [dict(DEFAULT_LODS[0])]
+    for i, (grid, texture_size) in enumerate(zip(grids, textures), start=1):
+        lods.append({"name": f"lod{i}", "grid": grid, "texture_size": texture_size})
+    return lods
+
+
+def run(root=STORAGE_ROOT, workers=None, max_memory_mb=2048, lods=None, force=False):
+    lods = lods or DEFAULT_LODS
+    params = params_key(lods)
+    journal_path = os.path.join(root, JOURNAL_NAME)
+    done = {} if force else load_journal(journal_path)
+
+    todo = []
+    skipped = 0
+    for object_name, kind, path in discover(root):
+        previous = done.get(path)
+        if previous and previous.get("status") in ("ok", "unchanged") and previous.get("params") == params:
+            st = os.stat(path)
+            # fast path: identical size and mtime means identical content
+            if previous["size"] == st.st_size and previous["mtime_ns"] == st.st_mtime_ns:
+                skipped += 1
+                continue
+        todo.append((object_name, kind, path, previous))
+
+    total = len(todo)
+    print(f"{total} assets to process, {skipped} already up to date")
+    if not total:
+        return 0
+
+    failures = 0
+    start = time.perf_counter()
+    max_bytes = max_memory_mb * 1024 * 1024 if max_memory_mb else 0
+    with open(journal_path, "a") as journal, \
+            ProcessPoolExecutor(max_workers=workers, initializer=_limit_memory, initargs=(max_bytes,)) as pool:
+        futures = {pool.submit(_process, name, kind, path, root, lods, params, prev): path
+                   for name, kind, path, prev in todo}
+        try:
+            for i, future in enumerate(as_completed(futures), start=1):
+                path = futures[future]
+                try:
+                    record = future.result()
+                except BrokenProcessPool:
+                    raise
+                except Exception as e:
+                    record = {"path": path, "status": "error", "error": str(e), "params": params}
+                if record["status"] == "error":
+                    failures += 1
+                # journal before reporting so an interrupt never loses finished work
+                journal.write(json.dumps(record) + "\n")
+                journal.flush()
+
+                elapsed = time.perf_counter() - start
+                eta = elapsed / i * (total - i)
+                print(f"[{i}/{total}] {record['status']:>9} {os.path.relpath(path, root)}"
+                      f"  ({elapsed:.0f}s elapsed, ~{eta:.0f}s left)")
+        except KeyboardInterrupt:
+            print("Interrupted; rerun to resume")
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+        except BrokenProcessPool:
+            print("A worker died (likely over the memory limit); rerun to resume")
+            return 1
+
+    print(f"Done: {total - failures} processed, {failures} failed")
+    return 1 if failures else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reprocess every GLB in local storage")
+    parser.add_argument("--root", default=STORAGE_ROOT)
+    parser.add_argument("--workers", type=int, default=None, help="Pool size (default: CPU count)")
+    parser.add_argument("--max-memory-mb", type=int, default=2048, help="Address-space cap per worker; 0 disables")
+    parser.add_argument("--grids", default=None, help="Comma-separated clustering grids for lod1..N")
+    parser.add_argument("--textures", default=None, help="Comma-separated texture sizes for lod1..N")
+    parser.add_argument("--force", action="store_true", help="Ignore the journal and reprocess everything")
+    args = parser.parse_args(argv)
+
+    lods = None
+    if args.grids or args.textures:
+        grids = [int(g) for g in (args.grids or "").split(",") if g] or [l["grid"] for l in DEFAULT_LODS[1:]]
+        textures = [int(t) for t in (args.textures or "").split(",") if t] or \
+            [l["texture_size"] for l in DEFAULT_LODS[1:]]
+        if len(grids) != len(textures):
+            parser.error("--grids and --textures must have the same length")
+        lods = _build_lods_config(grids, textures)
+
+    return run(args.root, args.workers, args.max_memory_mb, lods, args.force)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
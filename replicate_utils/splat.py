@@ -0,0 +1,276 @@
+"""
+Gaussian splat PLY decoding and a compact, web-friendly splat format.
+
+The Trellis `<name>_output_gaussian.ply` stores ~60 float32 properties per
+splat (position, normal, SH coefficients, opacity, scale, rotation). This
+module reads the binary body through a memory map in fixed-size batches and
+writes a `.splatc` file with 17 bytes per splat:
+
+    position  uint16 x3   quantized within the chunk's bounding box
+    scale     uint8  x3   log-scale, LOG_SCALE_RANGE
+    color     uint8  x4   RGB from the SH DC term, alpha = sigmoid(opacity)
+    rotation  uint8  x4   normalized quaternion (w, x, y, z), w >= 0
+
+Splats are bucketed into a coarse spatial grid on disk and emitted cell by
+cell (Morton order), in chunks of at most CHUNK_SIZE splats, so a viewer can
+draw chunks as they arrive. Every pass works batch by batch, so peak memory
+depends on BATCH_SIZE/CHUNK_SIZE and not on the size of the PLY.
+
+File layout:
+    b"SPLC" | u32 version | u32 index length | index JSON (padded to 4) | chunks
+Each chunk:
+    u32 count | f32[3] min | f32[3] max | positions | pad | scales | colors | rotations | pad
+"""
+
+import json
+import os
+import shutil
+import struct
+import tempfile
+
+import numpy as np
+
+MAGIC = b"SPLC"
+VERSION = 1
+BATCH_SIZE = 1 << 16
+CHUNK_SIZE = 1 << 14
+GRID_BITS = 2  # 4x4x4 coarse cells
+LOG_SCALE_RANGE = (-12.0, 2.0)
+SH_C0 = 0.28209479177387814
+
+_PLY_TYPES = {
+    "char": "i1", "int8": "i1", "uchar": "u1", "uint8": "u1",
+    "short": "i2", "int16": "i2", "ushort": "u2", "uint16": "u2",
+    "int": "i4", "int32": "i4", "uint": "u4", "uint32": "u4",
+    "float": "f4", "float32": "f4", "double": "f8", "float64": "f8",
+}
+_RECORD = np.dtype([("pos", "<f4", 3), ("scale", "u1", 3), ("rgba", "u1", 4), ("rot", "u1", 4)])
+_IMPORTANCE_BINS = np.linspace(-40.0, 10.0, 4097)
+
+
+def read_header(path):
+    """Parse a binary PLY header; returns (vertex count, structured dtype, body offset)."""
+    with open(path, "rb") as f:
+        if f.readline().strip() != b"ply":
+            raise ValueError(f"{path} is not a PLY file")
+        count, fields, in_vertex, endian = None, [], False, "<"
+        while True:
+            line = f.readline()
+            if not line:
+                raise ValueError(f"{path}: unterminated PLY header")
+            parts = line.decode("ascii", errors="ignore").split()
+            if not parts:
+                continue
+            if parts[0] == "format":
+                if parts[1] == "binary_big_endian":
+                    endian = ">"
+                elif parts[1] != "binary_little_endian":
+                    raise ValueError(f"{path}: only binary PLY is supported, got {parts[1]}")
+            elif parts[0] == "element":
+                in_vertex = parts[1] == "vertex"
+                if in_vertex:
+                    count = int(parts[2])
+                elif count is None:
+                    raise ValueError(f"{path}: elements before 'vertex' are not supported")
+            elif parts[0] == "property" and in_vertex:
+                if parts[1] == "list":
+                    raise ValueError(f"{path}: list properties are not supported on vertices")
+                fields.append((parts[2], endian + _PLY_TYPES[parts[1]]))
+            elif parts[0] == "end_header":
+                return count, np.dtype(fields), f.tell()
+
+
+def open_vertices(path):
+    """Memory-map the vertex body as a structured array (nothing is read until indexed)."""
+    count, dtype, offset = read_header(path)
+    return np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=(count,))
+
+
+def iter_batches(vertices, batch_size=BATCH_SIZE):
+    for start in range(0, len(vertices), batch_size):
+        yield np.array(vertices[start:start + batch_size])
+
+
+def _positions(batch):
+    return np.stack([batch["x"], batch["y"], batch["z"]], axis=1).astype(np.float32)
+
+
+def _log_importance(batch):
+    """log(opacity * volume): large, opaque splats matter most."""
+    opacity = -np.logaddexp(0.0, -batch["opacity"].astype(np.float64))  # log(sigmoid(x))
+    return opacity + batch["scale_0"] + batch["scale_1"] + batch["scale_2"]
+
+
+def _encode(batch):
+    """Quantize the non-position attributes of a batch into temp records."""
+    out = np.empty(len(batch), dtype=_RECORD)
+    out["pos"] = _positions(batch)
+
+    lo, hi = LOG_SCALE_RANGE
+    scales = np.stack([batch[f"scale_{i}"] for i in range(3)], axis=1)
+    out["scale"] = np.round((np.clip(scales, lo, hi) - lo) / (hi - lo) * 255)
+
+    dc = np.stack([batch[f"f_dc_{i}"] for i in range(3)], axis=1)
+    out["rgba"][:, :3] = np.round(np.clip(0.5 + SH_C0 * dc, 0, 1) * 255)
+    out["rgba"][:, 3] = np.round(255 / (1 + np.exp(-batch["opacity"].astype(np.float64))))
+
+    q = np.stack([batch[f"rot_{i}"] for i in range(4)], axis=1).astype(np.float64)
+    q /= np.maximum(np.linalg.norm(q, axis=1, keepdims=True), 1e-12)
+    q *= np.where(q[:, :1] < 0, -1.0, 1.0)
+    out["rot"] = np.round(q * 127.5 + 127.5)
+    return out
+
+
+def _spread_bits(v):
+    """Interleave 10-bit integers with two zero bits (for 3D Morton codes)."""
+    v = v.astype(np.uint32) & 0x3FF
+    v = (v | (v << 16)) & 0x030000FF
+    v = (v | (v << 8)) & 0x0300F00F
+    v = (v | (v << 4)) & 0x030C30C3
+    v = (v | (v << 2)) & 0x09249249
+    return v
+
+
+def morton(cells):
+    return _spread_bits(cells[:, 0]) | (_spread_bits(cells[:, 1]) << 1) | (_spread_bits(cells[:, 2]) << 2)
+
+
+def _cells(pos, lo, hi, bits):
+    n = 1 << bits
+    scaled = (pos - lo) / np.maximum(hi - lo, 1e-12) * n
+    return np.clip(scaled.astype(np.int64), 0, n - 1)
+
+
+def _write_chunk(out, records):
+    lo = records["pos"].min(axis=0)
+    hi = records["pos"].max(axis=0)
+    order = np.argsort(morton(_cells(records["pos"], lo, hi, 10)), kind="stable")
+    records = records[order]
+
+    q = np.round((records["pos"] - lo) / np.maximum(hi - lo, 1e-12) * 65535).astype("<u2")
+    parts = [struct.pack("<I6f", len(records), *lo.tolist(), *hi.tolist()), q.tobytes()]
+    if (q.nbytes % 4):
+        parts.append(b"\x00" * (4 - q.nbytes % 4))
+    parts += [records["scale"].tobytes(), records["rgba"].tobytes(), records["rot"].tobytes()]
+    body = b"".join(parts)
+    body += b"\x00" * ((-len(body)) % 4)
+    out.write(body)
+    return len(body), lo, hi
+
+
+def convert(ply_path, out_path=None, keep_fraction=1.0):
+    """Convert a Gaussian splat PLY to `.splatc`; keep_fraction < 1 drops the least important splats."""
+    out_path = out_path or os.path.splitext(ply_path)[0] + ".splatc"
+    vertices = open_vertices(ply_path)
+
+    # Pass 1: bounds and importance histogram
+    lo = np.full(3, np.inf, dtype=np.float32)
+    hi = np.full(3, -np.inf, dtype=np.float32)
+    hist = np.zeros(len(_IMPORTANCE_BINS) - 1, dtype=np.int64)
+    for batch in iter_batches(vertices):
+        pos = _positions(batch)
+        lo, hi = np.minimum(lo, pos.min(axis=0)), np.maximum(hi, pos.max(axis=0))
+        if keep_fraction < 1.0:
+            hist += np.histogram(np.clip(_log_importance(batch), -40, 10), bins=_IMPORTANCE_BINS)[0]
+
+    threshold = -np.inf
+    if keep_fraction < 1.0:
+        drop = len(vertices) * (1.0 - keep_fraction)
+        threshold = _IMPORTANCE_BINS[np.searchsorted(np.cumsum(hist), drop)]
+
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(out_path))) as tmp:
+        # Pass 2: encode and bucket into coarse cells on disk
+        cell_count = 1 << (3 * GRID_BITS)
+        buckets = {}
+        kept = 0
+        try:
+            for batch in iter_batches(vertices):
+                if keep_fraction < 1.0:
+                    batch = batch[_log_importance(batch) >= threshold]
+                if not len(batch):
+                    continue
+                records = _encode(batch)
+                codes = morton(_cells(records["pos"], lo, hi, GRID_BITS))
+                order = np.argsort(codes, kind="stable")
+                codes, records = codes[order], records[order]
+                bounds = np.searchsorted(codes, np.arange(cell_count + 1))
+                for cell in range(cell_count):
+                    a, b = bounds[cell], bounds[cell + 1]
+                    if a == b:
+                        continue
+                    if cell not in buckets:
+                        buckets[cell] = open(os.path.join(tmp, f"{cell}.bin"), "wb")
+                    buckets[cell].write(records[a:b].tobytes())
+                kept += len(records)
+        finally:
+            for f in buckets.values():
+                f.close()
+
+        # Pass 3: chunk each cell in Morton order
+        chunks = []
+        body_path = os.path.join(tmp, "body.bin")
+        with open(body_path, "wb") as body:
+            offset = 0
+            for cell in sorted(buckets):
+                cell_records = np.memmap(os.path.join(tmp, f"{cell}.bin"), dtype=_RECORD, mode="r")
+                for start in range(0, len(cell_records), CHUNK_SIZE):
+                    block = np.array(cell_records[start:start + CHUNK_SIZE])
+                    length, c_lo, c_hi = _write_chunk(body, block)
+                    chunks.append({"offset": offset, "length": length, "count": len(block),
+                                   "min": c_lo.tolist(), "max": c_hi.tolist()})
+                    offset += length
+                del cell_records
+
+        index = json.dumps({
+            "count": kept,
+            "source_count": len(vertices),
+            "keep_fraction": keep_fraction,
+            "bounds": {"min": lo.tolist(), "max": hi.tolist()},
+            "log_scale_range": list(LOG_SCALE_RANGE),
+            "chunks": chunks,
+        }).encode()
+        index += b" " * ((-len(index)) % 4)
+
+        # inside this call's own temp dir (same filesystem), so concurrent conversions never share it
+        tmp_out = os.path.join(tmp, "out.splatc")
+        with open(tmp_out, "wb") as out, open(body_path, "rb") as body:
+            out.write(MAGIC + struct.pack("<II", VERSION, len(index)) + index)
+            shutil.copyfileobj(body, out, 1 << 20)
+        os.replace(tmp_out, out_path)
+
+    print(f"Wrote {out_path}: {kept}/{len(vertices)} splats in {len(chunks)} chunks")
+    return out_path
+
+
+def read_index(path):
+    """Return (index dict, byte offset of the first chunk) for a `.splatc` file."""
+    with open(path, "rb") as f:
+        head = f.read(12)
+        if head[:4] != MAGIC:
+            raise ValueError(f"{path} is not a .splatc file")
+        version, length = struct.unpack("<II", head[4:])
+        if version != VERSION:
+            raise ValueError(f"{path}: unsupported .splatc version {version}")
+        return json.loads(f.read(length)), 12 + length
+
+
+def iter_stream(path, block_size=1 << 16):
+    """Yield the file header and then each chunk, in file (spatial) order."""
+    index, data_offset = read_index(path)
+    with open(path, "rb") as f:
+        yield f.read(data_offset)
+        for chunk in index["chunks"]:
+            f.seek(data_offset + chunk["offset"])
+            remaining = chunk["length"]
+            while remaining:
+                piece = f.read(min(block_size, remaining))
+                if not piece:
+                    return
+                remaining -= len(piece)
+                yield piece
+
+
+if __name__ == "__main__":
+    import sys
+    fraction = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+    convert(sys.argv[1], keep_fraction=fraction)
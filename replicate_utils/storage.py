@@ -0,0 +1,391 @@
+"""
+Managed local storage for captures, generations and assets.
+
+Everything lives under one fixed root (LOCAL_STORAGE_ROOT, default
+replicate_utils/local_storage), independent of the working directory:
+
+    <root>/catalog.sqlite3                  asset_catalog index
+    <root>/objects/<shard>/<name>/          one directory per object
+        manifest.json                       name, kind, files with size + sha256
+        img_a1.png ...                      captures
+        replicate_predictions/...           generations
+        <name>.glb, <name>_lod*.glb ...     text-to-3D assets
+
+<shard> is the first two hex digits of sha1(lowercased name), so no
+directory grows past a few hundred entries. Writers get their directory
+from `object_dir(name, create=True)` and call `commit(name, kind)` when
+done, which reindexes the object and rewrites its manifest atomically
+(temp file, fsync, rename).
+
+Readers call `touch(name)` (throttled) to record the last access, and
+`GarbageCollector` deletes least-recently-used objects whenever the
+cataloged size (including static_cache's .gz/.br copies) exceeds the
+quota (LOCAL_STORAGE_QUOTA_MB), down to LOW_WATERMARK of it. Objects
+touched within MIN_AGE are never collected.
+
+Usage:
+    python -m replicate_utils.storage migrate [legacy_dir ...]   move the old flat layout into shards
+    python -m replicate_utils.storage gc [--quota-mb N] [--dry-run]
+    python -m replicate_utils.storage usage
+"""
+
+import hashlib
+import json
+import os
+import posixpath
+import shutil
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:   # Windows: GC runs without the cross-process lock
+    fcntl = None
+
+STORAGE_ROOT = os.path.abspath(os.environ.get(
+    "LOCAL_STORAGE_ROOT", os.path.join(os.path.dirname(os.path.abspath(__file__)), "local_storage")))
+OBJECTS_DIR = "objects"
+TRASH_DIR = ".trash"
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+QUOTA_BYTES = int(float(os.environ.get("LOCAL_STORAGE_QUOTA_MB", 20 * 1024)) * 1024 * 1024)
+LOW_WATERMARK = 0.9       # collect down to this fraction of the quota
+MIN_AGE = 3600.0          # seconds; recently written or viewed objects are kept
+GC_INTERVAL = 300.0
+TOUCH_INTERVAL = 60.0     # at most one access-time write per object per interval
+
+_touched = {}
+_touch_lock = threading.Lock()
+
+
+def validate_name(name):
+    """Object names become directory names; reject anything that could escape the root."""
+    if not name or name in (".", "..") or "/" in name or "\\" in name or "\0" in name or name.startswith("."):
+        raise ValueError(f"Invalid object name: {name!r}")
+    return name
+
+
+def shard(name):
+    return hashlib.sha1(name.lower().encode("utf-8")).hexdigest()[:2]
+
+
+def object_rel(name):
+    """Object directory relative to the root, with forward slashes (catalog and URL form)."""
+    return f"{OBJECTS_DIR}/{shard(validate_name(name))}/{name}"
+
+
+def object_dir(name, create=False, root=STORAGE_ROOT):
+    path = os.path.join(root, OBJECTS_DIR, shard(validate_name(name)), name)
+    if create:
+        os.makedirs(path, exist_ok=True)
+    return path
+
+
+def name_from_rel(rel):
+    """Object name for a root-relative file path (objects/<shard>/<name>/...), else None.
+
+    The path is normalized first, so `..` segments can't point outside the object.
+    """
+    rel = posixpath.normpath(rel.replace("\\", "/"))
+    parts = rel.split("/")
+    if ".." in parts or len(parts) < 4 or parts[0] != OBJECTS_DIR:
+        return None
+    try:
+        if not rel.startswith(object_rel(parts[2]) + "/"):
+            return None
+    except ValueError:
+        return None
+    return parts[2]
+
+
+def iter_objects(root=STORAGE_ROOT):
+    """Yield (name, kind, directory) for every object on disk."""
+    base = os.path.join(root, OBJECTS_DIR)
+    if not os.path.isdir(base):
+        return
+    for shard_entry in sorted(os.scandir(base), key=lambda e: e.name):
+        if not shard_entry.is_dir():
+            continue
+        for entry in sorted(os.scandir(shard_entry.path), key=lambda e: e.name):
+            if entry.is_dir() and not entry.name.startswith("."):
+                yield entry.name, _kind(entry.name, entry.path), entry.path
+
+
+def object_kind(name, root=STORAGE_ROOT):
+    """The kind recorded in an object's manifest (or guessed from its files)."""
+    return _kind(name, object_dir(name, root=root))
+
+
+def _kind(name, path):
+    manifest = _read_json(os.path.join(path, MANIFEST_NAME))
+    if manifest and manifest.get("kind"):
+        return manifest["kind"]
+    return "asset" if os.path.isfile(os.path.join(path, f"{name}.glb")) else "generation"
+
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def read_manifest(name, root=STORAGE_ROOT):
+    return _read_json(os.path.join(object_dir(name, root=root), MANIFEST_NAME))
+
+
+def write_atomic(path, data):
+    """Write bytes so readers see the old or the new file, never a partial one."""
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def commit(name, kind="generation", root=STORAGE_ROOT):
+    """Index an object after writing it and refresh its manifest; returns the manifest."""
+    from . import asset_catalog
+
+    conn = asset_catalog.connect(root)
+    try:
+        asset_catalog.index_object(name, kind, root=root, conn=conn)
+        prefix = object_rel(name) + "/"
+        files = [{"path": row["path"][len(prefix):], "role": row["role"], "size": row["size"],
+                  "sha256": row["sha256"]}
+                 for row in conn.execute("SELECT path, role, size, sha256 FROM files WHERE object_name = ? "
+                                         "ORDER BY path", (name,))]
+        row = conn.execute("SELECT created_at, updated_at FROM objects WHERE name = ?", (name,)).fetchone()
+    finally:
+        conn.close()
+
+    path = object_dir(name, root=root)
+    if not os.path.isdir(path):
+        return None
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "name": name,
+        "kind": kind,
+        "created_at": row["created_at"] if row else time.time(),
+        "updated_at": row["updated_at"] if row else time.time(),
+        "total_bytes": sum(f["size"] for f in files),
+        "files": files,
+    }
+    write_atomic(os.path.join(path, MANIFEST_NAME), json.dumps(manifest, indent=2).encode("utf-8"))
+    return manifest
+
+
+def touch(name, root=STORAGE_ROOT):
+    """Record that an object was read; cheap enough to call on every request."""
+    now = time.time()
+    with _touch_lock:
+        if now - _touched.get((root, name), 0) < TOUCH_INTERVAL:
+            return
+        _touched[(root, name)] = now
+    from . import asset_catalog
+    try:
+        conn = asset_catalog.connect(root)
+        try:
+            conn.execute("UPDATE objects SET accessed_at = ? WHERE name = ?", (now, name))
+            conn.commit()
+        finally:
+            conn.close()
+    except Exception as e:
+        print(f"Could not record access to {name}: {e}")
+
+
+def delete_object(name, root=STORAGE_ROOT):
+    """Remove an object's directory and catalog rows; returns True if it existed."""
+    from . import asset_catalog
+
+    path = object_dir(name, root=root)
+    if not os.path.isdir(path):
+        return False
+    # rename first so readers never see a half-deleted object
+    trash = os.path.join(root, TRASH_DIR)
+    os.makedirs(trash, exist_ok=True)
+    doomed = os.path.join(trash, f"{name}.{time.time_ns()}")
+    os.replace(path, doomed)
+    try:
+        os.rmdir(os.path.dirname(path))   # drop the shard once it is empty
+    except OSError:
+        pass
+    asset_catalog.index_object(name, root=root)
+    shutil.rmtree(doomed, ignore_errors=True)
+    with _touch_lock:
+        _touched.pop((root, name), None)
+    return True
+
+
+def usage(root=STORAGE_ROOT):
+    """(total cataloged bytes, object count)."""
+    from . import asset_catalog
+    conn = asset_catalog.connect(root)
+    try:
+        row = conn.execute("SELECT COALESCE(SUM(total_bytes), 0), COUNT(*) FROM objects").fetchone()
+    finally:
+        conn.close()
+    return row[0], row[1]
+
+
+def collect_garbage(quota_bytes=QUOTA_BYTES, root=STORAGE_ROOT, min_age=MIN_AGE, dry_run=False):
+    """Delete least-recently-used objects until usage is under LOW_WATERMARK * quota.
+
+    Returns the names removed (or that would be, with dry_run).
+    """
+    from . import asset_catalog
+
+    total, _ = usage(root)
+    if total <= quota_bytes:
+        return []
+    target = quota_bytes * LOW_WATERMARK
+    cutoff = time.time() - min_age
+    conn = asset_catalog.connect(root)
+    try:
+        candidates = conn.execute(
+            "SELECT name, total_bytes, MAX(updated_at, COALESCE(accessed_at, 0)) AS last_used FROM objects "
+            "WHERE MAX(updated_at, COALESCE(accessed_at, 0)) < ? ORDER BY last_used, name",
+            (cutoff,)).fetchall()
+    finally:
+        conn.close()
+
+    removed = []
+    for row in candidates:
+        if total <= target:
+            break
+        if dry_run or delete_object(row["name"], root=root):
+            removed.append(row["name"])
+            total -= row["total_bytes"]
+    return removed
+
+
+class GarbageCollector(threading.Thread):
+    """Background quota enforcement; one process per host does the work (lock file)."""
+
+    def __init__(self, quota_bytes=QUOTA_BYTES, interval=GC_INTERVAL, root=STORAGE_ROOT):
+        super().__init__(daemon=True, name="storage-gc")
+        self.quota_bytes = quota_bytes
+        self.interval = interval
+        self.root = root
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run_once(self):
+        os.makedirs(self.root, exist_ok=True)
+        with open(os.path.join(self.root, ".gc.lock"), "w") as lock:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    return []   # another worker is collecting
+            removed = collect_garbage(self.quota_bytes, self.root)
+        total, count = usage(self.root)
+        _record(total, count, removed)
+        if removed:
+            print(f"Storage GC removed {len(removed)} objects, {total / 2**20:.0f} MB in {count} objects left")
+        return removed
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Storage GC failed: {e}")
+
+
+def _record(total, count, removed):
+    import metrics
+    metrics.gauge("storage_bytes", "Cataloged bytes in local storage").set(total)
+    metrics.gauge("storage_objects", "Objects in local storage").set(count)
+    metrics.counter("storage_gc_deleted_total", "Objects removed by the storage quota").inc(len(removed))
+
+
+_gc = None
+
+
+def start_gc(quota_bytes=QUOTA_BYTES, interval=GC_INTERVAL):
+    """Start the process-wide collector once (quota 0 disables it)."""
+    global _gc
+    if _gc is None and quota_bytes > 0:
+        _gc = GarbageCollector(quota_bytes, interval)
+        _gc.start()
+    return _gc
+
+
+# --- migration from the flat layout ------------------------------------------
+
+def _legacy_entries(source):
+    """(name, kind, [paths]) for objects stored flat: <source>/<name>/ and <source>/assets/<name>*.glb."""
+    from . import asset_catalog
+    skip = {OBJECTS_DIR, TRASH_DIR, "assets"}
+    for entry in sorted(os.scandir(source), key=lambda e: e.name):
+        if entry.is_dir() and entry.name not in skip and not entry.name.startswith("."):
+            yield entry.name, "generation", [entry.path]
+    assets = os.path.join(source, "assets")
+    if os.path.isdir(assets):
+        files = sorted(os.scandir(assets), key=lambda e: e.name)
+        for entry in files:
+            if entry.is_file() and entry.name.endswith(".glb") and not asset_catalog.is_lod_file(entry.name):
+                name = entry.name[:-4]
+                lods = [e.path for e in files if e.name.startswith(f"{name}_lod") or e.name == f"{name}_lods.json"]
+                yield name, "asset", [entry.path] + lods
+
+
+def migrate(sources=None, root=STORAGE_ROOT):
+    """Move objects from the old cwd-relative flat layout into the sharded root."""
+    sources = sources or [root, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                             "local_storage")]
+    moved = 0
+    for source in dict.fromkeys(os.path.abspath(s) for s in sources):
+        if not os.path.isdir(source):
+            continue
+        for name, kind, paths in list(_legacy_entries(source)):
+            try:
+                target = object_dir(name, root=root)
+            except ValueError:
+                continue
+            if os.path.exists(target) and kind == "generation":
+                print(f"Skipping {name}: {target} already exists")
+                continue
+            if kind == "generation":
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                shutil.move(paths[0], target)
+            else:
+                os.makedirs(target, exist_ok=True)
+                for path in paths:
+                    shutil.move(path, os.path.join(target, os.path.basename(path)))
+            commit(name, kind, root=root)
+            moved += 1
+            print(f"Moved {kind} {name} -> {object_rel(name)}")
+    from . import asset_catalog
+    asset_catalog.reindex(root)
+    return moved
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Manage local storage")
+    sub = parser.add_subparsers(dest="command", required=True)
+    mig = sub.add_parser("migrate")
+    mig.add_argument("sources", nargs="*")
+    gc = sub.add_parser("gc")
+    gc.add_argument("--quota-mb", type=float, default=QUOTA_BYTES / 2**20)
+    gc.add_argument("--min-age", type=float, default=MIN_AGE)
+    gc.add_argument("--dry-run", action="store_true")
+    sub.add_parser("usage")
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        print(f"Migrated {migrate(args.sources)} objects into {STORAGE_ROOT}")
+    elif args.command == "gc":
+        names = collect_garbage(int(args.quota_mb * 2**20), min_age=args.min_age, dry_run=args.dry_run)
+        print(("Would remove" if args.dry_run else "Removed") + f" {len(names)} objects: {', '.join(names)}")
+    else:
+        total, count = usage()
+        print(f"{count} objects, {total / 2**20:.1f} MB (quota {QUOTA_BYTES / 2**20:.0f} MB) in {STORAGE_ROOT}")
@@ -4,6 +4,8 @@ import string
 import os
 import datetime
 import requests
+from . import storage
+from .camera_calibration import load_rectifier
 
 def forward_request(name, curr_obj, paths: list[str]):
     abs_paths = []
@@ -32,6 +34,9 @@ def capture_feed():
     print("This will take the first two images.")
     video_capture_0 = cv2.VideoCapture(0)
     video_capture_1 = cv2.VideoCapture(2)
+    # undistort + color-match saved shots; previews stay raw
+    rectify_0 = load_rectifier(0)
+    rectify_1 = load_rectifier(2)
 
     curr_obj = None
     name = None
@@ -51,13 +56,12 @@ def capture_feed():
         # Step 1: start new object capture (first shots)
         if key == ord('a') and not waiting_for_second:
             name = random_name()
-            curr_obj = "local_storage/" + name
-            os.makedirs(curr_obj, exist_ok=True)
+            curr_obj = storage.object_dir(name, create=True)
 
             if ret0:
-                cv2.imwrite(curr_obj + "/img_a1.png", frame0)
+                cv2.imwrite(curr_obj + "/img_a1.png", rectify_0(frame0))
             if ret1:
-                cv2.imwrite(curr_obj + "/img_b1.png", frame1)
+                cv2.imwrite(curr_obj + "/img_b1.png", rectify_1(frame1))
 
             print(f"Object {name}: first shots saved. Adjust pose, then press 'n' for second shots.")
             waiting_for_second = True
@@ -70,9 +74,9 @@ def capture_feed():
                 ret1, frame1 = video_capture_1.read()
 
             if ret0:
-                cv2.imwrite(curr_obj + "/img_a2.png", frame0)
+                cv2.imwrite(curr_obj + "/img_a2.png", rectify_0(frame0))
             if ret1:
-                cv2.imwrite(curr_obj + "/img_b2.png", frame1)
+                cv2.imwrite(curr_obj + "/img_b2.png", rectify_1(frame1))
 
             print(f"Object {os.path.basename(curr_obj)}: second shots saved. Capture complete.")
             forward_request(name, curr_obj, paths=["img_a1", "img_b1", "img_a2", "img_b2"])
@@ -1,9 +1,10 @@
 from ollama import chat
 from ollama import ChatResponse
-import replicate
 import os
 import tempfile
-from replicate_helper import send_to_replicate
+from . import storage
+from .replicate_client import get_client
+from .replicate_helper import send_to_replicate
 
 def make_prompt(description: str):
     messages = [
@@ -55,13 +56,13 @@ def generate_from_prompt(description):
         "safety_filter_level": "block_medium_and_above"
     }
     
-    output = replicate.run("google/imagen-3-fast", input=input_data)
+    output = get_client().run("google/imagen-3-fast", input=input_data, stage="text_to_image")
     
     # Step 3: Generate 3D model directly from image data (no disk save)
     model_name = generate_model(output, description)
     
     # Return the final model path
-    final_path = f"local_storage/assets/{model_name}.glb"
+    final_path = os.path.join(storage.object_dir(model_name), f"{model_name}.glb")
     return final_path
 
 # example
@@ -0,0 +1,116 @@
+"""
+Shrink capture images before they are uploaded to Replicate.
+
+Trellis crops each view to the object and conditions on a 518px square, so
+full-resolution PNGs mostly upload background. For each view this:
+
+  - finds the object region from edge density (Canny + closing, largest
+    contour) and crops to it with a margin; falls back to the full frame
+  - resizes so the longest side is at most TARGET_SIZE (2x the model's
+    518px input, leaving its own background removal room to work)
+  - re-encodes as JPEG (quality 92)
+
+Views are processed in a thread pool (OpenCV releases the GIL), and the
+results are in-memory files ready for `replicate.run`.
+
+    files, report = prepare_images(paths)
+    report   # {"views", "bytes_in", "bytes_out", "seconds", "per_view": [...]}
+"""
+
+import io
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+TARGET_SIZE = 1036
+JPEG_QUALITY = 92
+CROP_MARGIN = 0.12
+MIN_OBJECT_FRACTION = 0.02   # smaller detections are treated as noise
+
+
+def object_bounds(image, margin=CROP_MARGIN):
+    """(x0, y0, x1, y1) around the dominant object, or the full frame if none is found."""
+    h, w = image.shape[:2]
+    # detect on a small copy; boxes scale back up
+    scale = 512.0 / max(h, w) if max(h, w) > 512 else 1.0
+    small = cv2.resize(image, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA) if scale < 1 else image
+    gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+    gray = cv2.GaussianBlur(gray, (5, 5), 0)
+    median = float(np.median(gray))
+    edges = cv2.Canny(gray, int(max(0, 0.66 * median)), int(min(255, 1.33 * median)))
+    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (15, 15))
+    mask = cv2.morphologyEx(edges, cv2.MORPH_CLOSE, kernel)
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    if not contours:
+        return 0, 0, w, h
+
+    x, y, bw, bh = cv2.boundingRect(max(contours, key=cv2.contourArea))
+    if bw * bh < MIN_OBJECT_FRACTION * small.shape[0] * small.shape[1]:
+        return 0, 0, w, h
+    x, y, bw, bh = (int(round(v / scale)) for v in (x, y, bw, bh))
+
+    # square-ish crop with a margin, clamped to the frame
+    side = max(bw, bh) * (1 + 2 * margin)
+    cx, cy = x + bw / 2, y + bh / 2
+    x0, y0 = int(max(0, cx - side / 2)), int(max(0, cy - side / 2))
+    x1, y1 = int(min(w, cx + side / 2)), int(min(h, cy + side / 2))
+    return x0, y0, x1, y1
+
+
+def prepare_image(path, target_size=TARGET_SIZE, quality=JPEG_QUALITY, crop=True):
+    """Crop, resize and JPEG-encode one view; returns (BytesIO named *.jpg, stats dict)."""
+    start = time.perf_counter()
+    bytes_in = os.path.getsize(path)
+    image = cv2.imread(path, cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError(f"Could not read image {path}")
+
+    h, w = image.shape[:2]
+    x0, y0, x1, y1 = object_bounds(image) if crop else (0, 0, w, h)
+    image = image[y0:y1, x0:x1]
+    ch, cw = image.shape[:2]
+    if max(ch, cw) > target_size:
+        f = target_size / max(ch, cw)
+        image = cv2.resize(image, (max(1, int(cw * f)), max(1, int(ch * f))), interpolation=cv2.INTER_AREA)
+
+    ok, encoded = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, quality, cv2.IMWRITE_JPEG_OPTIMIZE, 1])
+    if not ok:
+        raise ValueError(f"Could not encode {path}")
+    data = io.BytesIO(encoded.tobytes())
+    data.name = os.path.splitext(os.path.basename(path))[0] + ".jpg"
+    return data, {
+        "path": path,
+        "bytes_in": bytes_in,
+        "bytes_out": len(encoded),
+        "size_in": [w, h],
+        "crop": [x0, y0, x1, y1],
+        "size_out": [image.shape[1], image.shape[0]],
+        "seconds": round(time.perf_counter() - start, 4),
+    }
+
+
+def prepare_images(paths, target_size=TARGET_SIZE, quality=JPEG_QUALITY, crop=True):
+    """Prepare every view concurrently; returns (list of in-memory files, report)."""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, len(paths))) as pool:
+        results = list(pool.map(lambda p: prepare_image(p, target_size, quality, crop), paths))
+    files = [f for f, _ in results]
+    per_view = [s for _, s in results]
+    return files, {
+        "views": len(paths),
+        "bytes_in": sum(s["bytes_in"] for s in per_view),
+        "bytes_out": sum(s["bytes_out"] for s in per_view),
+        "seconds": round(time.perf_counter() - start, 4),
+        "per_view": per_view,
+    }
+
+
+if __name__ == "__main__":
+    # python upload_prep.py img_a1.png img_b1.png ... -> prints what would be uploaded
+    import json
+    import sys
+    _, report = prepare_images(sys.argv[1:])
+    print(json.dumps(report, indent=2))
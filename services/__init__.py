@@ -0,0 +1,61 @@
+"""
+Flask blueprints for the two halves of app.py.
+
+    puppetry   /puppetry/*   pose stream, Socket.IO, control board bridge
+    genassets  /genassets/*  capture station, Replicate generations, asset serving
+
+Each can be served on its own (`python app.py puppetry`). Building the
+app for either service imports none of cv2, replicate, trimesh or numpy;
+`python benchmarks/startup_benchmark.py --check` fails if one sneaks in.
+"""
+
+import importlib
+import os
+import sys
+
+from flask import Flask, Response, jsonify
+
+# arduino/ modules import their siblings by bare name; replicate_utils is a package
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for _folder in ("", "arduino"):
+    if os.path.join(_ROOT, _folder) not in sys.path:
+        sys.path.append(os.path.join(_ROOT, _folder))
+import metrics
+import profiling
+
+SERVICES = ("puppetry", "genassets")
+
+
+def create_app(services=SERVICES, **socketio_options):
+    """Build a Flask app serving `services`; socketio_options go to SocketIO.init_app (puppetry)."""
+    app = Flask("app", root_path=_ROOT)
+    app.config['SECRET_KEY'] = 'secret!'
+    for name in services:
+        module = importlib.import_module(f"services.{name}")
+        if name == "puppetry":
+            module.init_app(app, **socketio_options)
+        else:
+            module.init_app(app)
+
+    # Prometheus scrape endpoint; /metrics.json has the same data as percentile summaries.
+    # With METRICS_DIR set (production.py, several workers) both cover every worker.
+    def registry():
+        directory = app.config.get("METRICS_DIR")
+        if not directory:
+            return None
+        metrics.write_state(directory, app.config["METRICS_NAME"])
+        return metrics.merged(directory)
+
+    @app.route("/metrics")
+    def prometheus_metrics():
+        return Response(metrics.render(registry()), mimetype="text/plain; version=0.0.4")
+
+    @app.route("/metrics.json")
+    def metrics_json():
+        return jsonify({"metrics": metrics.snapshot(registry()), "spans": metrics.recent_spans()})
+
+    # PROFILING=1 adds per-request profiling (X-Profile header / ?profile=1); off, nothing is installed
+    if profiling.enabled():
+        profiling.init_app(app)
+
+    return app
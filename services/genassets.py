@@ -0,0 +1,186 @@
+"""Genassets service: capture station, Replicate generations, catalog and asset serving."""
+
+import os
+import threading
+
+from flask import Blueprint, Response, render_template, request, render_template_string, url_for, jsonify
+
+from replicate_utils import asset_catalog, storage
+from static_cache import send_cached
+import metrics
+
+bp = Blueprint("genassets", __name__)
+
+# one PLY -> .splatc conversion per object at a time; concurrent first requests wait for it
+_splat_locks = {}
+_splat_locks_guard = threading.Lock()
+
+@bp.route('/genassets/replicate_hello')
+def replicate_hello():
+    return 'Hello World!'
+
+# View 3D Asset
+@bp.route("/genassets/viewer/<object_name>")
+def viewer(object_name):
+    return render_template("viewer.html", object_name=object_name)
+
+@bp.route("/genassets/models/<object_name>")
+def models(object_name):
+    from replicate_utils.glb_postprocess import load_manifest
+    entry = asset_catalog.get_object(object_name)
+    if entry is None and object_name not in (".", "..") and asset_catalog.index_object(object_name):
+        entry = asset_catalog.get_object(object_name)
+    if entry is None:
+        return jsonify({"status": "error", "message": f"Unknown object: {object_name}"}), 404
+    storage.touch(object_name)
+
+    # Catalog hashes match the files() ETags, so these URLs are cacheable as immutable
+    def file_url(f):
+        return url_for('.files', filename=f["path"], v=f["sha256"][:32])
+
+    by_role = entry["files"]
+    glb = by_role.get("glb", [])
+    by_name = {os.path.basename(f["path"]): f for f in by_role.get("lod", [])}
+    data = {
+        "name": object_name,
+        "kind": entry["kind"],
+        "bounds": entry["bounds"],
+        "glb": file_url(glb[0]) if glb else None,
+        "video": file_url(by_role["video"][0]) if by_role.get("video") else None,
+        "images": [file_url(f) for f in by_role.get("image", [])],
+        "lods": [],
+    }
+
+    # Advertise post-processed LODs, lightest first, so the viewer can upgrade progressively
+    manifest = load_manifest(os.path.join(asset_catalog.STORAGE_ROOT, glb[0]["path"])) if glb else None
+    if manifest:
+        data["lods"] = [
+            {**lod, "url": file_url(by_name[lod["file"]])}
+            for lod in reversed(manifest["lods"]) if lod["file"] in by_name
+        ]
+    return jsonify(data)
+
+# Gaussian splats as compact, spatially chunked .splatc (see replicate_utils/splat.py)
+@bp.route("/genassets/splats/<object_name>")
+def splats(object_name):
+    from replicate_utils import splat
+    entry = asset_catalog.get_object(object_name)
+    plys = entry["files"].get("gaussian") if entry else None
+    if not plys:
+        return jsonify({"status": "error", "message": f"No gaussian splats for {object_name}"}), 404
+    storage.touch(object_name)
+
+    ply_path = os.path.join(asset_catalog.STORAGE_ROOT, plys[0]["path"])
+    splat_path = os.path.splitext(ply_path)[0] + ".splatc"
+    with _splat_locks_guard:
+        lock = _splat_locks.setdefault(object_name, threading.Lock())
+    with lock:
+        if not os.path.isfile(splat_path) or os.path.getmtime(splat_path) < os.path.getmtime(ply_path):
+            splat.convert(ply_path, splat_path)
+            asset_catalog.index_object(object_name, entry["kind"])
+
+    return Response(splat.iter_stream(splat_path), mimetype="application/octet-stream",
+                    headers={"Content-Length": str(os.path.getsize(splat_path))})
+
+@bp.route("/genassets/catalog")
+def catalog():
+    limit = min(request.args.get("limit", 50, type=int), 500)
+    return jsonify(asset_catalog.list_objects(limit=limit, cursor=request.args.get("cursor"),
+                                              kind=request.args.get("kind")))
+
+@bp.route("/genassets/catalog/search")
+def catalog_search():
+    limit = min(request.args.get("limit", 50, type=int), 500)
+    offset = request.args.get("offset", 0, type=int)
+    return jsonify(asset_catalog.search_objects(request.args.get("q", ""), limit=limit, offset=offset))
+
+@bp.route("/genassets/files/<path:filename>")
+def files(filename):
+    # only object files; the catalog database and GC state live next to objects/
+    name = storage.name_from_rel(filename)
+    if name is None:
+        return jsonify({"status": "error", "message": f"File not found: {filename}"}), 404
+    storage.touch(name)
+    # sidecars take disk space too; recount the object so the storage quota sees them
+    return send_cached(storage.STORAGE_ROOT, filename,
+                       on_sidecars=lambda: asset_catalog.index_object(name, storage.object_kind(name)))
+
+@bp.route('/genassets/replicate', methods=['POST'])
+def post_replicate():
+    from replicate_utils.replicate_helper import send_to_replicate
+    data = request.form.to_dict()
+    name = data["name"]
+    abs_paths = [data["path_a"], data["path_b"], data["path_c"], data["path_d"]]
+    api_response = send_to_replicate(name, abs_paths)
+    metrics.counter("replicate_requests_total", "Generation requests",
+                    result="pass" if api_response else "fail").inc()
+    if api_response:
+        return jsonify({
+            "received": data,
+            "status": "pass",
+            "preview": str(f"http://127.0.0.1:5000/viewer/{name}")
+        })
+    return jsonify({"status": "fail"})
+
+@bp.route("/genassets/test_image/<object_name>")
+def test_image(object_name):
+    try:
+        img_rel = f"{storage.object_rel(object_name)}/img_a1.png"
+    except ValueError:
+        return f"Invalid object name {object_name!r}", 400
+    if not os.path.isfile(os.path.join(storage.STORAGE_ROOT, img_rel)):
+        return f"Test image not found at {img_rel}", 404
+
+    html = """
+    <!doctype html>
+    <html>
+      <head><meta charset="utf-8"><title>Test Image - {{ object_name }}</title></head>
+      <body>
+        <h3>Test image for {{ object_name }}</h3>
+        <p>If this is blank, open the image URL directly:</p>
+        <pre>{{ files_url }}</pre>
+        <img src="{{ files_url }}" alt="test image" style="max-width:600px; display:block; margin-top:10px;">
+      </body>
+    </html>
+    """
+    files_url = url_for('.files', filename=img_rel)
+    return render_template_string(html, object_name=object_name, files_url=files_url)
+
+# API trigger for capture station
+# Assumes two webcameras are set up and object is in place
+@bp.route('/genassets/capturestation', methods=['POST'])
+def capturestation():
+    """Capture station endpoint that captures from webcams and runs replicate_utils automatically"""
+    name = request.form.get('name')
+    
+    if not name:
+        return jsonify({
+            "status": "error",
+            "message": "Name parameter is required"
+        }), 400
+    
+    # cv2 is only needed here, so it is imported on the first capture
+    from replicate_utils.capture_station import capture_and_process
+    with metrics.span("capture_station", stage="total"):
+        result = capture_and_process(name)
+    metrics.counter("capture_station_runs_total", "Capture station runs",
+                    result="success" if result["success"] else "error").inc()
+    
+    if result["success"]:
+        return jsonify({
+            "status": "success",
+            "name": result["name"],
+            "preview": f"http://127.0.0.1:5000/viewer/{result['name']}",
+            "model_data": f"http://127.0.0.1:5000/models/{result['name']}"
+        })
+    else:
+        return jsonify({
+            "status": "error", 
+            "message": result.get("error", "Unknown error")
+        }), 500
+
+
+def init_app(app):
+    app.register_blueprint(bp)
+    # Deletes least-recently-used objects over LOCAL_STORAGE_QUOTA_MB (0 disables)
+    storage.start_gc()
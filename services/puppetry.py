@@ -0,0 +1,167 @@
+"""Puppetry service: 6DOF pose stream over Socket.IO, latency sampling, recording, control board bridge."""
+
+import os
+import threading
+import time
+
+from flask import Blueprint, current_app, render_template, render_template_string, request, url_for, jsonify, send_from_directory
+from flask_socketio import SocketIO, join_room, leave_room
+
+import metrics
+from pose_recorder import PoseRecorder, RECORDINGS_DIR, list_recordings
+from pose_codec import PoseBatcher
+from pose_latency import PoseLatencyTracker, DASHBOARD_HTML
+
+bp = Blueprint("puppetry", __name__)
+socketio = SocketIO(cors_allowed_origins="*")
+
+_pose_frames = metrics.counter("pose_frames_total", "Pose frames received on /puppetry/pose")
+pose_latency = PoseLatencyTracker()
+# Pose sessions for baking into Blender animation (see pose_bake.py; recording needs no numpy)
+pose_recorder = PoseRecorder()
+
+# Clients get JSON `pose_data` unless they ask for binary `pose_binary` (see pose_codec.py),
+# which is batched: the latest pose of every source, BINARY_INTERVAL seconds apart.
+# Under production.py every worker batches the poses posted to it (binary clients may be
+# connected to any worker) and re-announces its sources so late joiners learn all of them.
+BINARY_INTERVAL = 1 / 60
+SOURCES_INTERVAL = 2.0
+pose_batcher = PoseBatcher.for_worker(int(os.environ.get("WORKER_INDEX", 0)),
+                                      int(os.environ.get("WORKER_COUNT", 1)))
+_binary_flusher = None
+_binary_flusher_lock = threading.Lock()
+
+@bp.route('/puppetry/')
+def index():
+    return render_template("index.html", websocket_only=current_app.config.get("WEBSOCKET_ONLY", False))
+
+@bp.post("/puppetry/pose")
+def pose():
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not isinstance(data.get("quaternion", {}), dict):
+        return jsonify({"status": "error", "message": "Expected a JSON pose object"}), 400
+    data = pose_latency.stamp_received(data)
+    print(f"Received pose data: {data}")
+    _pose_frames.inc()
+    pose_recorder.add(data)
+    _queue_binary(data)
+    # Broadcast to all connected WebSocket clients
+    with metrics.timer("socketio_emit_seconds", "Time spent in socketio.emit", event="pose_data"):
+        socketio.emit('pose_data', pose_latency.stamp_emit(data), to="pose_json")
+    return {"ok": True}
+
+def _queue_binary(data):
+    q = data.get("quaternion") or {}
+    try:
+        source_id, is_new = pose_batcher.source_id(str(data.get("source", "default")))
+    except ValueError as e:
+        # the binary stream is optional; JSON clients still get this pose
+        print(f"Dropped binary pose from {data.get('source')!r}: {e}")
+        return
+    if is_new:
+        socketio.emit("pose_sources", {v: k for k, v in pose_batcher.source_ids.items()}, to="pose_binary")
+    timestamp = data.get("timestamp")
+    pose_batcher.add(source_id, timestamp if isinstance(timestamp, (int, float)) else data["t_recv"],
+                     (q.get("x", 0.0), q.get("y", 0.0), q.get("z", 0.0), q.get("w", 1.0)))
+
+def _start_binary_flusher():
+    global _binary_flusher
+    with _binary_flusher_lock:
+        if _binary_flusher is None:
+            _binary_flusher = socketio.start_background_task(_flush_binary)
+
+def _flush_binary():
+    # started once with the app and kept running; idle ticks are a no-op
+    announced = time.monotonic()
+    while True:
+        message = pose_batcher.drain()
+        if message is not None:
+            with metrics.timer("socketio_emit_seconds", "Time spent in socketio.emit", event="pose_binary"):
+                socketio.emit("pose_binary", message, to="pose_binary")
+        if pose_batcher.source_ids and time.monotonic() - announced >= SOURCES_INTERVAL:
+            announced = time.monotonic()
+            socketio.emit("pose_sources", {v: k for k, v in pose_batcher.source_ids.items()}, to="pose_binary")
+        socketio.sleep(BINARY_INTERVAL)
+
+@socketio.on("connect")
+def pose_client_connect():
+    join_room("pose_json")
+
+@socketio.on("pose_encoding")
+def pose_encoding(data):
+    """Per-client negotiation: {"encoding": "binary"} or {"encoding": "json"}."""
+    if data.get("encoding") == "binary":
+        leave_room("pose_json")
+        join_room("pose_binary")
+        return {"encoding": "binary", "sources": {v: k for k, v in pose_batcher.source_ids.items()}}
+    leave_room("pose_binary")
+    join_room("pose_json")
+    return {"encoding": "json"}
+
+# Browsers estimate their clock offset against ours, then echo sampled render times
+@socketio.on("clock_sync")
+def clock_sync(data):
+    return {"t0": data.get("t0"), "t1": time.time()}
+
+@socketio.on("clock_offset")
+def clock_offset(data):
+    pose_latency.clock_sync(request.sid, data["t0"], data["t1"], data["t3"])
+
+@socketio.on("pose_render")
+def pose_render(data):
+    pose_latency.record_render(request.sid, data)
+
+@socketio.on("disconnect")
+def pose_client_disconnect():
+    pose_latency.forget(request.sid)
+
+@bp.post("/puppetry/recording/start")
+def recording_start():
+    try:
+        return jsonify(pose_recorder.start((request.get_json(silent=True) or {}).get("name")))
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except RuntimeError as e:
+        return jsonify({"status": "error", "message": str(e)}), 409
+
+@bp.post("/puppetry/recording/stop")
+def recording_stop():
+    try:
+        return jsonify(pose_recorder.stop())
+    except RuntimeError as e:
+        return jsonify({"status": "error", "message": str(e)}), 409
+
+@bp.route("/puppetry/recordings")
+def recordings():
+    return jsonify({**pose_recorder.status(), "recordings": list_recordings()})
+
+@bp.route("/puppetry/recordings/<filename>")
+def recording_download(filename):
+    return send_from_directory(RECORDINGS_DIR, filename, as_attachment=True, mimetype="application/x-ndjson")
+
+@bp.route("/puppetry/latency")
+def latency_report():
+    return jsonify(pose_latency.report())
+
+@bp.route("/puppetry/latency/dashboard")
+def latency_dashboard():
+    return render_template_string(DASHBOARD_HTML, json_url=url_for(".latency_report"))
+
+# -------------------------------------------------------
+# Control board events (Arduino serial -> Socket.IO)
+# -------------------------------------------------------
+arduino_bus = None
+
+def start_arduino_bridge(port, protocol="text"):
+    """Read the control board in the background and emit `arduino_event` to clients."""
+    global arduino_bus
+    from arduino.serial_events import EventBus, SerialReader, attach_socketio
+    arduino_bus = EventBus()
+    attach_socketio(arduino_bus, socketio)
+    SerialReader(port, arduino_bus, protocol=protocol).start()
+    return arduino_bus
+
+def init_app(app, **socketio_options):
+    app.register_blueprint(bp)
+    socketio.init_app(app, **socketio_options)
+    _start_binary_flusher()
@@ -0,0 +1,227 @@
+"""
+In-host message broker for scaling Socket.IO across processes.
+
+A stand-in for Redis in python-socketio's pub/sub client managers: a tiny
+TCP fan-out server (every frame from one connection goes to all of them)
+and a `BrokerManager` that plugs into Flask-SocketIO as `client_manager`.
+An emit in one worker then reaches clients connected to every worker.
+
+    broker = Broker(("127.0.0.1", 6390), secret).start()    # once per host
+    socketio.init_app(app, client_manager=BrokerManager("127.0.0.1:6390", secret))
+
+Frames are a 4-byte big-endian length, an HMAC-SHA256 of the payload
+under a shared secret (SOCKETIO_BROKER_SECRET when not passed) and a
+pickle. The broker drops peers that send a frame with a bad MAC, and
+managers drop such frames before unpickling, so only processes that
+know the secret can run anything through pickle. Bind to loopback all
+the same. Each connection has its own outbound queue, so a slow worker
+never stalls delivery to the others.
+"""
+
+import hashlib
+import hmac
+import os
+import pickle
+import queue
+import socket
+import struct
+import threading
+import time
+
+import socketio
+
+DEFAULT_ADDRESS = ("127.0.0.1", 6390)
+SECRET_ENV = "SOCKETIO_BROKER_SECRET"
+MAX_FRAME = 64 * 1024 * 1024
+_LEN = struct.Struct("!I")
+_MAC_SIZE = hashlib.sha256().digest_size
+
+
+def _secret(secret):
+    secret = secret or os.environ.get(SECRET_ENV)
+    if not secret:
+        raise ValueError(f"The broker needs a shared secret (pass one or set {SECRET_ENV})")
+    return secret.encode() if isinstance(secret, str) else secret
+
+
+def sign(secret, payload):
+    return hmac.new(secret, payload, hashlib.sha256).digest() + payload
+
+
+def verify(secret, frame):
+    """The payload of a signed frame, or None if its MAC doesn't match."""
+    mac, payload = frame[:_MAC_SIZE], frame[_MAC_SIZE:]
+    if len(mac) == _MAC_SIZE and hmac.compare_digest(mac, hmac.new(secret, payload, hashlib.sha256).digest()):
+        return payload
+    return None
+
+
+def parse_address(url):
+    """'127.0.0.1:6390' or 'broker://127.0.0.1:6390' -> (host, port)."""
+    host, _, port = url.split("://")[-1].rpartition(":")
+    return host or DEFAULT_ADDRESS[0], int(port)
+
+
+def _recv_exact(sock, n):
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk:
+            raise ConnectionError("broker connection closed")
+        buf += chunk
+    return bytes(buf)
+
+
+def recv_frame(sock):
+    (length,) = _LEN.unpack(_recv_exact(sock, _LEN.size))
+    if length > MAX_FRAME:
+        raise ConnectionError(f"broker frame of {length} bytes")
+    return _recv_exact(sock, length)
+
+
+def send_frame(sock, payload):
+    sock.sendall(_LEN.pack(len(payload)) + payload)
+
+
+class Broker:
+    """Fan-out server: relays each frame it receives to every connected peer."""
+
+    def __init__(self, address=DEFAULT_ADDRESS, secret=None, max_pending=10000):
+        self.address = address
+        self._secret = _secret(secret)
+        self.max_pending = max_pending
+        self._peers = {}   # socket -> outbound Queue
+        self._lock = threading.Lock()
+        self._sock = None
+        self.relayed = 0
+        self.dropped = 0
+
+    def start(self):
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind(self.address)
+        self._sock.listen(64)
+        self.address = self._sock.getsockname()
+        threading.Thread(target=self._accept, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._sock is not None:
+            self._sock.close()
+        with self._lock:
+            for peer, outbound in self._peers.items():
+                outbound.put(None)
+                peer.close()
+            self._peers.clear()
+
+    def _accept(self):
+        while True:
+            try:
+                peer, _ = self._sock.accept()
+            except OSError:
+                return
+            peer.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            outbound = queue.Queue(self.max_pending)
+            with self._lock:
+                self._peers[peer] = outbound
+            threading.Thread(target=self._read, args=(peer,), daemon=True).start()
+            threading.Thread(target=self._write, args=(peer, outbound), daemon=True).start()
+
+    def _read(self, peer):
+        try:
+            while True:
+                frame = recv_frame(peer)
+                if verify(self._secret, frame) is None:
+                    print(f"Broker: dropping peer {peer.getpeername()} after a frame with a bad MAC")
+                    break
+                with self._lock:
+                    targets = list(self._peers.values())
+                for outbound in targets:
+                    try:
+                        outbound.put_nowait(frame)
+                    except queue.Full:
+                        self.dropped += 1
+                self.relayed += 1
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            with self._lock:
+                outbound = self._peers.pop(peer, None)
+            if outbound is not None:
+                outbound.put(None)
+            peer.close()
+
+    def _write(self, peer, outbound):
+        while True:
+            frame = outbound.get()
+            if frame is None:
+                return
+            try:
+                send_frame(peer, frame)
+            except OSError:
+                return
+
+
+class BrokerManager(socketio.PubSubManager):
+    """python-socketio client manager that publishes through a Broker."""
+
+    name = "broker"
+
+    def __init__(self, url="127.0.0.1:6390", secret=None, channel="flask-socketio", write_only=False, logger=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self.address = parse_address(url)
+        self._secret = _secret(secret)
+        self._pub = None
+        self._pub_lock = threading.Lock()
+
+    def _connect(self):
+        sock = socket.create_connection(self.address, timeout=5)
+        sock.settimeout(None)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return sock
+
+    def _publish(self, data):
+        payload = sign(self._secret, pickle.dumps(data))
+        with self._pub_lock:
+            for attempt in range(2):
+                try:
+                    if self._pub is None:
+                        self._pub = self._connect()
+                    send_frame(self._pub, payload)
+                    return
+                except OSError:
+                    if self._pub is not None:
+                        self._pub.close()
+                    self._pub = None
+                    if attempt:
+                        raise
+
+    def _listen(self):
+        delay = 0.1
+        while True:
+            try:
+                sock = self._connect()
+            except OSError:
+                time.sleep(delay)
+                delay = min(delay * 2, 5.0)
+                continue
+            delay = 0.1
+            try:
+                while True:
+                    payload = verify(self._secret, recv_frame(sock))
+                    if payload is None:
+                        self._get_logger().warning("Dropped a broker frame with a bad MAC")
+                        continue
+                    yield pickle.loads(payload)
+            except (ConnectionError, OSError):
+                self._get_logger().warning("Lost connection to broker, reconnecting")
+            finally:
+                sock.close()
+
+
+if __name__ == "__main__":
+    import sys
+    address = parse_address(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ADDRESS
+    broker = Broker(address).start()   # secret from SOCKETIO_BROKER_SECRET
+    print(f"Socket.IO broker listening on {broker.address[0]}:{broker.address[1]}")
+    threading.Event().wait()
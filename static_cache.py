@@ -0,0 +1,165 @@
+"""
+Cache-aware file serving for generated assets.
+
+Generated files are large and rarely change, so responses carry a
+content-hash ETag (304 on If-None-Match), HTTP Range support, and use
+pre-compressed `.br`/`.gz` sidecars for compressible formats when the
+client accepts them. Requests that pin the content with `?v=<etag>` are
+marked immutable; everything else is revalidated cheaply on each load.
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import shutil
+import threading
+
+from flask import abort, request, send_file
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE = {".glb", ".gltf", ".ply", ".obj", ".json", ".txt", ".html"}
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+MIN_COMPRESS_SIZE = 1024
+
+_hashes = {}
+_hash_lock = threading.Lock()
+_pending = set()
+
+
+def content_etag(path):
+    """SHA-256 based ETag for path, cached by (mtime, size)."""
+    st = os.stat(path)
+    key = (st.st_mtime_ns, st.st_size)
+    with _hash_lock:
+        cached = _hashes.get(path)
+        if cached and cached[0] == key:
+            return cached[1]
+
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    etag = h.hexdigest()[:32]
+
+    with _hash_lock:
+        _hashes[path] = (key, etag)
+    return etag
+
+
+def _sidecar_fresh(path, sidecar):
+    try:
+        return os.stat(sidecar).st_mtime_ns >= os.stat(path).st_mtime_ns
+    except OSError:
+        return False
+
+
+def is_compressible(path):
+    return os.path.splitext(path)[1].lower() in COMPRESSIBLE and os.path.getsize(path) >= MIN_COMPRESS_SIZE
+
+
+def write_sidecars(path):
+    """Write `.gz` (and `.br` if brotli is installed) next to path, atomically."""
+    if not is_compressible(path):
+        return
+
+    sidecar = path + ".gz"
+    if not _sidecar_fresh(path, sidecar):
+        tmp = f"{sidecar}.tmp{os.getpid()}"
+        with open(path, "rb") as src, open(tmp, "wb") as dst:
+            with gzip.GzipFile(fileobj=dst, mode="wb", compresslevel=9, mtime=0) as z:
+                shutil.copyfileobj(src, z, 1 << 20)
+        os.replace(tmp, sidecar)
+
+    if brotli is not None and not _sidecar_fresh(path, path + ".br"):
+        tmp = f"{path}.br.tmp{os.getpid()}"
+        with open(path, "rb") as src:
+            data = brotli.compress(src.read(), quality=9)
+        with open(tmp, "wb") as dst:
+            dst.write(data)
+        os.replace(tmp, path + ".br")
+
+
+def _schedule_sidecars(path, on_written=None):
+    """Build sidecars off the request thread; the current request is served uncompressed."""
+    with _hash_lock:
+        if path in _pending:
+            return
+        _pending.add(path)
+
+    def work():
+        try:
+            write_sidecars(path)
+            if on_written:
+                on_written()
+        except Exception as e:
+            print(f"Failed to precompress {path}: {e}")
+        finally:
+            with _hash_lock:
+                _pending.discard(path)
+
+    threading.Thread(target=work, daemon=True).start()
+
+
+def _pick_encoding(path, on_sidecars=None):
+    """Choose a fresh sidecar matching Accept-Encoding, or None for identity."""
+    if request.range is not None or not is_compressible(path):
+        return None, None
+
+    accepted = request.accept_encodings
+    found_any = False
+    for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+        sidecar = path + suffix
+        if _sidecar_fresh(path, sidecar):
+            found_any = True
+            if accepted[encoding]:
+                return encoding, sidecar
+    if not found_any:
+        _schedule_sidecars(path, on_sidecars)
+    return None, None
+
+
+def send_cached(directory, filename, on_sidecars=None):
+    """send_from_directory with content ETags, 304s, Range and pre-compressed sidecars.
+
+    on_sidecars is called (off the request thread) after new sidecars are written.
+    """
+    path = safe_join(directory, filename)
+    if path is None or not os.path.isfile(path):
+        abort(404, description=f"File not found: {filename}")
+
+    etag = content_etag(path)
+    encoding, sidecar = _pick_encoding(path, on_sidecars)
+
+    if encoding:
+        mimetype = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        rv = send_file(sidecar, mimetype=mimetype, etag=f"{etag}-{encoding}")
+        rv.headers["Content-Encoding"] = encoding
+    else:
+        rv = send_file(path, etag=etag)
+
+    if is_compressible(path):
+        rv.vary.add("Accept-Encoding")
+    if request.args.get("v") == etag:
+        rv.cache_control.public = True
+        rv.cache_control.max_age = IMMUTABLE_MAX_AGE
+        rv.cache_control.immutable = True
+    else:
+        rv.cache_control.no_cache = True
+    return rv
+
+
+if __name__ == "__main__":
+    import sys
+    # Precompress every compressible file under the given directories
+    for root_dir in sys.argv[1:]:
+        for dirpath, _, names in os.walk(root_dir):
+            for name in names:
+                if name.endswith((".gz", ".br")) or ".tmp" in name:
+                    continue
+                write_sidecars(os.path.join(dirpath, name))